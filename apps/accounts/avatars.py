@@ -0,0 +1,133 @@
+# apps/accounts/avatars.py
+
+"""
+Fixed-size avatar variants.
+
+Uploads are stored as-is; a background job (`accounts.avatar_thumbnails`)
+then writes square WebP (JPEG where Pillow lacks WebP) variants next to
+them under `avatars/thumbs/`. Variant names are derived from the original's
+path and modification time, so templates can find them without a query and
+re-uploading under the same file name never shows the old picture's variants.
+The path a template shows is cached, so rendering does not stat the disk.
+"""
+
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+
+AVATAR_SIZES = (40, 128, 512)
+THUMBS_DIR = "avatars/thumbs"
+
+AVATAR_URL_CACHE_KEY = "accounts:avatar_url:{}:{}"
+# generate_variants() refreshes the entries of the process that ran it; a
+# worker with its own locmem cache follows a re-upload within this many seconds.
+AVATAR_URL_TTL = 60
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # Pillow is optional; templates then use the original
+    Image = None
+
+
+def _format():
+    if Image is not None and features.check("webp"):
+        return "WEBP", ".webp"
+    return "JPEG", ".jpg"
+
+
+def _path_key(avatar_path):
+    return hashlib.sha1(avatar_path.encode()).hexdigest()[:16]
+
+
+def _source_version(avatar_path):
+    """Modification time of the original in ns, or None if it is missing."""
+    try:
+        return os.stat(os.path.join(settings.MEDIA_ROOT, avatar_path)).st_mtime_ns
+    except OSError:
+        return None
+
+
+def variant_path(avatar_path, size, ext=None, version=None):
+    """
+    Media-relative path of the `size` variant of the current upload at
+    `avatar_path` (`version` is its mtime, read from disk when omitted).
+    """
+    if ext is None:
+        ext = _format()[1]
+    if version is None:
+        version = _source_version(avatar_path) or 0
+    return f"{THUMBS_DIR}/{_path_key(avatar_path)}-{version:x}_{size}{ext}"
+
+
+def pick_size(size):
+    """Smallest variant at least `size` pixels wide (largest if none is)."""
+    for candidate in AVATAR_SIZES:
+        if candidate >= size:
+            return candidate
+    return AVATAR_SIZES[-1]
+
+
+def variant_url_path(avatar_path, size):
+    """
+    Media-relative path to show for an avatar at `size` px: the matching
+    variant once the worker has made it, the original until then.
+    """
+    if not avatar_path:
+        return avatar_path
+    size = pick_size(size)
+    key = AVATAR_URL_CACHE_KEY.format(_path_key(avatar_path), size)
+    path = cache.get(key)
+    if path is None:
+        path = avatar_path
+        version = _source_version(avatar_path)
+        if version is not None:
+            variant = variant_path(avatar_path, size, version=version)
+            if os.path.exists(os.path.join(settings.MEDIA_ROOT, variant)):
+                path = variant
+        cache.set(key, path, AVATAR_URL_TTL)
+    return path
+
+
+def forget_avatar_urls(avatar_path):
+    """Drops the cached paths of an avatar after its file or variants change."""
+    cache.delete_many([AVATAR_URL_CACHE_KEY.format(_path_key(avatar_path), size) for size in AVATAR_SIZES])
+
+
+def _remove_stale_variants(avatar_path, version):
+    """Deletes variants made from earlier uploads at the same path."""
+    thumbs_dir = os.path.join(settings.MEDIA_ROOT, THUMBS_DIR)
+    prefix = f"{_path_key(avatar_path)}-"
+    current = f"{prefix}{version:x}_"
+    for name in os.listdir(thumbs_dir):
+        if name.startswith(prefix) and not name.startswith(current):
+            try:
+                os.remove(os.path.join(thumbs_dir, name))
+            except FileNotFoundError:
+                pass
+
+
+def generate_variants(avatar_path):
+    """Writes every variant of an avatar. Returns False if it could not be read."""
+    if Image is None:
+        return False
+
+    source = os.path.join(settings.MEDIA_ROOT, avatar_path)
+    fmt, ext = _format()
+    try:
+        version = os.stat(source).st_mtime_ns
+        with Image.open(source) as img:
+            img = ImageOps.exif_transpose(img).convert("RGB")
+            os.makedirs(os.path.join(settings.MEDIA_ROOT, THUMBS_DIR), exist_ok=True)
+            for size in AVATAR_SIZES:
+                thumb = ImageOps.fit(img, (size, size), Image.LANCZOS)
+                target = os.path.join(settings.MEDIA_ROOT, variant_path(avatar_path, size, ext, version))
+                tmp = target + ".tmp"
+                thumb.save(tmp, fmt, quality=85)
+                os.replace(tmp, target)
+        forget_avatar_urls(avatar_path)
+        _remove_stale_variants(avatar_path, version)
+    except (OSError, Image.DecompressionBombError):
+        return False
+    return True
@@ -1,38 +1,131 @@
 # apps/accounts/context_processors.py
 
+import uuid
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
 from django.db import connection
+from django.utils.functional import SimpleLazyObject
 
-def user_context(request):
+from apps.common.versions import bump_version
+
+SESSION_SNAPSHOT_KEY = "current_user_snapshot"
+USER_VERSION_CACHE_KEY = "accounts:user_version:{}"
+# Tokens expire so a worker whose cache missed an invalidation (a per-process
+# locmem cache, a dropped memcached write) still reloads the row within this
+# many seconds; with a shared cache it only costs one `users` query per TTL.
+USER_VERSION_TTL = 60
+
+
+def get_user_version(user_id):
     """
-    Makes logged-in user info from the custom `users` table
-    available in all templates as `current_user`, including avatar and role.
+    Returns the current snapshot version token for a user. Tokens are random so
+    a cache flush can never resurrect a version that was already invalidated.
     """
+    key = USER_VERSION_CACHE_KEY.format(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, USER_VERSION_TTL)
+        version = cache.get(key)
+    return version
+
+
+def user_scope(user_id):
+    """Version scope (apps.common.versions) of pages showing the user's navbar."""
+    return f"user:{user_id}"
+
+
+def invalidate_user_snapshot(user_id):
+    """Invalidates every session snapshot of the given user after their row changes."""
+    cache.set(USER_VERSION_CACHE_KEY.format(user_id), uuid.uuid4().hex, USER_VERSION_TTL)
+    bump_version(user_scope(user_id))
+
+
+def _fetch_user(user_id):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT id, username, email, first_name, last_name, is_active, is_staff, date_joined, avatar, role, phone
+            FROM users
+            WHERE id = %s
+            """,
+            [user_id]
+        )
+        row = cursor.fetchone()
+
+    if not row:
+        return None
+
+    return {
+        "id": row[0],
+        "username": row[1],
+        "email": row[2],
+        "first_name": row[3],
+        "last_name": row[4],
+        "is_active": bool(row[5]),
+        "is_staff": bool(row[6]),
+        "date_joined": row[7],
+        "avatar": row[8],
+        "role": row[9],  # <-- include role
+        "phone": row[10],
+    }
+
+
+def _load_snapshot(request, user_id):
+    snapshot = request.session.get(SESSION_SNAPSHOT_KEY)
+    if not snapshot or snapshot.get("version") != get_user_version(user_id):
+        return None
+
+    user_data = dict(snapshot["data"])
+    if user_data.get("id") != user_id:
+        return None
+
+    if user_data.get("date_joined"):
+        user_data["date_joined"] = datetime.fromisoformat(user_data["date_joined"])
+    return user_data
+
+
+def _store_snapshot(request, user_data):
+    data = dict(user_data)
+    if data.get("date_joined"):
+        data["date_joined"] = data["date_joined"].isoformat()
+    request.session[SESSION_SNAPSHOT_KEY] = {
+        "version": get_user_version(user_data["id"]),
+        "data": data,
+    }
+
+
+def get_current_user(request):
+    """
+    Returns the logged-in user's row as a dict (or None), querying `users`
+    at most once per request. With SESSION_USER_SNAPSHOT enabled the row is
+    also kept in the session until the user is edited.
+    """
+    if hasattr(request, "_current_user_cache"):
+        return request._current_user_cache
+
     user_data = None
     user_id = request.session.get("user_id")
 
     if user_id:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT id, username, email, first_name, last_name, is_active, is_staff, date_joined, avatar, role
-                FROM users
-                WHERE id = %s
-                """,
-                [user_id]
-            )
-            row = cursor.fetchone()
-            if row:
-                user_data = {
-                    "id": row[0],
-                    "username": row[1],
-                    "email": row[2],
-                    "first_name": row[3],
-                    "last_name": row[4],
-                    "is_active": bool(row[5]),
-                    "is_staff": bool(row[6]),
-                    "date_joined": row[7],
-                    "avatar": row[8],
-                    "role": row[9],  # <-- include role
-                }
-
-    return {"current_user": user_data}
+        use_snapshot = getattr(settings, "SESSION_USER_SNAPSHOT", False)
+        if use_snapshot:
+            user_data = _load_snapshot(request, user_id)
+
+        if user_data is None:
+            user_data = _fetch_user(user_id)
+            if user_data and use_snapshot:
+                _store_snapshot(request, user_data)
+
+    request._current_user_cache = user_data
+    return user_data
+
+
+def user_context(request):
+    """
+    Makes logged-in user info from the custom `users` table
+    available in all templates as `current_user`, including avatar and role.
+    The lookup is lazy: it only runs if a template actually reads it.
+    """
+    return {"current_user": SimpleLazyObject(lambda: get_current_user(request))}
@@ -0,0 +1,24 @@
+# apps/accounts/jobs.py
+
+from django.db import connection
+
+from apps.accounts.avatars import generate_variants
+from apps.jobs.queue import handler
+
+
+def make_avatar_thumbnails(user_ids):
+    """Generates avatar variants for the given users. Returns the ids done."""
+    placeholders = ','.join(['%s'] * len(user_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT id, avatar FROM users WHERE id IN ({placeholders}) AND avatar IS NOT NULL AND avatar <> ''",
+            list(user_ids),
+        )
+        rows = cursor.fetchall()
+
+    return [user_id for user_id, avatar in rows if generate_variants(avatar)]
+
+
+@handler("accounts.avatar_thumbnails")
+def avatar_thumbnails_job(ids, job):
+    return make_avatar_thumbnails(ids)
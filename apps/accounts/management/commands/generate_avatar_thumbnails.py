@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from apps.accounts.jobs import make_avatar_thumbnails
+from apps.jobs.queue import enqueue
+
+
+class Command(BaseCommand):
+    help = "Generates avatar thumbnails for every user with an avatar (backfill)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--now", action="store_true", help="Generate here instead of queueing a job.")
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id FROM users WHERE avatar IS NOT NULL AND avatar <> '' ORDER BY id")
+            user_ids = [row[0] for row in cursor.fetchall()]
+
+        if not user_ids:
+            self.stdout.write("No avatars to process.")
+            return
+
+        if options["now"]:
+            done = make_avatar_thumbnails(user_ids)
+            self.stdout.write(f"Generated thumbnails for {len(done)} of {len(user_ids)} user(s).")
+        else:
+            job = enqueue("accounts.avatar_thumbnails", user_ids)
+            self.stdout.write(f"Queued job {job.pk} for {len(user_ids)} user(s).")
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.9 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+from apps.common.indexes import create_declared_indexes, drop_declared_indexes
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Member',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('member_id', models.CharField(blank=True, max_length=50, null=True)),
+                ('username', models.CharField(max_length=150)),
+                ('email', models.CharField(max_length=254)),
+                ('password', models.CharField(max_length=255)),
+                ('first_name', models.CharField(blank=True, max_length=150)),
+                ('last_name', models.CharField(blank=True, max_length=150)),
+                ('phone', models.CharField(blank=True, max_length=30, null=True)),
+                ('avatar', models.CharField(blank=True, max_length=255, null=True)),
+                ('role', models.CharField(blank=True, max_length=30, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_staff', models.BooleanField(default=False)),
+                ('date_joined', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'users',
+                'managed': False,
+                'indexes': [
+                    models.Index(fields=['username'], name='users_username_idx'),
+                    models.Index(fields=['email'], name='users_email_idx'),
+                    models.Index(fields=['date_joined'], name='users_date_joined_idx'),
+                ],
+            },
+        ),
+        # Unmanaged models get no DDL from Django; create the declared indexes here
+        migrations.RunPython(
+            create_declared_indexes('accounts', 'Member'),
+            drop_declared_indexes('accounts', 'Member'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.9 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+from apps.common.indexes import create_declared_indexes, live_indexes
+
+INDEX = models.Index(fields=['date_joined'], name='users_date_joined_idx')
+
+
+def drop_date_joined_index(apps, schema_editor):
+    # The users list pages on id now; nothing filters or sorts on date_joined.
+    Member = apps.get_model('accounts', 'Member')
+    table = Member._meta.db_table
+    if table in schema_editor.connection.introspection.table_names() and INDEX.name in live_indexes(table):
+        schema_editor.remove_index(Member, INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_date_joined_index, create_declared_indexes('accounts', 'Member')),
+        migrations.RemoveIndex(
+            model_name='member',
+            name='users_date_joined_idx',
+        ),
+    ]
@@ -1 +1,31 @@
 from django.db import models
+
+
+class Member(models.Model):
+    """
+    The hand-managed `users` table. Unmanaged: the app keeps querying it with
+    raw SQL; the model exists so its indexes are declared and migrated.
+    """
+    member_id = models.CharField(max_length=50, null=True, blank=True)
+    username = models.CharField(max_length=150)
+    email = models.CharField(max_length=254)
+    password = models.CharField(max_length=255)
+    first_name = models.CharField(max_length=150, blank=True)
+    last_name = models.CharField(max_length=150, blank=True)
+    phone = models.CharField(max_length=30, null=True, blank=True)
+    avatar = models.CharField(max_length=255, null=True, blank=True)
+    role = models.CharField(max_length=30, null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+    is_staff = models.BooleanField(default=False)
+    date_joined = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        managed = False
+        db_table = "users"
+        indexes = [
+            models.Index(fields=["username"], name="users_username_idx"),
+            models.Index(fields=["email"], name="users_email_idx"),
+        ]
+
+    def __str__(self):
+        return self.username
@@ -0,0 +1,18 @@
+from django import template
+
+from apps.accounts.avatars import variant_url_path
+
+register = template.Library()
+
+
+@register.filter(name="avatar")
+def avatar(path, size=128):
+    """
+    Media-relative path of the avatar variant for `size` px, e.g.
+    {{ MEDIA_URL }}{{ current_user.avatar|avatar:40 }}. Falls back to the
+    original upload until its thumbnails exist.
+    """
+    try:
+        return variant_url_path(path, int(size))
+    except (TypeError, ValueError):
+        return path
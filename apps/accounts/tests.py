@@ -1,3 +1,140 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from apps.accounts import avatars, context_processors
+from apps.accounts.context_processors import USER_VERSION_TTL, get_current_user, invalidate_user_snapshot
+from apps.accounts.models import Member
+from apps.common.pagination import DEFAULT_PER_PAGE
+from apps.common.testing import UnmanagedTablesMixin, set_session
+from apps.contributions.models import Contribution
+
+
+class UserSnapshotTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Member,)
+
+    def setUp(self):
+        self.member = Member.objects.create(username="ann", email="a@example.com", password="x", role="admin")
+        self.session = {"user_id": self.member.pk}
+        # Two gunicorn workers, each with its own locmem cache.
+        self.worker_a = LocMemCache("worker-a", {})
+        self.worker_b = LocMemCache("worker-b", {})
+        self.worker_a.clear()
+        self.worker_b.clear()
+
+    def current_user(self, worker):
+        request = RequestFactory().get("/")
+        request.session = self.session
+        with mock.patch.object(context_processors, "cache", worker):
+            return get_current_user(request)
+
+    def test_snapshot_is_reused_until_invalidated(self):
+        with self.settings(SESSION_USER_SNAPSHOT=True):
+            self.assertEqual(self.current_user(self.worker_a)["role"], "admin")
+            Member.objects.filter(pk=self.member.pk).update(role="member")
+            with self.assertNumQueries(0):
+                self.assertEqual(self.current_user(self.worker_a)["role"], "admin")
+
+            with mock.patch.object(context_processors, "cache", self.worker_a):
+                invalidate_user_snapshot(self.member.pk)
+            self.assertEqual(self.current_user(self.worker_a)["role"], "member")
+
+    def test_other_worker_catches_up_after_ttl(self):
+        with self.settings(SESSION_USER_SNAPSHOT=True):
+            self.assertEqual(self.current_user(self.worker_b)["role"], "admin")
+
+            # Worker A handles the demotion; worker B's cache never hears of it.
+            Member.objects.filter(pk=self.member.pk).update(role="member", is_active=False)
+            with mock.patch.object(context_processors, "cache", self.worker_a):
+                invalidate_user_snapshot(self.member.pk)
+            self.assertEqual(self.current_user(self.worker_b)["role"], "admin")
+
+            later = time.time() + USER_VERSION_TTL + 1
+            with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+                user = self.current_user(self.worker_b)
+            self.assertEqual(user["role"], "member")
+            self.assertFalse(user["is_active"])
+
+
+class ListUsersTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Member, Contribution)
+
+    def test_pages_reach_users_without_date_joined(self):
+        members = [
+            Member.objects.create(username=f"u{i}", email=f"u{i}@example.com", password="x")
+            for i in range(DEFAULT_PER_PAGE + 2)
+        ]
+        set_session(self.client, user_id=members[0].pk, role="admin")
+
+        seen, params = [], {}
+        while True:
+            page = self.client.get(reverse("users_list"), params).context["page"]
+            seen += [row["id"] for row in page.rows]
+            if not page.next_cursor:
+                break
+            params = {"cursor": page.next_cursor}
+
+        self.assertEqual(seen, sorted((m.pk for m in members), reverse=True))
+
+
+@skipUnless(avatars.Image, "Pillow is not installed")
+class AvatarVariantTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = self.settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        os.makedirs(os.path.join(self.media_root, "avatars"))
+        self.path = "avatars/1_me.png"
+        cache.clear()
+
+    def upload(self, color, mtime):
+        full_path = os.path.join(self.media_root, self.path)
+        avatars.Image.new("RGB", (600, 400), color).save(full_path, "PNG")
+        os.utime(full_path, (mtime, mtime))
+        avatars.forget_avatar_urls(self.path)  # as the upload views do
+
+    def thumbs(self):
+        return sorted(os.listdir(os.path.join(self.media_root, avatars.THUMBS_DIR)))
+
+    def test_reupload_under_the_same_name_gets_new_variants(self):
+        self.upload("red", 1_000_000)
+        self.assertEqual(avatars.variant_url_path(self.path, 40), self.path)  # not generated yet
+        self.assertTrue(avatars.generate_variants(self.path))
+        old = avatars.variant_url_path(self.path, 40)
+        self.assertTrue(old.startswith(avatars.THUMBS_DIR))
+
+        self.upload("blue", 2_000_000)
+        # Until the new variants exist the original is shown, never the old thumbnail.
+        self.assertEqual(avatars.variant_url_path(self.path, 40), self.path)
+
+        self.assertTrue(avatars.generate_variants(self.path))
+        new = avatars.variant_url_path(self.path, 40)
+        self.assertNotEqual(new, old)
+        self.assertEqual(len(self.thumbs()), len(avatars.AVATAR_SIZES))
+        with avatars.Image.open(os.path.join(self.media_root, new)) as img:
+            self.assertEqual(img.size, (40, 40))
+            self.assertGreater(img.convert("RGB").getpixel((20, 20))[2], 200)
+
+    def test_renders_do_not_touch_the_disk(self):
+        self.upload("red", 1_000_000)
+        self.assertTrue(avatars.generate_variants(self.path))
+        variant = avatars.variant_url_path(self.path, 40)
+
+        with mock.patch.object(avatars.os, "stat") as stat, mock.patch.object(avatars.os.path, "exists") as exists:
+            self.assertEqual(avatars.variant_url_path(self.path, 40), variant)
+            self.assertEqual(avatars.variant_url_path(self.path, 30), variant)  # same variant size
+        stat.assert_not_called()
+        exists.assert_not_called()
+
+    def test_missing_original(self):
+        self.assertEqual(avatars.variant_url_path(self.path, 40), self.path)
+        self.assertFalse(avatars.generate_variants(self.path))
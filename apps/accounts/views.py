@@ -9,6 +9,13 @@ from django.contrib.auth.decorators import login_required
 import os
 from django.conf import settings
 from django.shortcuts import redirect, render
+from django.utils import timezone
+
+from apps.accounts.avatars import forget_avatar_urls
+from apps.accounts.context_processors import get_current_user, invalidate_user_snapshot
+from apps.common.pagination import InvalidCursor, keyset_paginate, search_condition
+from apps.jobs.queue import enqueue
+from apps.pages import summary
 #from apps.accounts.decorators import login_required_custom  # adjust import if needed
 
 
@@ -101,10 +108,11 @@ def register_view(request):
 
             hashed_password = make_password(password)
             cursor.execute(
-                "INSERT INTO users (username, email, password, first_name, last_name, phone, is_active) "
-                "VALUES (%s, %s, %s, %s, %s, %s, %s)",
-                [username, email, hashed_password, first_name, last_name, phone, True]
+                "INSERT INTO users (username, email, password, first_name, last_name, phone, is_active, date_joined) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                [username, email, hashed_password, first_name, last_name, phone, True, timezone.now()]
             )
+        summary.record_users(1)
 
         messages.success(request, "Account created successfully! Please log in.")
         return redirect("login")
@@ -124,36 +132,13 @@ def dashboard(request):
 # -------------------------
 @login_required_custom
 def account_profile(request):
-    user_id = request.session.get("user_id")
+    # Shares the request/session memoized row used by the `current_user` context
+    user_data = get_current_user(request)
 
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT id, username, email, first_name, last_name, is_staff,
-                   date_joined, phone, avatar
-            FROM users
-            WHERE id = %s
-            """,
-            [user_id]
-        )
-        row = cursor.fetchone()
-
-    if not row:
+    if not user_data:
         messages.error(request, "User not found.")
         return redirect("login")
 
-    user_data = {
-        "id": row[0],
-        "username": row[1],
-        "email": row[2],
-        "first_name": row[3],
-        "last_name": row[4],
-        "is_staff": row[5],
-        "date_joined": row[6],
-        "phone": row[7],
-        "avatar": row[8],  # <-- fixed index
-    }
-
     return render(request, "accounts/profile.html", {"user": user_data})
 
 
@@ -190,6 +175,7 @@ def edit_profile(request):
             with open(full_path, "wb+") as dest:
                 for chunk in avatar.chunks():
                     dest.write(chunk)
+            forget_avatar_urls(avatar_path)
 
         # Build query
         avatar_sql = ""
@@ -208,6 +194,10 @@ def edit_profile(request):
 
         with connection.cursor() as cursor:
             cursor.execute(query, params)
+        invalidate_user_snapshot(user_id)
+        if avatar_path:
+            # Navbar/list sizes are generated off the request path
+            enqueue("accounts.avatar_thumbnails", [user_id], created_by=user_id)
 
         messages.success(request, "Profile updated successfully!")
         return redirect("index")  # 👈 change this to your correct profile page name
@@ -240,37 +230,44 @@ def edit_profile(request):
 
 # apps/accounts/views.py
 
+USER_SEARCH_COLUMNS = ("member_id", "username", "email", "first_name", "last_name", "phone")
+
+
 @login_required_custom
 def list_users(request):
-    with connection.cursor() as cursor:
-        cursor.execute("""
-            SELECT id, member_id, username, email, first_name, last_name, phone, avatar, role, is_active, is_staff, date_joined
-            FROM users
-            #WHERE role != 'super_admin'
-            ORDER BY date_joined DESC
-        """)
-        rows = cursor.fetchall()
-
-    # Convert to a list of dictionaries for easier template access
+    query = """
+        SELECT id, member_id, username, email, first_name, last_name, phone, avatar, role, is_active, is_staff, date_joined
+        FROM users
+    """
+    search = request.GET.get("q", "").strip()
+    search_sql, params = search_condition(USER_SEARCH_COLUMNS, search)
+    if search_sql:
+        query += " WHERE " + search_sql
+
+    try:
+        with connection.cursor() as cursor:
+            page = keyset_paginate(
+                cursor, query, params,
+                # Newest first. date_joined is nullable (and missing on
+                # older rows), so the seek runs on the id, which grows in
+                # join order anyway.
+                sort_key="id", tiebreaker="id",
+                token=request.GET.get("cursor"),
+            )
+    except InvalidCursor:
+        return redirect("users_list")
+
+    # Normalise flags for easier template access
     users = [
         {
-            "id": row[0],
-            "member_id": row[1],
-            "username": row[2],
-            "email": row[3],
-            "first_name": row[4],
-            "last_name": row[5],
-            "phone": row[6],
-            "avatar": row[7],
-            "role": row[8],
-            "is_active": bool(row[9]),
-            "is_staff": bool(row[10]),
-            "date_joined": row[11],
+            **row,
+            "is_active": bool(row["is_active"]),
+            "is_staff": bool(row["is_staff"]),
         }
-        for row in rows
+        for row in page.rows
     ]
 
-    return render(request, "accounts/users_list.html", {"users": users})
+    return render(request, "accounts/users_list.html", {"users": users, "page": page, "search": search})
 
 
 
@@ -336,6 +333,7 @@ def user_edit(request, user_id):
             with open(full_path, "wb+") as dest:
                 for chunk in avatar.chunks():
                     dest.write(chunk)
+            forget_avatar_urls(avatar_path)
         else:
             avatar_path = user["avatar"]  # keep old avatar if no new upload
 
@@ -347,6 +345,9 @@ def user_edit(request, user_id):
                     phone=%s, role=%s, is_active=%s, avatar=%s
                 WHERE id=%s
             """, [member_id, username, email, first_name, last_name, phone, role, is_active, avatar_path, user_id])
+        invalidate_user_snapshot(user_id)
+        if avatar:
+            enqueue("accounts.avatar_thumbnails", [user_id], created_by=request.session.get("user_id"))
 
         messages.success(request, "User updated successfully.")
         return redirect("users_list")
@@ -372,6 +373,8 @@ def delete_user(request, user_id):
 
             # Perform the deletion
             cursor.execute("DELETE FROM users WHERE id=%s", [user_id])
+            invalidate_user_snapshot(user_id)
+            summary.record_users(-1)
             messages.success(request, "User deleted successfully.")
             return redirect("users_list")
     
@@ -0,0 +1,57 @@
+# apps/common/approvals.py
+
+"""
+Set-based helpers for the batch approval endpoints.
+
+A batch approval is three statements whatever its size: lock the requested
+rows that are still pending, flip exactly those, and record one signature
+per flipped row with a single multi-row INSERT.
+"""
+
+
+def parse_ids(raw_ids):
+    """Keeps the positive integer ids of a posted list, dropping duplicates."""
+    return list(dict.fromkeys(int(i) for i in raw_ids if str(i).isdigit()))
+
+
+def lock_pending(cursor, table, ids, pending_sql, columns=("id",)):
+    """
+    Locks (SELECT ... FOR UPDATE) the rows of `table` among `ids` that still
+    match `pending_sql` and returns them. Must run inside a transaction.
+    """
+    if not ids:
+        return []
+
+    placeholders = ", ".join(["%s"] * len(ids))
+    # SQLite (tests) has no row locks; its writes are serialized anyway.
+    lock_sql = "FOR UPDATE" if cursor.db.features.has_select_for_update else ""
+    cursor.execute(f"""
+        SELECT {", ".join(columns)} FROM {table}
+        WHERE id IN ({placeholders}) AND {pending_sql}
+        {lock_sql}
+    """, ids)
+    return cursor.fetchall()
+
+
+def insert_signatures(cursor, table, fk_column, ids, signatory_id, signed_at=None):
+    """Writes one signature per id in a single multi-row INSERT."""
+    if not ids:
+        return 0
+
+    if signed_at is None:
+        row_sql = "(%s, %s)"
+        params = [value for object_id in ids for value in (object_id, signatory_id)]
+        cursor.execute(
+            f"INSERT INTO {table} ({fk_column}, signatory_id) VALUES "
+            + ", ".join([row_sql] * len(ids)),
+            params,
+        )
+    else:
+        row_sql = "(%s, %s, %s)"
+        params = [value for object_id in ids for value in (object_id, signatory_id, signed_at)]
+        cursor.execute(
+            f"INSERT INTO {table} ({fk_column}, signatory_id, signed_at) VALUES "
+            + ", ".join([row_sql] * len(ids)),
+            params,
+        )
+    return len(ids)
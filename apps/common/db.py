@@ -0,0 +1,40 @@
+# apps/common/db.py
+
+import logging
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up_connections():
+    """
+    Opens every configured database connection up front, so the first request
+    a worker serves does not pay for the connect and `init_command` round trip.
+    Only useful with persistent connections (CONN_MAX_AGE > 0).
+    """
+    if not getattr(settings, "DB_CONN_WARMUP", False):
+        return
+
+    for conn in connections.all():
+        if conn.settings_dict.get("CONN_MAX_AGE") == 0:
+            continue
+        try:
+            conn.ensure_connection()
+        except DatabaseError as e:
+            # The request cycle will retry; don't keep the worker from booting
+            logger.warning("Database warm-up failed for %r: %s", conn.alias, e)
+
+
+def lock_row(cursor, table, row_id, columns, condition=None):
+    """
+    Re-reads `columns` of one row of `table` under SELECT ... FOR UPDATE,
+    optionally only while it still matches `condition`. Returns the row, or
+    None once it is gone. Must run inside a transaction.
+    """
+    where = f"id = %s AND {condition}" if condition else "id = %s"
+    # SQLite (tests) has no row locks; its writes are serialized anyway.
+    lock_sql = "FOR UPDATE" if cursor.db.features.has_select_for_update else ""
+    cursor.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE {where} {lock_sql}", [row_id])
+    return cursor.fetchone()
@@ -0,0 +1,69 @@
+# apps/common/indexes.py
+
+"""
+Index management for the unmanaged models that map our hand-created tables.
+
+Django skips schema operations for `managed = False` models, so the indexes
+declared in their `Meta.indexes` are created by a RunPython step instead.
+An index counts as present when any live index (or unique/primary key)
+starts with the same columns, so indexes created by hand are not duplicated.
+"""
+
+from django.db import connection
+
+
+def live_indexes(table):
+    """Returns {name: [columns]} for every index on `table`."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return {
+        name: info["columns"]
+        for name, info in constraints.items()
+        if info["index"] or info["unique"] or info["primary_key"]
+    }
+
+
+def expected_columns(model, index):
+    return [model._meta.get_field(field).column for field in index.fields]
+
+
+def is_covered(columns, live):
+    return any(list(existing[:len(columns)]) == columns for existing in live.values())
+
+
+def missing_indexes(model):
+    """Returns the declared indexes of `model` that no live index covers."""
+    table = model._meta.db_table
+    if table not in connection.introspection.table_names():
+        return []
+
+    live = live_indexes(table)
+    return [
+        index for index in model._meta.indexes
+        if not is_covered(expected_columns(model, index), live)
+    ]
+
+
+def create_declared_indexes(app_label, *model_names):
+    """RunPython forward step: creates the missing declared indexes."""
+    def forwards(apps, schema_editor):
+        for model_name in model_names:
+            model = apps.get_model(app_label, model_name)
+            for index in missing_indexes(model):
+                schema_editor.add_index(model, index)
+    return forwards
+
+
+def drop_declared_indexes(app_label, *model_names):
+    """RunPython reverse step: drops the declared indexes this app created."""
+    def backwards(apps, schema_editor):
+        for model_name in model_names:
+            model = apps.get_model(app_label, model_name)
+            table = model._meta.db_table
+            if table not in connection.introspection.table_names():
+                continue
+            live = live_indexes(table)
+            for index in model._meta.indexes:
+                if index.name in live:
+                    schema_editor.remove_index(model, index)
+    return backwards
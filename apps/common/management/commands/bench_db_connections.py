@@ -0,0 +1,63 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures per-request database latency with a fresh connection per "
+        "request versus a persistent connection, against the configured DB."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Simulated requests per mode.")
+        parser.add_argument("--queries", type=int, default=3, help="Queries per simulated request.")
+
+    def simulate_request(self, queries):
+        # Mirrors what Django does around every request: close_old_connections()
+        # on request_started/finished, then run the view's queries.
+        close_old_connections()
+        with connection.cursor() as cursor:
+            for _ in range(queries):
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+        close_old_connections()
+
+    def run_mode(self, max_age, health_checks, requests, queries):
+        connection.close()
+        connection.settings_dict["CONN_MAX_AGE"] = max_age
+        connection.settings_dict["CONN_HEALTH_CHECKS"] = health_checks
+
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            self.simulate_request(queries)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        connection.close()
+        return timings
+
+    def handle(self, *args, **options):
+        original = (connection.settings_dict["CONN_MAX_AGE"], connection.settings_dict["CONN_HEALTH_CHECKS"])
+        modes = [
+            ("new connection per request", 0, False),
+            ("persistent", 600, False),
+            ("persistent + health checks", 600, True),
+        ]
+
+        self.stdout.write(
+            f"{connection.vendor} @ {connection.settings_dict.get('HOST') or 'local'}: "
+            f"{options['requests']} requests x {options['queries']} queries"
+        )
+        try:
+            for label, max_age, health_checks in modes:
+                timings = sorted(self.run_mode(max_age, health_checks, options["requests"], options["queries"]))
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                self.stdout.write(
+                    f"  {label:<28} mean {statistics.mean(timings):7.3f} ms  "
+                    f"p50 {statistics.median(timings):7.3f} ms  p95 {p95:7.3f} ms"
+                )
+        finally:
+            connection.settings_dict["CONN_MAX_AGE"], connection.settings_dict["CONN_HEALTH_CHECKS"] = original
@@ -0,0 +1,90 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+# What login_view stores, plus the current_user snapshot the context processor adds.
+BENCH_SESSION = {
+    "user_id": 1,
+    "username": "bench",
+    "avatar": "avatars/1_bench.jpg",
+    "role": "admin",
+    "is_staff": True,
+    "current_user_snapshot": {
+        "version": "0" * 32,
+        "data": {
+            "id": 1, "username": "bench", "email": "bench@example.com",
+            "first_name": "Bench", "last_name": "User", "is_active": True,
+            "is_staff": True, "date_joined": "2024-01-01T00:00:00",
+            "avatar": "avatars/1_bench.jpg", "role": "admin", "phone": "0700000000",
+        },
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the per-request cost of loading (and optionally saving) a "
+        "logged-in session under each SESSION_MODE, through SessionMiddleware."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Simulated requests per mode.")
+        parser.add_argument(
+            "--modes", nargs="+", choices=list(settings.SESSION_ENGINES), default=list(settings.SESSION_ENGINES),
+            help="Session modes to compare.",
+        )
+
+    def run_mode(self, requests, write):
+        factory = RequestFactory()
+        counter = {"n": 0}
+
+        def login(request):
+            request.session.update(BENCH_SESSION)
+            return HttpResponse()
+
+        def view(request):
+            # What login_required_custom and the views read on every request.
+            request.session.get("user_id")
+            request.session.get("role")
+            request.session.get("is_staff")
+            if write:
+                # e.g. a flash message or a refreshed user snapshot
+                counter["n"] += 1
+                request.session["bench_counter"] = counter["n"]
+            return HttpResponse()
+
+        response = SessionMiddleware(login)(factory.get("/"))
+        cookie = response.cookies[settings.SESSION_COOKIE_NAME].value
+        middleware = SessionMiddleware(view)
+
+        timings = []
+        for _ in range(requests):
+            request = factory.get("/")
+            request.COOKIES[settings.SESSION_COOKIE_NAME] = cookie
+            start = time.perf_counter()
+            response = middleware(request)
+            timings.append((time.perf_counter() - start) * 1000)
+            if settings.SESSION_COOKIE_NAME in response.cookies:
+                cookie = response.cookies[settings.SESSION_COOKIE_NAME].value
+
+        # Leave no bench session behind in the table or cache.
+        request.session.delete()
+        return timings
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{options['requests']} requests per mode, current SESSION_MODE={settings.SESSION_MODE}")
+        for mode in options["modes"]:
+            with override_settings(SESSION_ENGINE=settings.SESSION_ENGINES[mode]):
+                for write in (False, True):
+                    timings = sorted(self.run_mode(options["requests"], write))
+                    p95 = timings[int(len(timings) * 0.95) - 1]
+                    label = f"{mode} ({'read + write' if write else 'read'})"
+                    self.stdout.write(
+                        f"  {label:<30} mean {statistics.mean(timings):7.3f} ms  "
+                        f"p50 {statistics.median(timings):7.3f} ms  p95 {p95:7.3f} ms"
+                    )
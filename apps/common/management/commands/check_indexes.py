@@ -0,0 +1,57 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.common.indexes import expected_columns, live_indexes, missing_indexes
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the live indexes of the hand-managed tables with the ones "
+        "declared on their unmanaged models."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--create", action="store_true",
+            help="Create the missing indexes instead of only reporting them.",
+        )
+
+    def handle(self, *args, **options):
+        tables = connection.introspection.table_names()
+        missing_total = 0
+
+        for model in apps.get_models():
+            if model._meta.managed or not model._meta.indexes:
+                continue
+
+            table = model._meta.db_table
+            if table not in tables:
+                self.stdout.write(self.style.WARNING(f"{table}: table not found, skipped"))
+                continue
+
+            declared = {tuple(expected_columns(model, index)) for index in model._meta.indexes}
+            missing = missing_indexes(model)
+            missing_total += len(missing)
+
+            for index in missing:
+                columns = ", ".join(expected_columns(model, index))
+                if options["create"]:
+                    with connection.schema_editor() as schema_editor:
+                        schema_editor.add_index(model, index)
+                    self.stdout.write(self.style.SUCCESS(f"{table}: created {index.name} ({columns})"))
+                else:
+                    self.stdout.write(self.style.ERROR(f"{table}: missing {index.name} ({columns})"))
+
+            for name, columns in live_indexes(table).items():
+                if columns == ["id"] or tuple(columns) in declared:
+                    continue
+                self.stdout.write(f"{table}: extra index {name} ({', '.join(columns)})")
+
+            if not missing:
+                self.stdout.write(self.style.SUCCESS(f"{table}: ok"))
+
+        if missing_total and not options["create"]:
+            raise CommandError(
+                f"{missing_total} expected index(es) missing; run with --create or `manage.py migrate`."
+            )
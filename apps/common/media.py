@@ -0,0 +1,127 @@
+# apps/common/media.py
+
+"""
+Serving media files that sit behind a permission check.
+
+The calling view decides who may see a file; `serve_media` then either hands
+the transfer to nginx with `X-Accel-Redirect` (MEDIA_ACCEL_REDIRECT) so the
+gunicorn worker is free as soon as the headers are out, or streams the file
+itself with single-range support for setups without nginx in front.
+"""
+
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.http import content_disposition_header, http_date
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+# Types a browser may render in place. Everything else is sent as a download,
+# so a stored HTML or SVG file can never run script on our origin.
+INLINE_CONTENT_TYPES = {"image/png", "image/jpeg", "image/gif", "application/pdf"}
+
+
+def media_file_path(rel_path):
+    """Absolute path of a media-relative path; 404 if it escapes MEDIA_ROOT or is missing."""
+    root = os.path.realpath(settings.MEDIA_ROOT)
+    full_path = os.path.realpath(os.path.join(root, rel_path or ""))
+    if not full_path.startswith(root + os.sep) or not os.path.isfile(full_path):
+        raise Http404("File not found.")
+    return full_path
+
+
+def _content_type(filename):
+    content_type, encoding = mimetypes.guess_type(filename)
+    if encoding:
+        # Never let the browser transparently decompress a stored archive.
+        return "application/octet-stream"
+    return content_type or "application/octet-stream"
+
+
+def _byte_range(header, size):
+    """
+    (start, end) of a single `bytes=` range, None to send the whole file
+    (absent, malformed or multi-range header), or False when unsatisfiable.
+    """
+    match = RANGE_RE.match((header or "").strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        suffix = int(last)
+        if suffix == 0:
+            return False
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+class _FileSlice:
+    """Read-only view of `length` bytes of an open file, for FileResponse."""
+
+    def __init__(self, f, start, length):
+        f.seek(start)
+        self.file = f
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def serve_media(request, rel_path, filename=None, as_attachment=False):
+    """
+    Response delivering the media file at `rel_path` (relative to MEDIA_ROOT).
+    `filename` is the name offered to the browser; it defaults to the stored one.
+    Files outside INLINE_CONTENT_TYPES are always sent as attachments.
+    """
+    full_path = media_file_path(rel_path)
+    rel_path = os.path.relpath(full_path, os.path.realpath(settings.MEDIA_ROOT)).replace(os.sep, "/")
+    filename = filename or os.path.basename(full_path)
+    if _content_type(filename) not in INLINE_CONTENT_TYPES:
+        as_attachment = True
+
+    if settings.MEDIA_ACCEL_REDIRECT:
+        # nginx answers Range/If-Range itself from the internal location.
+        response = HttpResponse(content_type=_content_type(filename))
+        response["X-Accel-Redirect"] = quote(settings.MEDIA_ACCEL_PREFIX + rel_path)
+    else:
+        stat = os.stat(full_path)
+        modified = http_date(stat.st_mtime)
+        byte_range = None
+        if request.headers.get("If-Range", modified) == modified:
+            byte_range = _byte_range(request.headers.get("Range"), stat.st_size)
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+
+        f = open(full_path, "rb")
+        if byte_range is None:
+            response = FileResponse(f, content_type=_content_type(filename))
+        else:
+            start, end = byte_range
+            length = end - start + 1
+            response = FileResponse(_FileSlice(f, start, length), content_type=_content_type(filename), status=206)
+            response["Content-Length"] = length
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+        response["Accept-Ranges"] = "bytes"
+        response["Last-Modified"] = modified
+
+    response["Content-Disposition"] = content_disposition_header(as_attachment, filename)
+    # Owner-only documents: browsers may keep them, shared proxies may not.
+    response["Cache-Control"] = "private"
+    return response
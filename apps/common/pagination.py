@@ -0,0 +1,245 @@
+# apps/common/pagination.py
+
+"""
+Keyset (seek) pagination for the raw-SQL list views and ORM querysets.
+
+Instead of `LIMIT n OFFSET m`, each page continues from the last row of the
+previous one: `WHERE (sort_key, id) < (last_sort_key, last_id)`. With an index
+on the sort key the database seeks straight to the page, so page N costs the
+same as page 1 regardless of table size.
+"""
+
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+
+CURSOR_SALT = "apps.common.pagination.cursor"
+DEFAULT_PER_PAGE = 25
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, rows, next_cursor=None, previous_cursor=None):
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.make_naive(value, dt_timezone.utc)
+        return ["dt", value.isoformat()]
+    if isinstance(value, date):
+        return ["d", value.isoformat()]
+    if isinstance(value, Decimal):
+        return ["dec", str(value)]
+    return ["v", value]
+
+
+def _decode_value(encoded):
+    kind, value = encoded
+    if kind == "dt":
+        return datetime.fromisoformat(value)
+    if kind == "d":
+        return date.fromisoformat(value)
+    if kind == "dec":
+        return Decimal(value)
+    return value
+
+
+def cursor_ordering(sort_key, tiebreaker, descending):
+    """The ordering a cursor is bound to, e.g. "-created_at,-id"."""
+    prefix = "-" if descending else ""
+    return f"{prefix}{sort_key},{prefix}{tiebreaker}"
+
+
+def encode_cursor(direction, sort_value, tiebreaker_value, ordering):
+    """
+    Signs the seek position of a page. `ordering` (see cursor_ordering()) is
+    part of the payload, so the cursor cannot be replayed under another sort.
+    """
+    return signing.dumps(
+        {"d": direction, "o": ordering, "k": [_encode_value(sort_value), _encode_value(tiebreaker_value)]},
+        salt=CURSOR_SALT,
+        compress=True,
+    )
+
+
+def decode_cursor(token, ordering):
+    """
+    Returns (direction, sort_value, tiebreaker_value). Raises InvalidCursor for
+    a tampered token or one issued for a different `ordering`.
+    """
+    try:
+        data = signing.loads(token, salt=CURSOR_SALT)
+        direction = data["d"]
+        cursor_order = data["o"]
+        sort_value, tiebreaker_value = (_decode_value(v) for v in data["k"])
+    except (signing.BadSignature, KeyError, TypeError, ValueError) as e:
+        raise InvalidCursor(str(e))
+
+    if direction not in ("next", "prev"):
+        raise InvalidCursor("Unknown cursor direction")
+    if cursor_order != ordering:
+        raise InvalidCursor("Cursor was issued for a different ordering")
+
+    return direction, sort_value, tiebreaker_value
+
+
+def search_condition(columns, search):
+    """
+    `(col LIKE %s OR ...)` over `columns` for a free-text list search, with
+    its params, or (None, []) when there is nothing to search for. Lets the
+    keyset-paged list views filter on the server instead of within one page.
+    """
+    search = (search or "").strip()
+    if not search:
+        return None, []
+    sql = "(" + " OR ".join(f"{col} LIKE %s" for col in columns) + ")"
+    return sql, [f"%{search}%"] * len(columns)
+
+
+def keyset_paginate(cursor, base_query, params=None, sort_key="created_at",
+                    tiebreaker="id", per_page=DEFAULT_PER_PAGE, token=None,
+                    descending=True):
+    """
+    Runs one page of `base_query` ordered by (sort_key, tiebreaker).
+
+    `base_query` is a plain `SELECT ... FROM ... [WHERE ...]` without ORDER BY
+    or LIMIT; `sort_key` and `tiebreaker` are column names in its select list
+    and the sort key should be NOT NULL, since NULLs never satisfy the seek.
+    `token` is a cursor returned on a previous page (or None for the first
+    page). Rows are returned as dicts, together with the cursor tokens for the
+    neighbouring pages. Raises InvalidCursor for a tampered or stale token, or
+    one issued under a different sort key or direction.
+    """
+    params = list(params or [])
+    bound_order = cursor_ordering(sort_key, tiebreaker, descending)
+    direction, seek_values = "next", None
+    if token:
+        direction, sort_value, tiebreaker_value = decode_cursor(token, bound_order)
+        seek_values = [sort_value, sort_value, tiebreaker_value]
+
+    # Walking backwards is the same seek with the comparison and order flipped;
+    # the rows are put back in display order afterwards.
+    forward = direction == "next"
+    scan_descending = descending if forward else not descending
+    op = "<" if scan_descending else ">"
+    order = "DESC" if scan_descending else "ASC"
+
+    query = f"SELECT * FROM (\n{base_query}\n) AS keyset_page"
+    if seek_values is not None and sort_key == tiebreaker:
+        query += f" WHERE keyset_page.{tiebreaker} {op} %s"
+        params.append(seek_values[2])
+    elif seek_values is not None:
+        query += (
+            f" WHERE (keyset_page.{sort_key} {op} %s"
+            f" OR (keyset_page.{sort_key} = %s AND keyset_page.{tiebreaker} {op} %s))"
+        )
+        params += seek_values
+    order_sql = f"keyset_page.{tiebreaker} {order}"
+    if sort_key != tiebreaker:
+        order_sql = f"keyset_page.{sort_key} {order}, {order_sql}"
+    query += f" ORDER BY {order_sql} LIMIT %s"
+    params.append(per_page + 1)
+
+    cursor.execute(query, params)
+    columns = [col[0] for col in cursor.description]
+    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    if not rows:
+        return KeysetPage(rows)
+
+    first, last = rows[0], rows[-1]
+    has_next = has_more if forward else True
+    has_previous = token is not None if forward else has_more
+
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor("next", last[sort_key], last[tiebreaker], bound_order) if has_next else None,
+        previous_cursor=encode_cursor("prev", first[sort_key], first[tiebreaker], bound_order) if has_previous else None,
+    )
+
+
+def keyset_paginate_queryset(queryset, token=None, sort_key="pk", tiebreaker="pk",
+                             per_page=DEFAULT_PER_PAGE, descending=True):
+    """
+    ORM counterpart of keyset_paginate() for querysets.
+
+    `sort_key` and `tiebreaker` are field names (the tiebreaker must be unique)
+    and, for a `.values()` queryset, must be among the selected columns. Rows
+    are whatever the queryset yields (instances or dicts). Raises InvalidCursor
+    for a tampered or stale token, or one issued under a different ordering.
+    """
+    bound_order = cursor_ordering(sort_key, tiebreaker, descending)
+    direction, seek = "next", None
+    if token:
+        direction, sort_value, tiebreaker_value = decode_cursor(token, bound_order)
+        seek = (sort_value, tiebreaker_value)
+
+    forward = direction == "next"
+    scan_descending = descending if forward else not descending
+    op = "lt" if scan_descending else "gt"
+    prefix = "-" if scan_descending else ""
+
+    if seek is not None:
+        if sort_key == tiebreaker:
+            queryset = queryset.filter(**{f"{tiebreaker}__{op}": seek[1]})
+        else:
+            queryset = queryset.filter(
+                Q(**{f"{sort_key}__{op}": seek[0]})
+                | Q(**{sort_key: seek[0], f"{tiebreaker}__{op}": seek[1]})
+            )
+
+    ordering = [f"{prefix}{sort_key}"]
+    if sort_key != tiebreaker:
+        ordering.append(f"{prefix}{tiebreaker}")
+    rows = list(queryset.order_by(*ordering)[:per_page + 1])
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    if not rows:
+        return KeysetPage(rows)
+
+    def key(row):
+        if isinstance(row, dict):
+            return row[sort_key], row[tiebreaker]
+        return getattr(row, sort_key), getattr(row, tiebreaker)
+
+    has_next = has_more if forward else True
+    has_previous = token is not None if forward else has_more
+
+    return KeysetPage(
+        rows,
+        next_cursor=encode_cursor("next", *key(rows[-1]), bound_order) if has_next else None,
+        previous_cursor=encode_cursor("prev", *key(rows[0]), bound_order) if has_previous else None,
+    )
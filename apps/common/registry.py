@@ -0,0 +1,83 @@
+# apps/common/registry.py
+
+"""
+Metadata of the models published through DYNAMIC_DATATB and DYNAMIC_API.
+
+Built once in CommonConfig.ready() and shared by the dyn_dt and dyn_api
+views, so requests no longer re-import model classes or walk `_meta` for
+field lists, FK maps, choices and typed field groups.
+"""
+
+from django.conf import settings
+from django.db import models
+from django.utils.module_loading import import_string
+
+# dotted model path -> ModelInfo
+MODEL_REGISTRY = {}
+
+
+class ModelInfo:
+    def __init__(self, model):
+        opts = model._meta
+
+        self.model = model
+        # Concrete columns, in declaration order.
+        self.fields = list(opts.fields)
+        self.db_fields = [f.name for f in self.fields]
+
+        # FK name -> related model (same FKs as cli.get_model_fk)
+        self.fk_models = {
+            f.name: f.related_model for f in self.fields
+            if type(f) is models.ForeignKey
+        }
+        self.non_fk_fields = [f for f in self.db_fields if f not in self.fk_models]
+        self.choices = {f.name: f.choices for f in self.fields if f.choices}
+
+        self.integer_fields = self.field_names(models.IntegerField)
+        self.date_time_fields = self.field_names(models.DateTimeField)
+        self.email_fields = self.field_names(models.EmailField)
+        self.text_fields = self.field_names((models.TextField, models.CharField))
+
+    def field_names(self, field_type):
+        return [
+            field.name for field in self.model._meta.get_fields()
+            if isinstance(field, field_type)
+        ]
+
+    def fk_values(self):
+        """Rows of every FK target, for the dyn_dt edit dropdowns (queries the DB)."""
+        return {
+            name: list(related.objects.all())
+            for name, related in self.fk_models.items()
+        }
+
+
+def _load(dotted):
+    try:
+        model = import_string(dotted)
+    except ImportError:
+        return None
+    return MODEL_REGISTRY.setdefault(dotted, ModelInfo(model))
+
+
+def build_registry():
+    """Resolves every configured model; unimportable entries are skipped."""
+    for config in (settings.DYNAMIC_DATATB, settings.DYNAMIC_API):
+        for dotted in config.values():
+            if dotted not in MODEL_REGISTRY:
+                _load(dotted)
+
+
+def model_info(dotted):
+    """ModelInfo for a dotted model path, or None when it cannot be imported."""
+    info = MODEL_REGISTRY.get(dotted)
+    if info is None:
+        # Paths added after startup (e.g. overridden settings) resolve once here.
+        info = _load(dotted)
+    return info
+
+
+def datatb_model(aPath):
+    """ModelInfo behind a dyn_dt path, or None when the path is not configured."""
+    dotted = settings.DYNAMIC_DATATB.get(aPath)
+    return model_info(dotted) if dotted else None
@@ -0,0 +1,39 @@
+# apps/common/testing.py
+
+"""
+Test helpers.
+
+The app queries hand-managed tables (`users`, `contributions`, ...) with raw
+SQL. Their models are `managed = False`, so the test database does not have
+them; `UnmanagedTablesMixin` creates them for the test classes that need them.
+"""
+
+from django.db import connection
+
+
+class UnmanagedTablesMixin:
+    """Creates the tables of `unmanaged_models` around a TestCase class."""
+    unmanaged_models = ()
+
+    @classmethod
+    def setUpClass(cls):
+        # Outside the class-wide transaction TestCase opens in super():
+        # SQLite refuses schema changes inside it.
+        with connection.schema_editor() as editor:
+            for model in cls.unmanaged_models:
+                editor.create_model(model)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connection.schema_editor() as editor:
+            for model in reversed(cls.unmanaged_models):
+                editor.delete_model(model)
+
+
+def set_session(client, **values):
+    """Stores values in the test client's session (as login_view would)."""
+    session = client.session
+    session.update(values)
+    session.save()
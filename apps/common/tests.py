@@ -0,0 +1,325 @@
+import os
+import runpy
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import OperationalError, connection
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import Index
+from django.test import RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from apps.accounts.models import Member
+from apps.common.approvals import insert_signatures, lock_pending, parse_ids
+from apps.common.db import warm_up_connections
+from apps.common import registry
+from apps.common.indexes import create_declared_indexes, drop_declared_indexes, live_indexes
+from apps.common.media import serve_media
+from apps.common.pagination import (
+    InvalidCursor, cursor_ordering, decode_cursor, encode_cursor, keyset_paginate, keyset_paginate_queryset,
+    search_condition,
+)
+from apps.common.testing import UnmanagedTablesMixin, set_session
+from apps.contributions.models import Contribution
+from apps.investments.models import Investment, InvestmentSignature
+from apps.jobs.models import Job
+from apps.loans.models import Loan, LoanSignature
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class KeysetPaginationTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Member, Loan, Contribution)  # contributions: navbar badge
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = Member.objects.create(username="m", email="m@example.com", password="x", first_name="Ann")
+        # Two rows share a timestamp so the id tiebreaker matters.
+        stamps = [BASE, BASE + timedelta(days=1), BASE + timedelta(days=1), BASE + timedelta(days=2), BASE + timedelta(days=3)]
+        cls.loans = [
+            Loan.objects.create(
+                user_id=cls.member.pk, amount=100 + i, interest_rate=5, repayment_period=12,
+                reason=f"reason {i}", created_at=stamp,
+            )
+            for i, stamp in enumerate(stamps)
+        ]
+
+    def page(self, token=None, per_page=2, descending=True):
+        with connection.cursor() as cursor:
+            return keyset_paginate(
+                cursor, "SELECT id, created_at FROM loans", sort_key="created_at", tiebreaker="id",
+                per_page=per_page, token=token, descending=descending,
+            )
+
+    def test_walks_forward_and_back_without_gaps(self):
+        expected = [loan.pk for loan in sorted(self.loans, key=lambda l: (l.created_at, l.pk), reverse=True)]
+
+        pages, page = [], self.page()
+        pages.append([row["id"] for row in page])
+        while page.has_next:
+            page = self.page(page.next_cursor)
+            pages.append([row["id"] for row in page])
+        self.assertEqual(sum(pages, []), expected)
+        self.assertEqual([len(p) for p in pages], [2, 2, 1])
+
+        back = self.page(page.previous_cursor)
+        self.assertEqual([row["id"] for row in back], pages[1])
+
+    def test_tampered_cursor_is_rejected(self):
+        token = self.page().next_cursor
+        ordering = cursor_ordering("created_at", "id", True)
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(token[:-2] + ("AA" if not token.endswith("AA") else "BB"), ordering)
+        with self.assertRaises(InvalidCursor):
+            decode_cursor("not-a-cursor", ordering)
+
+    def test_cursor_is_bound_to_its_ordering(self):
+        token = self.page().next_cursor
+        with self.assertRaises(InvalidCursor):
+            self.page(token, descending=False)
+        with self.assertRaises(InvalidCursor):
+            keyset_paginate_queryset(Loan.objects.all(), token, sort_key="amount", tiebreaker="id")
+        self.assertEqual(len(self.page(token)), 2)
+
+    def test_cursor_round_trips_values(self):
+        ordering = cursor_ordering("created_at", "id", False)
+        self.assertEqual(ordering, "created_at,id")
+        direction, sort_value, tiebreaker = decode_cursor(encode_cursor("prev", BASE, 7, ordering), ordering)
+        self.assertEqual((direction, tiebreaker), ("prev", 7))
+        self.assertEqual(sort_value, BASE.replace(tzinfo=None))
+
+    def test_queryset_pagination_matches(self):
+        first = keyset_paginate_queryset(Loan.objects.all(), sort_key="created_at", tiebreaker="id", per_page=3)
+        second = keyset_paginate_queryset(
+            Loan.objects.all(), token=first.next_cursor, sort_key="created_at", tiebreaker="id", per_page=3,
+        )
+        self.assertEqual(len(first) + len(second), len(self.loans))
+        self.assertFalse(second.has_next)
+
+    def test_search_condition(self):
+        self.assertEqual(search_condition(("a", "b"), "  "), (None, []))
+        sql, params = search_condition(("a", "b"), " x ")
+        self.assertEqual(sql, "(a LIKE %s OR b LIKE %s)")
+        self.assertEqual(params, ["%x%", "%x%"])
+
+    def test_list_search_runs_on_the_server(self):
+        set_session(self.client, user_id=self.member.pk, role="admin")
+        response = self.client.get(reverse("list_loans"), {"q": "reason 3"})
+        self.assertEqual([loan["id"] for loan in response.context["loans"]], [self.loans[3].pk])
+        self.assertEqual(response.context["search"], "reason 3")
+
+
+class ApprovalHelperTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Investment, InvestmentSignature)
+
+    def test_parse_ids_keeps_positive_integers_once(self):
+        self.assertEqual(parse_ids(["3", 1, "3", "x", "-2", "", "1.5", 7]), [3, 1, 7])
+        self.assertEqual(parse_ids([]), [])
+
+    def test_lock_pending_returns_only_pending_rows(self):
+        pending = Investment.objects.create(user_id=1, amount=10, investment_date="2025-01-01")
+        done = Investment.objects.create(user_id=1, amount=20, investment_date="2025-01-01", approved=True)
+        with connection.cursor() as cursor:
+            rows = lock_pending(
+                cursor, "investments", [pending.pk, done.pk, 999], "approved = FALSE", columns=("id", "amount"),
+            )
+            self.assertEqual(lock_pending(cursor, "investments", [], "approved = FALSE"), [])
+        self.assertEqual([row[0] for row in rows], [pending.pk])
+
+    def test_insert_signatures_writes_one_row_per_id(self):
+        with connection.cursor() as cursor:
+            self.assertEqual(insert_signatures(cursor, "investment_signatures", "investment_id", [4, 5], 9), 2)
+            self.assertEqual(insert_signatures(cursor, "investment_signatures", "investment_id", [], 9), 0)
+        self.assertEqual(
+            sorted(InvestmentSignature.objects.values_list("investment_id", "signatory_id")), [(4, 9), (5, 9)]
+        )
+
+
+class DeclaredIndexTests(UnmanagedTablesMixin, TransactionTestCase):
+    # Schema changes: SQLite refuses them inside TestCase's transaction.
+    unmanaged_models = (Loan, LoanSignature)
+
+    def setUp(self):
+        # create_model() adds the declared indexes; start from bare tables.
+        self.migrate(drop_declared_indexes("loans", "Loan", "LoanSignature"))
+
+    def drop(self, model, *indexes):
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(model, index)
+
+    def index_names(self, model):
+        return set(live_indexes(model._meta.db_table))
+
+    def migrate(self, step):
+        with connection.schema_editor() as editor:
+            step(apps, editor)
+
+    def test_migration_creates_only_uncovered_indexes(self):
+        # A hand-made index on (status, id) already serves loans_status_idx
+        hand_made = Index(fields=["status", "id"], name="loans_status_by_hand")
+        with connection.schema_editor() as editor:
+            editor.add_index(Loan, hand_made)
+
+        self.migrate(create_declared_indexes("loans", "Loan", "LoanSignature"))
+        declared = {index.name for model in self.unmanaged_models for index in model._meta.indexes}
+        self.assertEqual(
+            declared - self.index_names(Loan) - self.index_names(LoanSignature), {"loans_status_idx"}
+        )
+
+        self.migrate(drop_declared_indexes("loans", "Loan", "LoanSignature"))
+        self.assertEqual(self.index_names(Loan) & declared, set())
+        self.assertIn("loans_status_by_hand", self.index_names(Loan))
+        self.drop(Loan, hand_made)
+
+    def test_check_indexes_reports_and_creates_missing_indexes(self):
+        self.migrate(create_declared_indexes("loans", "Loan", "LoanSignature"))
+        self.drop(Loan, next(i for i in Loan._meta.indexes if i.name == "loans_status_idx"))
+
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, "1 expected index(es) missing"):
+            call_command("check_indexes", stdout=out)
+        self.assertIn("loans: missing loans_status_idx (status)", out.getvalue())
+        self.assertIn("loan_signatures: ok", out.getvalue())
+
+        call_command("check_indexes", "--create", stdout=StringIO())
+        self.assertIn("loans_status_idx", self.index_names(Loan))
+        call_command("check_indexes", stdout=StringIO())
+
+
+@override_settings(
+    DYNAMIC_DATATB={"job": "apps.jobs.models.Job", "gone": "apps.pages.models.Product"},
+    DYNAMIC_API={"jobs": "apps.jobs.models.Job"},
+)
+class ModelRegistryTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(registry.MODEL_REGISTRY, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_ready_builds_the_registry(self):
+        with mock.patch.object(registry, "build_registry") as build:
+            apps.get_app_config("common").ready()
+        build.assert_called_once_with()
+
+    def test_configured_models_resolve_once(self):
+        registry.build_registry()
+        self.assertEqual(list(registry.MODEL_REGISTRY), ["apps.jobs.models.Job"])
+
+        info = registry.datatb_model("job")
+        self.assertIs(info.model, Job)
+        self.assertEqual(info.db_fields, [f.name for f in Job._meta.fields])
+        self.assertEqual(info.choices, {"status": Job.STATUS_CHOICES})
+        self.assertIn("total", info.integer_fields)
+        self.assertIn("started_at", info.date_time_fields)
+        self.assertIn("kind", info.text_fields)
+
+        with mock.patch.object(registry, "import_string") as import_string:
+            self.assertIs(registry.model_info("apps.jobs.models.Job"), info)
+        import_string.assert_not_called()
+
+    def test_unknown_models_are_none(self):
+        registry.build_registry()
+        self.assertIsNone(registry.datatb_model("gone"))  # Product was deleted
+        self.assertIsNone(registry.datatb_model("nope"))  # not configured
+        self.assertIsNone(registry.model_info("apps.nope.models.Nope"))
+        self.assertNotIn("apps.nope.models.Nope", registry.MODEL_REGISTRY)
+
+
+@override_settings(DB_CONN_WARMUP=True)
+class WarmUpConnectionsTests(TestCase):
+    def setUp(self):
+        # The test database does not keep connections; the live one does.
+        patcher = mock.patch.dict(connection.settings_dict, {"CONN_MAX_AGE": 60})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def unreachable(self):
+        return mock.patch.object(
+            BaseDatabaseWrapper, "ensure_connection", side_effect=OperationalError("connection refused"),
+        )
+
+    def test_failure_is_logged_not_raised(self):
+        with self.unreachable(), self.assertLogs("apps.common.db", "WARNING") as logs:
+            warm_up_connections()
+        self.assertIn("Database warm-up failed for 'default': connection refused", logs.output[0])
+
+    def test_wsgi_app_loads_with_the_database_down(self):
+        with self.unreachable(), self.assertLogs("apps.common.db", "WARNING"):
+            wsgi = runpy.run_path(str(settings.BASE_DIR / "config" / "wsgi.py"))
+        self.assertTrue(callable(wsgi["application"]))
+
+    def test_skipped_without_persistent_connections(self):
+        connection.settings_dict["CONN_MAX_AGE"] = 0
+        with mock.patch.object(BaseDatabaseWrapper, "ensure_connection") as ensure:
+            warm_up_connections()
+        ensure.assert_not_called()
+
+
+class SettingsTests(TestCase):
+    def load_settings(self, **env):
+        with mock.patch.dict(os.environ, env):
+            return runpy.run_path(str(settings.BASE_DIR / "config" / "settings.py"))
+
+    def test_conditional_get_needs_a_shared_cache(self):
+        for backend in ("django.core.cache.backends.locmem.LocMemCache", "django.core.cache.backends.dummy.DummyCache"):
+            with self.subTest(backend=backend), self.assertRaises(ImproperlyConfigured):
+                self.load_settings(CONDITIONAL_GET="True", CACHE_BACKEND=backend)
+
+        shared = "django.core.cache.backends.db.DatabaseCache"
+        self.assertTrue(self.load_settings(CONDITIONAL_GET="True", CACHE_BACKEND=shared)["CONDITIONAL_GET"])
+
+    def test_session_mode_picks_the_engine(self):
+        for mode, engine in (
+            ("db", "django.contrib.sessions.backends.db"),
+            ("cached_db", "django.contrib.sessions.backends.cached_db"),
+            ("cache", "django.contrib.sessions.backends.cache"),
+            ("signed_cookies", "django.contrib.sessions.backends.signed_cookies"),
+        ):
+            with self.subTest(mode=mode):
+                self.assertEqual(self.load_settings(SESSION_MODE=mode)["SESSION_ENGINE"], engine)
+
+    def test_jobs_run_inline_unless_a_worker_is_configured(self):
+        env = {k: v for k, v in os.environ.items() if k != "JOBS_RUN_INLINE"}
+        with mock.patch.dict(os.environ, env, clear=True), mock.patch("dotenv.load_dotenv"):
+            self.assertTrue(self.load_settings()["JOBS_RUN_INLINE"])
+        self.assertFalse(self.load_settings(JOBS_RUN_INLINE="False")["JOBS_RUN_INLINE"])
+
+    def test_unknown_session_mode_is_refused(self):
+        for mode in ("redis", "DB", ""):
+            with self.subTest(mode=mode), self.assertRaisesMessage(ImproperlyConfigured, "SESSION_MODE"):
+                self.load_settings(SESSION_MODE=mode)
+
+
+class ServeMediaTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        for name in ("slip.pdf", "scan.jpg", "page.html", "logo.svg", "blob"):
+            with open(os.path.join(self.media_root, name), "wb") as f:
+                f.write(b"0123456789")
+
+    def serve(self, name, **headers):
+        with self.settings(MEDIA_ROOT=self.media_root, MEDIA_ACCEL_REDIRECT=False):
+            return serve_media(RequestFactory().get("/", **headers), name)
+
+    def test_only_images_and_pdfs_are_shown_inline(self):
+        for name, inline in (("slip.pdf", True), ("scan.jpg", True), ("page.html", False),
+                             ("logo.svg", False), ("blob", False)):
+            with self.subTest(name=name):
+                disposition = self.serve(name)["Content-Disposition"]
+                self.assertEqual(disposition.startswith("inline"), inline)
+                self.assertEqual(disposition.startswith("attachment"), not inline)
+
+    def test_single_range(self):
+        response = self.serve("slip.pdf", HTTP_RANGE="bytes=2-4")
+        self.assertEqual((response.status_code, response["Content-Range"]), (206, "bytes 2-4/10"))
+        self.assertEqual(b"".join(response.streaming_content), b"234")
+        self.assertEqual(self.serve("slip.pdf", HTTP_RANGE="bytes=20-").status_code, 416)
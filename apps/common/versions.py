@@ -0,0 +1,68 @@
+# apps/common/versions.py
+
+"""
+Version tokens for conditional GETs.
+
+A scope (one model, or one page's configuration) has a random token and a
+modification time in the cache. Write paths bump the token; read paths turn
+the tokens into an ETag / Last-Modified without touching the database, so an
+unchanged poll is answered with 304 before any query runs.
+
+The cache must be shared by all workers (CACHE_BACKEND) for the tokens to
+be consistent across processes; settings refuse CONDITIONAL_GET otherwise,
+and without it the ETag / Last-Modified functions return None, which turns
+`condition()` into a no-op. Tokens also expire after VERSION_TTL seconds, so
+a bump lost by the cache delays a change by at most that long.
+"""
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+VERSION_CACHE_KEY = "versions:{}"
+VERSION_TTL = 300  # seconds
+
+
+def model_scope(model):
+    return f"model:{model._meta.label_lower}"
+
+
+def get_version(scope):
+    """(token, modified) for a scope, created on first use."""
+    key = VERSION_CACHE_KEY.format(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, (uuid.uuid4().hex, timezone.now().replace(microsecond=0)), VERSION_TTL)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*scopes):
+    """Marks scopes as changed; every ETag built from them becomes stale."""
+    now = timezone.now().replace(microsecond=0)
+    for scope in scopes:
+        cache.set(VERSION_CACHE_KEY.format(scope), (uuid.uuid4().hex, now), VERSION_TTL)
+
+
+def request_etag(request, *scopes):
+    """
+    ETag for a GET of `request` over the given scopes. Varies with the full
+    URL and the session/CSRF cookies, so a cached page is never replayed to
+    another user or with a rotated CSRF token. Reads cookies, not the
+    session, to stay query-free. None when CONDITIONAL_GET is off.
+    """
+    if not settings.CONDITIONAL_GET:
+        return None
+    parts = [request.get_full_path()]
+    parts += [request.COOKIES.get(settings.SESSION_COOKIE_NAME, ''), request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')]
+    parts += [get_version(scope)[0] for scope in scopes]
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+def last_modified(*scopes):
+    if not settings.CONDITIONAL_GET:
+        return None
+    return max(get_version(scope)[1] for scope in scopes)
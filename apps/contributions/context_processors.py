@@ -1,11 +1,32 @@
+from django.core.cache import cache
 from django.db import connection
 
+from apps.common.versions import bump_version
+
+UNAPPROVED_COUNT_CACHE_KEY = "contributions:unapproved_count"
+UNAPPROVED_COUNT_TTL = 60  # seconds; writes invalidate explicitly
+# Version scope of pages showing the badge, for their ETags
+UNAPPROVED_COUNT_SCOPE = "contributions:unapproved_count"
+
+
+def invalidate_unapproved_contributions_count():
+    """Drops the cached badge count after a contribution's approval state changes."""
+    cache.delete(UNAPPROVED_COUNT_CACHE_KEY)
+    bump_version(UNAPPROVED_COUNT_SCOPE)
+
+
 def unapproved_contributions_count(request):
     count = 0
-    with connection.cursor() as cursor:
-        cursor.execute("SELECT COUNT(*) FROM contributions WHERE approved = 0")
-        count = cursor.fetchone()[0]
-    
+
+    # Anonymous pages (login, register) never show the badge.
+    if request.session.get("user_id"):
+        count = cache.get(UNAPPROVED_COUNT_CACHE_KEY)
+        if count is None:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT COUNT(*) FROM contributions WHERE approved = 0")
+                count = cursor.fetchone()[0]
+            cache.set(UNAPPROVED_COUNT_CACHE_KEY, count, UNAPPROVED_COUNT_TTL)
+
     return {
         'unapproved_contributions_count': count
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,302 @@
+# apps/contributions/evidence.py
+
+"""
+Content-addressed storage for contribution evidence.
+
+An upload is hashed while it is streamed to a temp file next to the store,
+then renamed into `evidence/ab/cd/<sha256><ext>`. Identical files map to the
+same path, so a re-uploaded bank slip costs one hash and no extra disk.
+`EvidenceReference` rows tie contributions to blobs; `manage.py gc_evidence`
+removes blobs nothing refers to any more.
+
+Large files can also arrive as a resumable upload (`EvidenceUpload`): chunks
+are written at their offset into the upload's temp file, and completing it
+moves that file into the store the same way, without another copy.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import uuid
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from apps.contributions.models import EvidenceBlob, EvidenceReference, EvidenceUpload
+
+EVIDENCE_DIR = "evidence"
+TMP_DIR = "tmp"  # inside EVIDENCE_DIR, so the final rename stays on one filesystem
+HASH_CHUNK_SIZE = 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # chunk size suggested to resumable-upload clients
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+# Bank slips and receipts. Anything else (HTML, SVG, ...) could run script
+# when served back from our origin.
+ALLOWED_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".pdf")
+
+
+def _extension(filename):
+    """
+    Lowercase extension of an evidence file name. Raises ValueError unless it
+    is one of ALLOWED_EXTENSIONS.
+    """
+    # Kept on the stored name: templates tell images from PDFs by it, and the
+    # media server derives the Content-Type from it.
+    ext = os.path.splitext(filename or "")[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise ValueError("Evidence must be a PNG, JPG, GIF or PDF file.")
+    return ext
+
+
+def _root():
+    return os.path.join(settings.MEDIA_ROOT, EVIDENCE_DIR)
+
+
+def _tmp_dir():
+    path = os.path.join(_root(), TMP_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _hash_file(path):
+    """(sha256 hex, size) of a file on disk."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _spool(upload):
+    """
+    Copies the upload into a temp file inside the store while hashing it.
+    Uploads Django already spooled to disk are hashed in place and moved.
+    Returns (temp path, sha256 hex, size).
+    """
+    if hasattr(upload, "temporary_file_path"):
+        source = upload.temporary_file_path()
+        sha256, size = _hash_file(source)
+        fd, tmp_path = tempfile.mkstemp(dir=_tmp_dir())
+        os.close(fd)
+        # A rename when the upload dir shares the filesystem, a copy otherwise.
+        shutil.move(source, tmp_path)
+        return tmp_path, sha256, size
+
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=_tmp_dir(), delete=False) as tmp:
+        for chunk in upload.chunks():
+            digest.update(chunk)
+            size += len(chunk)
+            tmp.write(chunk)
+    return tmp.name, digest.hexdigest(), size
+
+
+def store_evidence(upload):
+    """
+    Stores an uploaded file and returns its EvidenceBlob (existing one for
+    duplicates). Raises ValueError for a file type that is not allowed.
+    """
+    ext = _extension(upload.name)
+    tmp_path, sha256, size = _spool(upload)
+    return _store(tmp_path, sha256, size, ext)
+
+
+def _store(tmp_path, sha256, size, ext):
+    """Moves a hashed temp file into the store (or drops it for a duplicate)."""
+    rel_path = f"{EVIDENCE_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+    full_path = os.path.join(settings.MEDIA_ROOT, rel_path)
+
+    # Record (or touch) the blob before looking at the file, so gc_evidence,
+    # which only removes blobs unused for its whole grace period, cannot
+    # delete a file this upload is about to rely on.
+    now = timezone.now()
+    while True:
+        try:
+            with transaction.atomic():
+                blob, created = EvidenceBlob.objects.get_or_create(
+                    sha256=sha256, ext=ext,
+                    defaults={"path": rel_path, "size": size, "last_used_at": now},
+                )
+        except IntegrityError:
+            continue  # Same file stored concurrently by another request; use its row.
+        # The touch waits for a collect_garbage() holding the row. Touching
+        # nothing means it removed the blob and its file: store it afresh.
+        if created or EvidenceBlob.objects.filter(pk=blob.pk).update(last_used_at=now):
+            break
+
+    try:
+        if os.path.exists(full_path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.chmod(tmp_path, settings.FILE_UPLOAD_PERMISSIONS or 0o644)
+            # Atomic: readers see either no file or the complete one.
+            os.replace(tmp_path, full_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return blob
+
+
+def attach_evidence(contribution_id, blob):
+    """Points a contribution at a blob, replacing any previous reference."""
+    EvidenceReference.objects.update_or_create(
+        contribution_id=contribution_id, defaults={"blob": blob}
+    )
+
+
+def detach_evidence(contribution_id):
+    EvidenceReference.objects.filter(contribution_id=contribution_id).delete()
+
+
+def start_upload(user_id, filename, size):
+    """Opens a resumable upload of `size` bytes. Raises ValueError for a bad size or file type."""
+    _extension(filename)
+    if size <= 0 or size > MAX_UPLOAD_SIZE:
+        raise ValueError(f"File size must be between 1 byte and {MAX_UPLOAD_SIZE // (1024 * 1024)} MB.")
+    upload = EvidenceUpload.objects.create(
+        token=uuid.uuid4().hex, user_id=user_id, filename=os.path.basename(filename)[:255], size=size,
+    )
+    # Created up front so chunks can be written at any offset.
+    open(upload_path(upload), "wb").close()
+    return upload
+
+
+def upload_path(upload):
+    return os.path.join(_tmp_dir(), f"upload-{upload.token}")
+
+
+def append_chunk(upload, offset, stream, length):
+    """
+    Writes `length` bytes read from `stream` at `offset` and advances the
+    upload. Returns the new offset, or None when `offset` is not where the
+    upload stands (a retried or out-of-order chunk); the caller then reports
+    the current offset so the client resends only what is missing.
+    Raises ValueError for chunks past the declared size or cut short.
+    """
+    if length <= 0 or offset + length > upload.size:
+        raise ValueError("Chunk is empty or goes past the declared file size.")
+    if offset != upload.offset:
+        return None
+
+    # Concurrent retries of the same chunk write the same bytes; only one of
+    # them wins the offset update below, the other is reported as a conflict.
+    written = 0
+    with open(upload_path(upload), "r+b") as f:
+        f.seek(offset)
+        while written < length:
+            data = stream.read(min(HASH_CHUNK_SIZE, length - written))
+            if not data:
+                break
+            f.write(data)
+            written += len(data)
+    if written != length:
+        raise ValueError("Chunk was cut short; resend it.")
+
+    advanced = EvidenceUpload.objects.filter(pk=upload.pk, offset=offset).update(
+        offset=offset + length, updated_at=timezone.now()
+    )
+    if not advanced:
+        return None
+    upload.offset = offset + length
+    return upload.offset
+
+
+def complete_upload(upload):
+    """
+    Moves a fully received upload into the store and returns its blob.
+    Safe to repeat, including concurrently: the upload row is locked while
+    the file is moved, so a second complete waits and then returns the blob
+    the first one produced instead of finding the temp file gone.
+    """
+    with transaction.atomic():
+        locked = EvidenceUpload.objects.select_for_update().get(pk=upload.pk)
+        if locked.blob_id is None:
+            if locked.offset != locked.size:
+                raise ValueError("Upload is not complete yet.")
+
+            tmp_path = upload_path(locked)
+            with open(tmp_path, "r+b") as f:
+                f.truncate(locked.size)  # drop any tail left by a conflicting chunk
+            sha256, size = _hash_file(tmp_path)
+            locked.blob = _store(tmp_path, sha256, size, _extension(locked.filename))
+            EvidenceUpload.objects.filter(pk=locked.pk).update(blob=locked.blob, updated_at=timezone.now())
+
+    upload.offset, upload.blob = locked.offset, locked.blob
+    return upload.blob
+
+
+def claim_upload(user_id, token):
+    """
+    Blob of a completed upload owned by `user_id`, consuming the upload, or
+    None if there is no such upload.
+    """
+    upload = EvidenceUpload.objects.filter(
+        token=token, user_id=user_id, blob__isnull=False
+    ).select_related("blob").first()
+    if upload is None:
+        return None
+    upload.delete()
+    return upload.blob
+
+
+def _collect_blob(blob, cutoff):
+    """
+    Deletes one unused blob and its file; False if it was reused meanwhile.
+    The row stays locked until the file is gone, so a concurrent _store()
+    either touches the blob first (and it survives) or waits and sees it
+    deleted, never a row whose file is about to disappear.
+    """
+    with transaction.atomic():
+        locked = EvidenceBlob.objects.select_for_update().filter(pk=blob.pk, last_used_at__lt=cutoff).first()
+        if locked is None or EvidenceReference.objects.filter(blob_id=blob.pk).exists():
+            return False
+        EvidenceBlob.objects.filter(pk=blob.pk).delete()
+        try:
+            os.remove(os.path.join(settings.MEDIA_ROOT, blob.path))
+        except FileNotFoundError:
+            pass
+    return True
+
+
+def collect_garbage(grace, dry_run=False):
+    """
+    Deletes blobs with no references whose last use is older than `grace`
+    (a timedelta), and uploads and temp files abandoned for as long. Returns
+    (blobs removed, bytes freed, uploads removed, temp files removed).
+    """
+    cutoff = timezone.now() - grace
+
+    stale_uploads = EvidenceUpload.objects.filter(updated_at__lt=cutoff)
+    if dry_run:
+        uploads_removed = stale_uploads.count()
+    else:
+        # First, so blobs only these uploads pointed at become collectable.
+        uploads_removed, _ = stale_uploads.delete()
+
+    removed = freed = 0
+
+    candidates = EvidenceBlob.objects.filter(references__isnull=True, last_used_at__lt=cutoff)
+    for blob in candidates.iterator():
+        if not dry_run and not _collect_blob(blob, cutoff):
+            continue
+        removed += 1
+        freed += blob.size
+
+    tmp_removed = 0
+    tmp_dir = os.path.join(_root(), TMP_DIR)
+    if os.path.isdir(tmp_dir):
+        for name in os.listdir(tmp_dir):
+            path = os.path.join(tmp_dir, name)
+            if os.path.getmtime(path) < cutoff.timestamp():
+                if not dry_run:
+                    os.remove(path)
+                tmp_removed += 1
+
+    return removed, freed, uploads_removed, tmp_removed
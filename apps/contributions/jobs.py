@@ -0,0 +1,37 @@
+# apps/contributions/jobs.py
+
+from django.db import connection, transaction
+
+from apps.common.approvals import lock_pending
+from apps.contributions.context_processors import invalidate_unapproved_contributions_count
+from apps.jobs.queue import handler
+from apps.pages import summary
+
+
+def approve_contributions(ids):
+    """Approves the pending contributions among `ids`; returns the ids that changed."""
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            pending_rows = lock_pending(
+                cursor, "contributions", ids, "approved = 0",
+                columns=("id", "amount", "contribution_date"),
+            )
+            changed_ids = [row[0] for row in pending_rows]
+
+            if changed_ids:
+                placeholders = ", ".join(["%s"] * len(changed_ids))
+                cursor.execute(
+                    f"UPDATE contributions SET approved = 1 WHERE id IN ({placeholders})",
+                    changed_ids,
+                )
+
+        summary.record_approval("contributions", [(amount, on_date) for _, amount, on_date in pending_rows])
+
+    if changed_ids:
+        invalidate_unapproved_contributions_count()
+    return changed_ids
+
+
+@handler("contributions.approve")
+def approve_contributions_job(ids, job):
+    return approve_contributions(ids)
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.contributions.evidence import collect_garbage
+
+
+class Command(BaseCommand):
+    help = "Deletes stored evidence files that no contribution references any more."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours", type=float, default=24,
+            help="Keep unreferenced blobs and uploads used within this many hours (protects in-flight uploads).",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Report what would be deleted.")
+
+    def handle(self, *args, **options):
+        removed, freed, uploads_removed, tmp_removed = collect_garbage(
+            timedelta(hours=options["grace_hours"]), dry_run=options["dry_run"]
+        )
+        verb = "Would remove" if options["dry_run"] else "Removed"
+        self.stdout.write(
+            f"{verb} {removed} blob(s) ({freed / (1024 * 1024):.1f} MiB), {uploads_removed} abandoned upload(s)"
+            f" and {tmp_removed} temp file(s)."
+        )
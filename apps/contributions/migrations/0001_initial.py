@@ -0,0 +1,46 @@
+# Generated by Django 4.2.9 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+from apps.common.indexes import create_declared_indexes, drop_declared_indexes
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Contribution',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('type', models.CharField(max_length=50)),
+                ('contribution_date', models.DateTimeField()),
+                ('period', models.DateField(blank=True, null=True)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('evidence', models.CharField(blank=True, max_length=255, null=True)),
+                ('approved', models.BooleanField(default=False)),
+                ('created_by', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'contributions',
+                'managed': False,
+                'indexes': [
+                    models.Index(fields=['approved'], name='contrib_approved_idx'),
+                    models.Index(fields=['user_id', 'contribution_date'], name='contrib_user_date_idx'),
+                    models.Index(fields=['contribution_date'], name='contrib_date_idx'),
+                ],
+            },
+        ),
+        # Unmanaged models get no DDL from Django; create the declared indexes here
+        migrations.RunPython(
+            create_declared_indexes('contributions', 'Contribution'),
+            drop_declared_indexes('contributions', 'Contribution'),
+        ),
+    ]
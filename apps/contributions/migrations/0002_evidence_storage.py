@@ -0,0 +1,45 @@
+# Generated by Django 4.2.9 on 2026-10-18 11:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contributions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvidenceBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64)),
+                ('ext', models.CharField(blank=True, default='', max_length=10)),
+                ('path', models.CharField(max_length=255, unique=True)),
+                ('size', models.BigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'evidence_blobs',
+            },
+        ),
+        migrations.CreateModel(
+            name='EvidenceReference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contribution_id', models.IntegerField(unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='references', to='contributions.evidenceblob')),
+            ],
+            options={
+                'db_table': 'evidence_references',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='evidenceblob',
+            constraint=models.UniqueConstraint(fields=('sha256', 'ext'), name='evidence_blob_content_uniq'),
+        ),
+    ]
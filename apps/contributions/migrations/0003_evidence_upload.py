@@ -0,0 +1,31 @@
+# Generated by Django 4.2.9 on 2026-10-18 11:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contributions', '0002_evidence_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvidenceUpload',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=32, unique=True)),
+                ('user_id', models.IntegerField()),
+                ('filename', models.CharField(max_length=255)),
+                ('size', models.BigIntegerField()),
+                ('offset', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('blob', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='uploads', to='contributions.evidenceblob')),
+            ],
+            options={
+                'db_table': 'evidence_uploads',
+            },
+        ),
+    ]
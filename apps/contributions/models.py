@@ -1,3 +1,76 @@
 from django.db import models
 
-# Create your models here.
+
+class Contribution(models.Model):
+    """Unmanaged mapping of the `contributions` table, declaring its indexes."""
+    user_id = models.IntegerField()
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    type = models.CharField(max_length=50)
+    contribution_date = models.DateTimeField()
+    period = models.DateField(null=True, blank=True)
+    description = models.TextField(null=True, blank=True)
+    evidence = models.CharField(max_length=255, null=True, blank=True)
+    approved = models.BooleanField(default=False)
+    created_by = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        managed = False
+        db_table = "contributions"
+        indexes = [
+            # badge count: WHERE approved = 0
+            models.Index(fields=["approved"], name="contrib_approved_idx"),
+            # member view: WHERE user_id = %s ORDER BY contribution_date
+            models.Index(fields=["user_id", "contribution_date"], name="contrib_user_date_idx"),
+            # admin view / keyset seek: ORDER BY contribution_date, id
+            models.Index(fields=["contribution_date"], name="contrib_date_idx"),
+        ]
+
+
+class EvidenceBlob(models.Model):
+    """One stored evidence file, addressed by the SHA-256 of its content."""
+    sha256 = models.CharField(max_length=64)
+    ext = models.CharField(max_length=10, blank=True, default="")
+    path = models.CharField(max_length=255, unique=True)  # relative to MEDIA_ROOT
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Bumped whenever an upload dedupes onto this blob; GC waits a grace period after it.
+    last_used_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "evidence_blobs"
+        constraints = [
+            models.UniqueConstraint(fields=["sha256", "ext"], name="evidence_blob_content_uniq"),
+        ]
+
+    def __str__(self):
+        return self.path
+
+
+class EvidenceReference(models.Model):
+    """Links a contribution to the blob holding its evidence."""
+    contribution_id = models.IntegerField(unique=True)
+    blob = models.ForeignKey(EvidenceBlob, on_delete=models.PROTECT, related_name="references")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "evidence_references"
+
+
+class EvidenceUpload(models.Model):
+    """
+    A resumable evidence upload in progress. Chunks are appended to
+    `evidence/tmp/upload-<token>` until `offset` reaches `size`; completing
+    the upload moves the file into the store and sets `blob`.
+    """
+    token = models.CharField(max_length=32, unique=True)
+    user_id = models.IntegerField()
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)  # bytes received so far
+    blob = models.ForeignKey(EvidenceBlob, null=True, blank=True, on_delete=models.SET_NULL, related_name="uploads")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "evidence_uploads"
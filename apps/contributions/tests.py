@@ -1,3 +1,230 @@
-from django.test import TestCase
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone as dj_timezone
+
+from apps.accounts.models import Member
+from apps.common.testing import UnmanagedTablesMixin, set_session
+from apps.contributions import evidence
+from apps.contributions.context_processors import unapproved_contributions_count
+from apps.contributions.jobs import approve_contributions
+from apps.contributions.models import Contribution, EvidenceBlob, EvidenceUpload
+from apps.jobs.queue import enqueue
+
+
+class ContributionsDataTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Member, Contribution)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = Member.objects.create(username="alice", email="a@example.com", password="x", member_id="M1")
+        cls.bob = Member.objects.create(username="bob", email="b@example.com", password="x", member_id="M2")
+        when = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        for user, amount in ((cls.alice, 100), (cls.alice, 200), (cls.bob, 300)):
+            Contribution.objects.create(
+                user_id=user.pk, amount=amount, type="monthly", contribution_date=when, created_at=when,
+            )
+
+    def fetch(self):
+        return self.client.get(reverse("contributions_data"), {"draw": 1, "start": 0, "length": 10})
+
+    def test_anonymous_is_refused(self):
+        self.assertEqual(self.fetch().status_code, 403)
+
+    def test_member_sees_only_own_rows(self):
+        set_session(self.client, user_id=self.alice.pk, role="member", is_staff=False)
+        data = self.fetch().json()
+        self.assertEqual(data["recordsTotal"], 2)
+        self.assertEqual({row["user_id"] for row in data["data"]}, {self.alice.pk})
+
+    def test_admin_sees_all_rows(self):
+        for session in ({"role": "admin"}, {"role": "super_admin"}, {"role": "member", "is_staff": True}):
+            with self.subTest(**session):
+                set_session(self.client, user_id=self.bob.pk, **session)
+                data = self.fetch().json()
+                self.assertEqual(data["recordsTotal"], 3)
+
+
+class ApproveContributionsJobTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Member, Contribution)
+
+    def test_only_pending_rows_change(self):
+        when = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        pending = Contribution.objects.create(user_id=1, amount=50, type="monthly", contribution_date=when)
+        done = Contribution.objects.create(user_id=1, amount=70, type="monthly", contribution_date=when, approved=True)
+
+        with self.settings(JOBS_RUN_INLINE=True):
+            job = enqueue("contributions.approve", [pending.pk, done.pk])
+        self.assertEqual(job.result, {"changed": 1, "changed_ids": [pending.pk]})
+        self.assertTrue(Contribution.objects.get(pk=pending.pk).approved)
+
+        self.assertEqual(approve_contributions([pending.pk, done.pk]), [])
+
+
+class UnapprovedCountBadgeTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Contribution,)
+
+    def setUp(self):
+        cache.clear()
+        when = datetime(2025, 1, 1, tzinfo=timezone.utc)
+        self.pending = [
+            Contribution.objects.create(user_id=1, amount=50, type="monthly", contribution_date=when)
+            for _ in range(2)
+        ]
+
+    def badge(self, **session):
+        request = RequestFactory().get("/")
+        request.session = session
+        return unapproved_contributions_count(request)["unapproved_contributions_count"]
+
+    def test_count_is_cached_until_an_approval(self):
+        self.assertEqual(self.badge(user_id=1), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.badge(user_id=1), 2)
+
+        approve_contributions([self.pending[0].pk])
+        self.assertEqual(self.badge(user_id=1), 1)
+
+    def test_anonymous_pages_skip_the_count(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.badge(), 0)
+
+
+class EvidenceTestCase(TestCase):
+    """Runs against a throwaway MEDIA_ROOT."""
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = self.settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def full_path(self, blob):
+        return os.path.join(settings.MEDIA_ROOT, blob.path)
+
+
+class EvidenceStoreTests(EvidenceTestCase):
+    def test_identical_files_share_one_blob(self):
+        first = evidence.store_evidence(SimpleUploadedFile("slip.PDF", b"%PDF-1 same"))
+        second = evidence.store_evidence(SimpleUploadedFile("other.pdf", b"%PDF-1 same"))
+        self.assertEqual(first.pk, second.pk)
+        self.assertTrue(first.path.endswith(".pdf"))
+        self.assertEqual(EvidenceBlob.objects.count(), 1)
+        with open(self.full_path(first), "rb") as f:
+            self.assertEqual(f.read(), b"%PDF-1 same")
+        # No temp files left behind by the duplicate.
+        self.assertEqual(os.listdir(evidence._tmp_dir()), [])
+
+    def test_only_images_and_pdfs_are_accepted(self):
+        for name in ("page.html", "logo.svg", "noext", "x.pdf.html"):
+            with self.subTest(name=name), self.assertRaises(ValueError):
+                evidence.store_evidence(SimpleUploadedFile(name, b"<script>alert(1)</script>"))
+        with self.assertRaises(ValueError):
+            evidence.start_upload(1, "page.htm", 10)
+        self.assertFalse(EvidenceBlob.objects.exists())
+
+
+class EvidenceGarbageTests(EvidenceTestCase):
+    def store(self, content, name="slip.pdf", age=None):
+        blob = evidence.store_evidence(SimpleUploadedFile(name, content))
+        if age:
+            EvidenceBlob.objects.filter(pk=blob.pk).update(last_used_at=dj_timezone.now() - age)
+        return blob
+
+    def test_collects_only_old_unreferenced_blobs(self):
+        old = self.store(b"old", age=timedelta(days=2))
+        kept = self.store(b"kept", age=timedelta(days=2))
+        evidence.attach_evidence(1, kept)
+        recent = self.store(b"recent")
+        EvidenceUpload.objects.create(token="t" * 32, user_id=1, filename="a.pdf", size=5)
+        EvidenceUpload.objects.update(updated_at=dj_timezone.now() - timedelta(days=2))
+
+        self.assertEqual(evidence.collect_garbage(timedelta(days=1), dry_run=True), (1, 3, 1, 0))
+        self.assertTrue(os.path.exists(self.full_path(old)))
+
+        self.assertEqual(evidence.collect_garbage(timedelta(days=1)), (1, 3, 1, 0))
+        self.assertEqual(set(EvidenceBlob.objects.values_list("pk", flat=True)), {kept.pk, recent.pk})
+        self.assertFalse(os.path.exists(self.full_path(old)))
+        self.assertTrue(os.path.exists(self.full_path(kept)))
+
+    def test_reupload_racing_the_collector_keeps_its_file(self):
+        old = self.store(b"slip", age=timedelta(days=2))
+        get_or_create = EvidenceBlob.objects.get_or_create
+
+        def collected_after_lookup(**kwargs):
+            # The re-upload found the old row, then the collector ran before its touch.
+            found = get_or_create(**kwargs)
+            evidence.collect_garbage(timedelta(days=1))
+            return found
+
+        calls = iter([collected_after_lookup, get_or_create])
+        with mock.patch.object(EvidenceBlob.objects, "get_or_create", side_effect=lambda **kw: next(calls)(**kw)):
+            blob = self.store(b"slip")
+
+        self.assertNotEqual(blob.pk, old.pk)
+        self.assertTrue(EvidenceBlob.objects.filter(pk=blob.pk).exists())
+        with open(self.full_path(blob), "rb") as f:
+            self.assertEqual(f.read(), b"slip")
+
+
+class ChunkedUploadTests(EvidenceTestCase):
+    def setUp(self):
+        super().setUp()
+        set_session(self.client, user_id=5, role="member")
+        response = self.client.post(
+            reverse("start_evidence_upload"), {"filename": "scan.pdf", "size": 10}, content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.token = response.json()["upload_id"]
+        self.url = reverse("evidence_upload", args=[self.token])
+
+    def put(self, offset, data):
+        return self.client.put(f"{self.url}?offset={offset}", data, content_type="application/octet-stream")
+
+    def complete(self):
+        return self.client.post(reverse("complete_evidence_upload", args=[self.token]))
+
+    def test_chunks_resume_from_the_server_offset(self):
+        self.assertEqual(self.put(0, b"01234").json()["offset"], 5)
+
+        # A retried first chunk and a chunk from the future are both refused
+        # with the offset the client has to continue from.
+        for offset in (0, 7):
+            response = self.put(offset, b"567")
+            self.assertEqual((response.status_code, response.json()["offset"]), (409, 5))
+        self.assertEqual(self.put(5, b"567890").status_code, 400)  # past the declared size
+        self.assertEqual(self.complete().status_code, 409)
+
+        self.assertEqual(self.client.get(self.url).json()["offset"], 5)
+        self.assertEqual(self.put(5, b"56789").json()["offset"], 10)
+
+        response = self.complete()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["complete"])
+        blob = EvidenceUpload.objects.get(token=self.token).blob
+        with open(self.full_path(blob), "rb") as f:
+            self.assertEqual(f.read(), b"0123456789")
+
+    def test_concurrent_completes_share_one_blob(self):
+        self.put(0, b"0123456789")
+        upload = EvidenceUpload.objects.get(token=self.token)
+        stale = EvidenceUpload.objects.get(token=self.token)  # read before the first complete
+
+        blob = evidence.complete_upload(upload)
+        # The temp file is gone now; the second complete must not look for it.
+        self.assertEqual(evidence.complete_upload(stale), blob)
+        self.assertEqual(stale.blob_id, blob.pk)
+
+    def test_other_users_cannot_touch_the_upload(self):
+        set_session(self.client, user_id=6)
+        self.assertEqual(self.put(0, b"01234").status_code, 404)
+        self.assertEqual(self.complete().status_code, 404)
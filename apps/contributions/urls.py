@@ -3,10 +3,15 @@ from . import views
 
 urlpatterns = [
     path('contributions', views.contributions_list, name='contributions'),
+    path('contributions/data/', views.contributions_data, name='contributions_data'),
     path("contributions/add/", views.add_contribution, name="add_contribution"),
 
     path('contributions/edit/<int:contribution_id>/', views.edit_contribution, name='edit_contribution'),
     path('contributions/delete/<int:contribution_id>/', views.delete_contribution, name='delete_contribution'),
+    path('contributions/evidence/<int:contribution_id>/', views.contribution_evidence, name='contribution_evidence'),
+    path('uploads/', views.start_evidence_upload, name='start_evidence_upload'),
+    path('uploads/<str:token>/', views.evidence_upload, name='evidence_upload'),
+    path('uploads/<str:token>/complete/', views.complete_evidence_upload, name='complete_evidence_upload'),
     path('contributions/approve-multiple/',views.approve_multiple_contributions, name='approve_multiple_contributions'
     ),
 ]
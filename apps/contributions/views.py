@@ -1,58 +1,187 @@
-import os
 import json
+import os
 from datetime import datetime
 
-from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.contrib.humanize.templatetags.humanize import intcomma
 from django.db import connection, transaction
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.shortcuts import render, redirect
+from django.template.defaultfilters import date as date_filter
+from django.urls import reverse
 from django.views.decorators.http import require_POST
 
+from apps.common.approvals import parse_ids
+from apps.common.db import lock_row
+from apps.common.media import serve_media
+from apps.common.pagination import InvalidCursor, cursor_ordering, encode_cursor, keyset_paginate
+from apps.contributions.context_processors import invalidate_unapproved_contributions_count
+from apps.contributions.evidence import (
+    UPLOAD_CHUNK_SIZE, append_chunk, attach_evidence, claim_upload, complete_upload,
+    detach_evidence, start_upload, store_evidence,
+)
+from apps.contributions.models import EvidenceUpload
+from apps.jobs.queue import enqueue
+from apps.pages import summary
+
+# Columns the contributions table may be ordered by, keyed by the DataTables
+# `columns[i][data]` name so client input never reaches the SQL directly.
+CONTRIBUTION_ORDER_COLUMNS = {
+    "member_id": "u.member_id",
+    "name": "u.first_name",
+    "amount": "c.amount",
+    "type": "c.type",
+    "contribution_date": "c.contribution_date",
+    "period": "c.period",
+    "approved": "c.approved",
+    "created_at": "c.created_at",
+}
+
+CONTRIBUTION_SEARCH_COLUMNS = (
+    "u.member_id", "u.first_name", "u.last_name",
+    "c.type", "c.description",
+)
+
+CONTRIBUTIONS_MAX_PAGE_LENGTH = 100
+
+
 def contributions_list(request):
     """
-    List contributions:
+    Renders the contributions page shell. Rows are loaded page by page
+    from `contributions_data` by DataTables in server-side mode.
+    """
+    return render(request, "contributions/contributions_list.html")
+
+
+def contributions_data(request):
+    """
+    DataTables server-side endpoint for the contributions table.
     - Admin / staff see all contributions
     - Members see only their own contributions
+    Only the requested page is fetched and serialized. When the client passes
+    the `cursor` of a neighbouring page, the page is read with a keyset seek.
     """
-    contributions = []
-
     user_id = request.session.get("user_id")
-    user_role = request.session.get("role")
-    is_staff = request.session.get("is_staff", False)
+    if not user_id:
+        return JsonResponse({"error": "Please log in first."}, status=403)
+    sees_all = (
+        request.session.get("role") in ['admin', 'super_admin']
+        or request.session.get("is_staff")
+    )
+
+    try:
+        draw = int(request.GET.get("draw", 0))
+        start = max(int(request.GET.get("start", 0)), 0)
+        length = int(request.GET.get("length", 10))
+    except ValueError:
+        return JsonResponse({"error": "Invalid paging parameters."}, status=400)
+
+    if length <= 0 or length > CONTRIBUTIONS_MAX_PAGE_LENGTH:
+        length = CONTRIBUTIONS_MAX_PAGE_LENGTH
+
+    where = []
+    params = []
+    if not sees_all:
+        where.append("c.user_id = %s")
+        params.append(user_id)
+
+    from_sql = " FROM contributions c JOIN users u ON c.user_id = u.id"
+    base_where = (" WHERE " + " AND ".join(where)) if where else ""
+
+    search = request.GET.get("search[value]", "").strip()
+    search_where = list(where)
+    search_params = list(params)
+    if search:
+        search_where.append(
+            "(" + " OR ".join(f"{col} LIKE %s" for col in CONTRIBUTION_SEARCH_COLUMNS) + ")"
+        )
+        search_params.extend([f"%{search}%"] * len(CONTRIBUTION_SEARCH_COLUMNS))
+    filtered_where = (" WHERE " + " AND ".join(search_where)) if search_where else ""
+
+    order_column = request.GET.get("order[0][column]")
+    order_name = request.GET.get(f"columns[{order_column}][data]", "")
+    order_sql = CONTRIBUTION_ORDER_COLUMNS.get(order_name, "c.contribution_date")
+    order_dir = "ASC" if request.GET.get("order[0][dir]") == "asc" else "DESC"
 
     with connection.cursor() as cursor:
-        if user_id:  # This logic seems to be swapped, it should be based on role
-            # Admin/Staff view (or if your logic dictates 'all logged-in users')
-            cursor.execute("""
-                SELECT c.id, c.user_id, u.member_id, u.first_name, u.last_name,
-                       c.amount, c.type, c.contribution_date, c.period,
-                       c.description, c.evidence, c.approved,
-                       c.created_by, c.created_at
-                FROM contributions c
-                JOIN users u ON c.user_id = u.id
-                ORDER BY c.contribution_date DESC
-            """)
+        cursor.execute("SELECT COUNT(*)" + from_sql + base_where, params)
+        records_total = cursor.fetchone()[0]
+
+        if search:
+            cursor.execute("SELECT COUNT(*)" + from_sql + filtered_where, search_params)
+            records_filtered = cursor.fetchone()[0]
+        else:
+            records_filtered = records_total
+
+        select_sql = """
+            SELECT c.id, c.user_id, u.member_id, u.first_name, u.last_name,
+                   c.amount, c.type, c.contribution_date, c.period,
+                   c.description, c.evidence, c.approved,
+                   c.created_by, c.created_at
+        """ + from_sql + filtered_where
+
+        # Adjacent pages in the default date ordering seek from the cursor the
+        # previous response handed out; any other jump falls back to OFFSET.
+        keyset_order = order_sql == "c.contribution_date"
+        token = request.GET.get("cursor") if keyset_order else None
+        page = None
+        if token:
+            try:
+                page = keyset_paginate(
+                    cursor, select_sql, search_params,
+                    sort_key="contribution_date", tiebreaker="id",
+                    per_page=length, token=token,
+                    descending=order_dir == "DESC",
+                )
+            except InvalidCursor:
+                page = None
+
+        if page is not None:
+            rows = page.rows
         else:
-            # Member-specific view
-            cursor.execute("""
-                SELECT c.id, c.user_id, u.member_id, u.first_name, u.last_name,
-                       c.amount, c.type, c.contribution_date, c.period,
-                       c.description, c.evidence, c.approved,
-                       c.created_by, c.created_at
-                FROM contributions c
-                JOIN users u ON c.user_id = u.id
-                WHERE c.user_id = %s
-                ORDER BY c.contribution_date DESC
-            """, [user_id])
-
-        columns = [col[0] for col in cursor.description]
-        for row in cursor.fetchall():
-            contributions.append(dict(zip(columns, row)))
-
-    return render(request, "contributions/contributions_list.html", {
-        "contributions": contributions
+            cursor.execute(select_sql + f"""
+                ORDER BY {order_sql} {order_dir}, c.id {order_dir}
+                LIMIT %s OFFSET %s
+            """, search_params + [length, start])
+
+            columns = [col[0] for col in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    next_cursor = previous_cursor = None
+    if keyset_order and rows:
+        ordering = cursor_ordering("contribution_date", "id", order_dir == "DESC")
+        if start + len(rows) < records_filtered:
+            next_cursor = encode_cursor("next", rows[-1]["contribution_date"], rows[-1]["id"], ordering)
+        if start > 0:
+            previous_cursor = encode_cursor("prev", rows[0]["contribution_date"], rows[0]["id"], ordering)
+
+    data = [
+        {
+            "id": c["id"],
+            "user_id": c["user_id"],
+            "member_id": c["member_id"],
+            "name": f"{c['first_name'] or ''} {c['last_name'] or ''}".strip(),
+            "amount": intcomma(c["amount"]),
+            "type": (c["type"] or "").title(),
+            "contribution_date": date_filter(c["contribution_date"], "F d, Y"),
+            "period": date_filter(c["period"], "F d, Y"),
+            "description": c["description"],
+            "evidence": c["evidence"],
+            "approved": bool(c["approved"]),
+            "created_at": date_filter(c["created_at"], "F d, Y"),
+        }
+        for c in rows
+    ]
+
+    return JsonResponse({
+        "draw": draw,
+        "recordsTotal": records_total,
+        "recordsFiltered": records_filtered,
+        "data": data,
+        "start": start,
+        "next_cursor": next_cursor,
+        "previous_cursor": previous_cursor,
     })
 
 
@@ -74,22 +203,29 @@ def add_contribution(request):
         user_id = request.session.get("user_id")
         created_by = request.session.get("user_id")
 
-        evidence_path = None
-        if evidence:
-            evidence_dir = os.path.join(settings.MEDIA_ROOT, "contributions")
-            os.makedirs(evidence_dir, exist_ok=True)
-            evidence_path = f"contributions/{user_id}_{evidence.name}"
-            full_path = os.path.join(settings.MEDIA_ROOT, evidence_path)
-            with open(full_path, "wb+") as dest:
-                for chunk in evidence.chunks():
-                    dest.write(chunk)
+        try:
+            evidence_blob = _submitted_evidence(request, evidence)
+        except EvidenceUpload.DoesNotExist:
+            messages.error(request, "The evidence upload has expired. Please attach the file again.")
+            return render(request, "contributions/add_contribution.html")
+        except ValueError as e:
+            messages.error(request, str(e))
+            return render(request, "contributions/add_contribution.html")
+        evidence_path = evidence_blob.path if evidence_blob else None
 
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO contributions
-                (user_id, amount, type, contribution_date, period, description, evidence, approved, created_by)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, [user_id, amount, ctype, contribution_date, period, description, evidence_path, approved, created_by])
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO contributions
+                    (user_id, amount, type, contribution_date, period, description, evidence, approved, created_by)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, [user_id, amount, ctype, contribution_date, period, description, evidence_path, approved, created_by])
+                contribution_id = cursor.lastrowid
+            if evidence_blob:
+                attach_evidence(contribution_id, evidence_blob)
+            summary.record_amount("contributions", amount, contribution_date, approved)
+        if not approved:
+            invalidate_unapproved_contributions_count()
 
         messages.success(request, "Contribution added successfully.")
         return redirect("contributions")
@@ -98,6 +234,22 @@ def add_contribution(request):
 
 
 
+def _submitted_evidence(request, evidence):
+    """
+    Blob for the evidence sent with a contribution form: a completed chunked
+    upload (`evidence_upload` token) or a plain multipart file. Raises
+    EvidenceUpload.DoesNotExist for an unknown or expired upload token and
+    ValueError for a file type that is not allowed.
+    """
+    token = request.POST.get("evidence_upload")
+    if token:
+        blob = claim_upload(request.session.get("user_id"), token)
+        if blob is None:
+            raise EvidenceUpload.DoesNotExist
+        return blob
+    return store_evidence(evidence) if evidence else None
+
+
 def edit_contribution(request, contribution_id):
     """Edit an existing contribution (admin or owner only)."""
 
@@ -157,27 +309,44 @@ def edit_contribution(request, contribution_id):
         # Evidence handling
         evidence = request.FILES.get("evidence")
         evidence_path = contribution["evidence"]
-
-        if evidence:
-            evidence_dir = os.path.join(settings.MEDIA_ROOT, "contributions")
-            os.makedirs(evidence_dir, exist_ok=True)
-            evidence_path = f"contributions/{contribution['user_id']}_{evidence.name}"
-            full_path = os.path.join(settings.MEDIA_ROOT, evidence_path)
-            with open(full_path, "wb+") as dest:
-                for chunk in evidence.chunks():
-                    dest.write(chunk)
+        try:
+            evidence_blob = _submitted_evidence(request, evidence)
+        except EvidenceUpload.DoesNotExist:
+            messages.error(request, "The evidence upload has expired. Please attach the file again.")
+            return redirect("edit_contribution", contribution_id=contribution_id)
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect("edit_contribution", contribution_id=contribution_id)
+        if evidence_blob:
+            evidence_path = evidence_blob.path
 
         # Update in DB, including the new 'period' column
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                UPDATE contributions
-                SET amount=%s, type=%s, contribution_date=%s, period=%s,
-                    description=%s, evidence=%s, approved=%s
-                WHERE id=%s
-            """, [
-                amount, ctype, contribution_date, period, description,
-                evidence_path, approved, contribution_id
-            ])
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                # An approval or another edit may have landed since the form
+                # was read; the delta comes from the row as it is now.
+                locked = lock_row(cursor, "contributions", contribution_id, ("amount", "contribution_date", "approved"))
+                if not locked:
+                    messages.error(request, "Contribution not found.")
+                    return redirect("contributions")
+                old_amount, old_date, old_approved = locked
+                if session_role != "admin":
+                    approved = old_approved
+                cursor.execute("""
+                    UPDATE contributions
+                    SET amount=%s, type=%s, contribution_date=%s, period=%s,
+                        description=%s, evidence=%s, approved=%s
+                    WHERE id=%s
+                """, [
+                    amount, ctype, contribution_date, period, description,
+                    evidence_path, approved, contribution_id
+                ])
+            if evidence_blob:
+                attach_evidence(contribution_id, evidence_blob)
+            summary.record_amount("contributions", old_amount, old_date, old_approved, sign=-1)
+            summary.record_amount("contributions", amount, contribution_date, approved)
+        if approved != old_approved:
+            invalidate_unapproved_contributions_count()
 
         messages.success(request, "Contribution updated successfully.")
         return redirect("contributions")
@@ -219,28 +388,18 @@ def approve_multiple_contributions(request):
             return JsonResponse({"error": "No contributions selected."}, status=400)
 
         # Validate and sanitize IDs
-        try:
-            valid_ids = [int(i) for i in ids if str(i).isdigit()]
-        except ValueError:
-            return JsonResponse({"error": "Invalid contribution IDs."}, status=400)
+        valid_ids = parse_ids(ids)
 
         if not valid_ids:
             return JsonResponse({"error": "No valid contribution IDs provided."}, status=400)
 
-        # Build SQL query with placeholders
-        placeholders = ", ".join(["%s"] * len(valid_ids))
-
-        with transaction.atomic():
-            with connection.cursor() as cursor:
-                query = f"UPDATE contributions SET approved = 1 WHERE id IN ({placeholders})"
-                cursor.execute(query, valid_ids)
-                count = cursor.rowcount
-
-        message = (
-            f"{count} contribution(s) approved successfully."
-            if count > 0 else "No contributions were approved. They may already be approved."
-        )
-        return JsonResponse({"message": message})
+        # Large batches run in the background worker; the page polls the job
+        job = enqueue("contributions.approve", valid_ids, created_by=request.session.get("user_id"))
+        return JsonResponse({
+            "message": f"Approval of {len(valid_ids)} contribution(s) queued.",
+            "job_id": job.pk,
+            "status_url": reverse("job_status", args=[job.pk]),
+        }, status=202)
 
     except Exception as e:
         return JsonResponse({"error": "An internal error occurred while processing your request."}, status=500)
@@ -256,7 +415,10 @@ def approve_multiple_contributions(request):
 def delete_contribution(request, contribution_id):
     """Delete a contribution"""
     with connection.cursor() as cursor:
-        cursor.execute("SELECT user_id FROM contributions WHERE id = %s", [contribution_id])
+        cursor.execute(
+            "SELECT user_id FROM contributions WHERE id = %s",
+            [contribution_id]
+        )
         row = cursor.fetchone()
 
     if not row:
@@ -268,10 +430,132 @@ def delete_contribution(request, contribution_id):
         messages.error(request, "You do not have permission to delete this contribution.")
         return redirect("contributions")
 
-    with connection.cursor() as cursor:
-        cursor.execute("DELETE FROM contributions WHERE id = %s", [contribution_id])
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            locked = lock_row(cursor, "contributions", contribution_id, ("amount", "contribution_date", "approved"))
+            if not locked:
+                messages.error(request, "Contribution not found.")
+                return redirect("contributions")
+            cursor.execute("DELETE FROM contributions WHERE id = %s", [contribution_id])
+        detach_evidence(contribution_id)
+        summary.record_amount("contributions", *locked, sign=-1)
+    invalidate_unapproved_contributions_count()
 
     messages.success(request, "Contribution deleted successfully.")
     return redirect("contributions")
 
 
+
+
+def contribution_evidence(request, contribution_id):
+    """
+    Evidence file of a contribution, for its owner and admins only.
+    The transfer itself is handed to nginx when MEDIA_ACCEL_REDIRECT is on.
+    """
+    user_id = request.session.get("user_id")
+    if not user_id:
+        return JsonResponse({"error": "Please log in first."}, status=403)
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT user_id, evidence FROM contributions WHERE id = %s", [contribution_id])
+        row = cursor.fetchone()
+
+    if not row or not row[1]:
+        raise Http404("Contribution evidence not found.")
+
+    if row[0] != user_id and request.session.get("role") not in ['admin', 'super_admin']:
+        return JsonResponse({"error": "You do not have permission to view this file."}, status=403)
+
+    ext = os.path.splitext(row[1])[1].lower()
+    return serve_media(request, row[1], filename=f"contribution-{contribution_id}{ext}")
+
+
+def _owned_upload(request, token):
+    return EvidenceUpload.objects.filter(token=token, user_id=request.session.get("user_id")).first()
+
+
+def _upload_state(upload):
+    return {
+        "upload_id": upload.token,
+        "offset": upload.offset,
+        "size": upload.size,
+        "complete": upload.blob_id is not None,
+    }
+
+
+@require_POST
+def start_evidence_upload(request):
+    """
+    Opens a resumable evidence upload. Expects JSON {"filename", "size"};
+    chunks are then PUT to `evidence_upload` and the upload completed with
+    `complete_evidence_upload` before the contribution form is submitted.
+    """
+    if not request.session.get("user_id"):
+        return JsonResponse({"error": "Please log in first."}, status=403)
+
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+        filename = str(data.get("filename") or "")
+        size = int(data.get("size"))
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({"error": "Invalid upload request."}, status=400)
+
+    try:
+        upload = start_upload(request.session["user_id"], filename, size)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    state = _upload_state(upload)
+    state["chunk_size"] = UPLOAD_CHUNK_SIZE
+    return JsonResponse(state, status=201)
+
+
+def evidence_upload(request, token):
+    """
+    GET: how many bytes of the upload the server holds, so a client can
+    resume. PUT ?offset=N: appends the raw request body at byte N. A chunk
+    sent at any other offset gets 409 with the current offset.
+    """
+    if not request.session.get("user_id"):
+        return JsonResponse({"error": "Please log in first."}, status=403)
+
+    upload = _owned_upload(request, token)
+    if upload is None:
+        return JsonResponse({"error": "Upload not found or expired."}, status=404)
+
+    if request.method == "GET":
+        return JsonResponse(_upload_state(upload))
+    if request.method != "PUT":
+        return JsonResponse({"error": "Method not allowed."}, status=405)
+
+    offset = request.GET.get("offset", "")
+    length = request.META.get("CONTENT_LENGTH") or "0"
+    if not offset.isdigit() or not length.isdigit():
+        return JsonResponse({"error": "Invalid offset or Content-Length."}, status=400)
+
+    try:
+        new_offset = append_chunk(upload, int(offset), request, int(length))
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    if new_offset is None:
+        upload.refresh_from_db(fields=["offset"])
+        return JsonResponse({"error": "Offset mismatch.", "offset": upload.offset}, status=409)
+    return JsonResponse(_upload_state(upload))
+
+
+@require_POST
+def complete_evidence_upload(request, token):
+    """Moves a fully received upload into the evidence store."""
+    if not request.session.get("user_id"):
+        return JsonResponse({"error": "Please log in first."}, status=403)
+
+    upload = _owned_upload(request, token)
+    if upload is None:
+        return JsonResponse({"error": "Upload not found or expired."}, status=404)
+
+    try:
+        complete_upload(upload)
+    except ValueError as e:
+        return JsonResponse(dict(_upload_state(upload), error=str(e)), status=409)
+    return JsonResponse(_upload_state(upload))
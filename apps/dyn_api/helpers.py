@@ -7,15 +7,32 @@ import datetime, sys, inspect, importlib
 
 from functools import wraps
 
+from django.core.exceptions import FieldDoesNotExist
 from django.db import models
 from django.http import HttpResponseRedirect, HttpResponse
 
 from rest_framework import serializers
 
+from apps.common.pagination import keyset_paginate_queryset
+from apps.common.registry import model_info
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE     = 1000
+
+# Built per dotted model name on first use; the serializers generated for a
+# model never change while the process runs. Model classes themselves come
+# from apps.common.registry.
+_SERIALIZER_CACHE = {}
+_VALUES_PLAN_CACHE = {}
+
 class Utils:
     @staticmethod
     def get_class(config, name: str) -> models.Model:
-        return Utils.model_name_to_class(config[name])
+        info = model_info(config[name])
+        if info is None:
+            # Not importable; let the import error surface as before.
+            return Utils.model_name_to_class(config[name])
+        return info.model
 
     @staticmethod
     def get_manager(config, name: str) -> models.Manager:
@@ -23,12 +40,125 @@ class Utils:
 
     @staticmethod
     def get_serializer(config, name: str):
-        class Serializer(serializers.ModelSerializer):
-            class Meta:
-                model = Utils.get_class(config, name)
-                fields = '__all__'
+        model_path = config[name]
+        serializer = _SERIALIZER_CACHE.get(model_path)
+        if serializer is None:
+            class Serializer(serializers.ModelSerializer):
+                class Meta:
+                    model = Utils.get_class(config, name)
+                    fields = '__all__'
+
+            serializer = _SERIALIZER_CACHE.setdefault(model_path, Serializer)
 
-        return Serializer
+        return serializer
+
+    @staticmethod
+    def get_values_plan(config, name: str):
+        """
+        (field name, column, serializer field, is_relation) for each output
+        field, or None when the serializer needs model instances (m2m fields,
+        and file fields, whose URL comes from the FieldFile on the instance).
+        """
+        model_path = config[name]
+        if model_path in _VALUES_PLAN_CACHE:
+            return _VALUES_PLAN_CACHE[model_path]
+
+        model = Utils.get_class(config, name)
+        serializer_fields = Utils.get_serializer(config, name)().fields
+        plan = []
+        for field_name, field in serializer_fields.items():
+            try:
+                model_field = model._meta.get_field(field_name)
+            except FieldDoesNotExist:
+                plan = None
+                break
+            if (model_field.many_to_many or model_field.one_to_many or field.write_only
+                    or isinstance(model_field, models.FileField)):
+                plan = None
+                break
+            plan.append((field_name, model_field.attname, field, model_field.is_relation))
+
+        return _VALUES_PLAN_CACHE.setdefault(model_path, plan)
+
+    @staticmethod
+    def serialize_rows(plan, rows):
+        """Serializes `.values()` dicts with a plan from get_values_plan()."""
+        output = []
+        for row in rows:
+            item = {}
+            for field_name, column, field, is_relation in plan:
+                value = row[column]
+                if value is None or is_relation:
+                    # Related fields serialize to the raw primary key.
+                    item[field_name] = value
+                else:
+                    item[field_name] = field.to_representation(value)
+            output.append(item)
+        return output
+
+    @staticmethod
+    def serialize_list(config, name: str, queryset):
+        """
+        Same output as Serializer(queryset, many=True).data, but reads rows with
+        .values() so no model instances are built. Falls back to many=True for
+        models the fast path cannot represent.
+        """
+        plan = Utils.get_values_plan(config, name)
+        if plan is None:
+            return Utils.get_serializer(config, name)(queryset, many=True).data
+
+        return Utils.serialize_rows(plan, queryset.values(*[column for _, column, _, _ in plan]))
+
+    @staticmethod
+    def list_page(config, name: str, token=None, fields=None, ordering=None, limit=DEFAULT_PAGE_SIZE):
+        """
+        One keyset page of a model as serialized dicts, restricted to `fields`
+        (all when empty) and ordered by `ordering` ("field" or "-field", primary
+        key by default). Returns (data, KeysetPage). Raises ValueError for bad
+        parameters and InvalidCursor for a bad token.
+        """
+        model = Utils.get_class(config, name)
+        serializer_class = Utils.get_serializer(config, name)
+        available = list(serializer_class().fields)
+        pk_column = model._meta.pk.attname
+
+        fields = [f for f in (fields or []) if f]
+        unknown = [f for f in fields if f not in available]
+        if unknown:
+            raise ValueError('Unknown field(s): ' + ', '.join(unknown))
+
+        ordering = ordering or pk_column
+        descending = ordering.startswith('-')
+        order_name = ordering.lstrip('-')
+        try:
+            order_field = model._meta.get_field(pk_column if order_name == 'pk' else order_name)
+        except FieldDoesNotExist:
+            raise ValueError('Unknown ordering field: ' + order_name)
+        if not order_field.concrete or order_field.many_to_many or order_field.null:
+            raise ValueError('Cannot order by field: ' + order_name)
+        sort_column = order_field.attname
+
+        if not 0 < limit <= MAX_PAGE_SIZE:
+            raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+
+        plan = Utils.get_values_plan(config, name)
+        if plan is not None:
+            selected = [p for p in plan if not fields or p[0] in fields]
+            columns = {column for _, column, _, _ in selected} | {sort_column, pk_column}
+            page = keyset_paginate_queryset(
+                model.objects.values(*columns), token,
+                sort_key=sort_column, tiebreaker=pk_column, per_page=limit, descending=descending,
+            )
+            return Utils.serialize_rows(selected, page.rows), page
+
+        page = keyset_paginate_queryset(
+            model.objects.all(), token,
+            sort_key=sort_column, tiebreaker=pk_column, per_page=limit, descending=descending,
+        )
+        data = serializer_class(page.rows, many=True).data
+        if fields:
+            data = [{f: item[f] for f in fields} for item in data]
+        return data, page
 
     @staticmethod
     def model_name_to_class(name: str):
@@ -41,6 +171,18 @@ class Utils:
 
         return cls 
 
+class BulkUpdateListSerializer(serializers.ListSerializer):
+    """
+    Validates a list of partial updates in one pass. Each item's "id" picks its
+    instance from context["instances"] so per-object validators (unique, etc.)
+    see the row being updated.
+    """
+    def run_child_validation(self, data):
+        self.child.instance = self.context['instances'].get(data.get('id'))
+        self.child.initial_data = data
+        return super().run_child_validation(data)
+
+
 def check_permission(function):
     @wraps(function)
     def wrap(viewRequest, *args, **kwargs):
@@ -0,0 +1,74 @@
+import importlib
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from rest_framework import serializers
+
+from apps.dyn_api.helpers import Utils
+
+BENCH_CONFIG = {"bench": "apps.dyn_dt.models.ModelFilter"}
+
+
+class Rollback(Exception):
+    pass
+
+
+def legacy_list(config, name):
+    """The list path as it was: fresh import, fresh serializer class, one serializer per row."""
+    model_path = config[name]
+    model_name = model_path.split('.')[-1]
+    model = getattr(importlib.import_module(model_path.replace('.' + model_name, '')), model_name)
+
+    class Serializer(serializers.ModelSerializer):
+        class Meta:
+            fields = '__all__'
+
+    Serializer.Meta.model = model
+    return [Serializer(instance=thing).data for thing in model.objects.all()]
+
+
+def current_list(config, name):
+    return Utils.serialize_list(config, name, Utils.get_manager(config, name).all())
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures dyn_api list serialization throughput before and after the "
+        "serializer cache / .values() fast path, on generated rows that are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000, help="Generated rows.")
+        parser.add_argument("--repeat", type=int, default=10, help="List calls per mode.")
+
+    def handle(self, *args, **options):
+        model = Utils.get_class(BENCH_CONFIG, "bench")
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(
+                    [model(parent="bench", key=f"key-{i}", value=f"value {i}") for i in range(options["rows"])],
+                    batch_size=1000,
+                )
+                total = model.objects.count()
+
+                results = {}
+                self.stdout.write(f"{connection.vendor}: {total} rows, {options['repeat']} list calls per mode")
+                for label, run in (("per-row serializer", legacy_list), ("cached + values()", current_list)):
+                    timings = []
+                    for _ in range(options["repeat"]):
+                        start = time.perf_counter()
+                        results[label] = run(BENCH_CONFIG, "bench")
+                        timings.append(time.perf_counter() - start)
+                    mean = statistics.mean(timings)
+                    self.stdout.write(
+                        f"  {label:<20} mean {mean * 1000:9.2f} ms  {total / mean:12.0f} rows/s"
+                    )
+
+                same = [dict(r) for r in results["per-row serializer"]] == results["cached + values()"]
+                self.stdout.write(f"  identical output: {same}")
+                raise Rollback
+        except Rollback:
+            pass
@@ -3,6 +3,133 @@
 Copyright (c) 2019 - present AppSeed.us
 """
 
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection, models
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from apps.common.pagination import InvalidCursor
+from apps.common.testing import UnmanagedTablesMixin
+from apps.common.versions import get_version, model_scope
+from apps.dyn_api import views
+from apps.dyn_api.helpers import Utils
+from apps.dyn_dt import search
+from apps.dyn_dt.models import SearchToken
+from apps.dyn_dt.utils import COLUMN_SUMMARY_CACHE_KEY
+from apps.jobs.models import Job
+
+
+class Attachment(models.Model):
+    """Test-only model with a file column."""
+    title = models.CharField(max_length=100)
+    document = models.FileField(upload_to="attachments/")
+
+    class Meta:
+        app_label = "dyn_api"
+        db_table = "test_dyn_api_attachment"
+        managed = False
+
+
+API = {
+    "job": "apps.jobs.models.Job",
+    "attachment": "apps.dyn_api.tests.Attachment",
+}
+
+
+class ValuesPlanTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Attachment,)
+
+    def test_plain_model_uses_values_plan(self):
+        Job.objects.create(kind="a", payload={"ids": [1]})
+        plan = Utils.get_values_plan(API, "job")
+        self.assertIsNotNone(plan)
+        expected = Utils.get_serializer(API, "job")(Job.objects.all(), many=True).data
+        self.assertEqual(Utils.serialize_list(API, "job", Job.objects.all()), expected)
+
+    def test_file_fields_keep_their_url(self):
+        Attachment.objects.create(title="t", document="attachments/report.pdf")
+        self.assertIsNone(Utils.get_values_plan(API, "attachment"))
+        data = Utils.serialize_list(API, "attachment", Attachment.objects.all())
+        self.assertEqual(data[0]["document"], "/media/attachments/report.pdf")
+
+
+class ListPageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.jobs = [Job.objects.create(kind=kind) for kind in ("c", "a", "b", "a")]
+
+    def test_pages_follow_the_ordering(self):
+        data, page = Utils.list_page(API, "job", ordering="kind", fields=["id", "kind"], limit=3)
+        rest, last = Utils.list_page(API, "job", token=page.next_cursor, ordering="kind", fields=["id", "kind"], limit=3)
+        self.assertEqual([item["kind"] for item in data + rest], ["a", "a", "b", "c"])
+        self.assertFalse(last.has_next)
+
+    def test_cursor_from_another_ordering_is_rejected(self):
+        _, page = Utils.list_page(API, "job", ordering="kind", limit=2)
+        for ordering in ("-kind", "id", None):
+            with self.subTest(ordering=ordering), self.assertRaises(InvalidCursor):
+                Utils.list_page(API, "job", token=page.next_cursor, ordering=ordering, limit=2)
+
+
+@override_settings(
+    ROOT_URLCONF="apps.dyn_api.urls",  # dyn_api is not mounted in config.urls
+    DYNAMIC_DATATB={"job": "apps.jobs.models.Job"},
+    DYNAMIC_DATATB_SEARCH="token",
+)
+class BulkAPITests(TestCase):
+    def setUp(self):
+        api = mock.patch.dict(views.DYNAMIC_API, API)
+        api.start()
+        self.addCleanup(api.stop)
+        self.url = reverse("model_api_bulk", args=["job"])
+        search.rebuild_index("job", Job)
+
+    def tokens(self, pk):
+        return set(SearchToken.objects.filter(parent="job", object_id=pk).values_list("token", flat=True))
+
+    def test_bulk_create_indexes_rows_and_invalidates_caches(self):
+        cache.set(COLUMN_SUMMARY_CACHE_KEY.format("job"), "stale")
+        version = get_version(model_scope(Job))
+
+        response = self.client.post(self.url, [{"kind": "alpha one"}, {"kind": "beta"}], content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.json()["ids_returned"])
+
+        ids = [r["id"] for r in response.json()["results"]]
+        self.assertLessEqual({"alpha", "one"}, self.tokens(ids[0]))
+        self.assertIn("beta", self.tokens(ids[1]))
+        self.assertTrue(search.is_indexed("job"))
+        self.assertIsNone(cache.get(COLUMN_SUMMARY_CACHE_KEY.format("job")))
+        self.assertNotEqual(get_version(model_scope(Job)), version)
+
+    def test_bulk_update_reindexes_rows(self):
+        job = Job.objects.create(kind="old")
+        response = self.client.put(self.url, [{"id": job.pk, "kind": "new"}], content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("new", self.tokens(job.pk))
+        self.assertNotIn("old", self.tokens(job.pk))
+
+    def test_booleans_are_not_ids(self):
+        job = Job.objects.create(kind="kept")
+        for method, body in (
+            (self.client.delete, [True]),
+            (self.client.delete, {"ids": [job.pk, False]}),
+            (self.client.put, [{"id": True, "kind": "changed"}]),
+        ):
+            with self.subTest(body=body):
+                response = method(self.url, body, content_type="application/json")
+                self.assertEqual(response.status_code, 400)
+        job.refresh_from_db()
+        self.assertEqual(job.kind, "kept")
+
+    def test_insert_without_returned_ids_is_reported(self):
+        with mock.patch.object(type(connection.features), "can_return_rows_from_bulk_insert", False):  # as on MySQL
+            response = self.client.post(self.url, [{"kind": "gamma"}], content_type="application/json")
+        data = response.json()
+        self.assertEqual((response.status_code, data["ids_returned"]), (201, False))
+        self.assertIsNone(data["results"][0]["id"])
+        self.assertIn("does not return ids", data["message"])
+        # The new row has no tokens, so searches must not trust the index.
+        self.assertFalse(search.is_indexed("job"))
@@ -11,6 +11,7 @@ urlpatterns = [
     path('api/', views.index, name="dynamic_api"),
 
     path('api/<str:model_name>/'          , views.DynamicAPI.as_view(), name="model_api"),
+    path('api/<str:model_name>/bulk/'     , views.DynamicBulkAPI.as_view(), name="model_api_bulk"),
     path('api/<str:model_name>/<str:id>'  , views.DynamicAPI.as_view()),
     path('api/<str:model_name>/<str:id>/' , views.DynamicAPI.as_view()),
 ]
@@ -13,6 +13,7 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.http import HttpResponse
+from django.db import IntegrityError, transaction
 
 from django.conf import settings
 
@@ -23,7 +24,17 @@ try:
 except:     
     pass 
 
-from .helpers import Utils 
+from apps.common.pagination import InvalidCursor
+from apps.common.versions import bump_version, model_scope, request_etag, last_modified
+from apps.dyn_dt.search import index_objects, model_paths
+from apps.dyn_dt.utils import invalidate_model_data
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .helpers import Utils, BulkUpdateListSerializer, DEFAULT_PAGE_SIZE
+
+BULK_MAX_ITEMS  = 5000  # items per bulk request
+BULK_BATCH_SIZE = 500   # rows per INSERT/UPDATE statement
 
 def index(request):
     
@@ -35,9 +46,63 @@ def index(request):
 
     return render(request, 'dyn_api/index.html', context)
 
+def _model_scope(model_name):
+    try:
+        return model_scope(Utils.get_class(DYNAMIC_API, model_name))
+    except (KeyError, ImportError, AttributeError):
+        return None
+
+
+def api_etag(request, model_name=None, **kwargs):
+    scope = _model_scope(model_name)
+    return request_etag(request, scope) if scope else None
+
+
+def api_last_modified(request, model_name=None, **kwargs):
+    scope = _model_scope(model_name)
+    return last_modified(scope) if scope else None
+
+
+def bump_model(model_name):
+    """
+    Makes ETags of the model stale after a write, along with the cached
+    summaries and page counts of the dyn_dt pages that publish it.
+    """
+    try:
+        model = Utils.get_class(DYNAMIC_API, model_name)
+    except (KeyError, ImportError, AttributeError):
+        return
+
+    paths = model_paths(model)
+    for path in paths:
+        invalidate_model_data(path, model)  # bumps the model version too
+    if not paths:
+        bump_version(model_scope(model))
+
+
+def index_bulk(model, instances):
+    """
+    Updates the dyn_dt search index for rows written by bulk_create or
+    bulk_update, which bypass the post_save signal that normally does it.
+    """
+    if settings.DYNAMIC_DATATB_SEARCH != 'token':
+        return
+    for path in model_paths(model):
+        index_objects(path, instances)
+
+
+def is_id(value):
+    """True for an integer id; JSON true/false parse to bool, an int subclass."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
 class DynamicAPI(APIView):
 
     # READ : GET api/model/id or api/model
+    # If-None-Match / If-Modified-Since are answered with 304 from the cached
+    # model version before any query runs.
+    @method_decorator(cache_control(private=True, no_cache=True))
+    @method_decorator(condition(etag_func=api_etag, last_modified_func=api_last_modified))
     def get(self, request, **kwargs):
 
         model_id = kwargs.get('id', None)
@@ -60,12 +125,34 @@ class DynamicAPI(APIView):
                 thing = get_object_or_404(Utils.get_manager(DYNAMIC_API, kwargs.get('model_name')), id=model_id)
                 model_serializer = Utils.get_serializer(DYNAMIC_API, kwargs.get('model_name'))(instance=thing)
                 output = model_serializer.data
+
+                fields = [f for f in request.query_params.get('fields', '').split(',') if f]
+                if fields:
+                    output = {f: output[f] for f in fields if f in output}
             else:
-                all_things = Utils.get_manager(DYNAMIC_API, kwargs.get('model_name')).all()
-                thing_serializer = Utils.get_serializer(DYNAMIC_API, kwargs.get('model_name'))
-                output = []
-                for thing in all_things:
-                    output.append(thing_serializer(instance=thing).data)
+                # ?cursor=&limit=&fields=a,b&ordering=-field
+                params = request.query_params
+                try:
+                    limit = int(params.get('limit', DEFAULT_PAGE_SIZE))
+                    output, page = Utils.list_page(
+                        DYNAMIC_API, kwargs.get('model_name'),
+                        token=params.get('cursor'),
+                        fields=params.get('fields', '').split(','),
+                        ordering=params.get('ordering'),
+                        limit=limit,
+                    )
+                except (ValueError, InvalidCursor) as e:
+                    return Response(data={
+                        'message': 'Input Error = ' + str(e),
+                        'success': False
+                    }, status=400)
+
+                return Response(data={
+                    'data': output,
+                    'next_cursor': page.next_cursor,
+                    'previous_cursor': page.previous_cursor,
+                    'success': True
+                    }, status=200)
         except KeyError:
             return Response(data={
                 'message': 'this model is not activated or not exist.',
@@ -88,6 +175,7 @@ class DynamicAPI(APIView):
             model_serializer = Utils.get_serializer(DYNAMIC_API, kwargs.get('model_name'))(data=request.data)
             if model_serializer.is_valid():
                 model_serializer.save()
+                bump_model(kwargs.get('model_name'))
             else:
                 return Response(data={
                     **model_serializer.errors,
@@ -113,6 +201,7 @@ class DynamicAPI(APIView):
                                                                                            partial=True)
             if model_serializer.is_valid():
                 model_serializer.save()
+                bump_model(kwargs.get('model_name'))
             else:
                 return Response(data={
                     **model_serializer.errors,
@@ -140,6 +229,7 @@ class DynamicAPI(APIView):
             model_manager = Utils.get_manager(DYNAMIC_API, kwargs.get('model_name'))
             to_delete_id = kwargs.get('id')
             model_manager.get(id=to_delete_id).delete()
+            bump_model(kwargs.get('model_name'))
         except KeyError:
             return Response(data={
                 'message': 'this model is not activated or not exist.',
@@ -154,3 +244,175 @@ class DynamicAPI(APIView):
             'message': 'Record Deleted.',
             'success': True
         }, status=200)
+
+
+class DynamicBulkAPI(APIView):
+    """
+    Array versions of POST/PUT/DELETE for imports. Every request is
+    validated as a whole and written in one transaction: if any item is
+    invalid nothing is saved and the per-item results say why.
+    """
+
+    def get_model(self, model_name):
+        return Utils.get_class(DYNAMIC_API, model_name)
+
+    def items_error(self, message):
+        return Response(data={
+            'message': 'Input Error = ' + message,
+            'success': False
+        }, status=400)
+
+    def results_response(self, results, status=200, **extra):
+        return Response(data={
+            'results': results,
+            'success': all(r['success'] for r in results),
+            **extra
+        }, status=status)
+
+    def invalid_response(self, errors):
+        # Nothing was written; "valid" tells which items would have passed.
+        return Response(data={
+            'results': [
+                {'index': i, 'valid': not err, **({'errors': err} if err else {})}
+                for i, err in enumerate(errors)
+            ],
+            'success': False
+        }, status=400)
+
+    # CREATE : POST api/model/bulk/  body: [{...}, {...}]
+    def post(self, request, **kwargs):
+        try:
+            model = self.get_model(kwargs.get('model_name'))
+            serializer_class = Utils.get_serializer(DYNAMIC_API, kwargs.get('model_name'))
+        except KeyError:
+            return Response(data={
+                'message': 'this model is not activated or not exist.',
+                'success': False
+            }, status=400)
+
+        if not isinstance(request.data, list) or not request.data:
+            return self.items_error('expected a non-empty list of objects')
+        if len(request.data) > BULK_MAX_ITEMS:
+            return self.items_error(f'at most {BULK_MAX_ITEMS} items per request')
+
+        serializer = serializer_class(data=request.data, many=True)
+        if not serializer.is_valid():
+            return self.invalid_response(serializer.errors)
+
+        try:
+            with transaction.atomic():
+                if Utils.get_values_plan(DYNAMIC_API, kwargs.get('model_name')) is None:
+                    # Many-to-many data needs the serializer's own save().
+                    created = serializer.save()
+                else:
+                    created = model.objects.bulk_create(
+                        [model(**data) for data in serializer.validated_data],
+                        batch_size=BULK_BATCH_SIZE,
+                    )
+                    index_bulk(model, created)
+        except IntegrityError as e:
+            return self.items_error(str(e))
+        bump_model(kwargs.get('model_name'))
+
+        # Backends without RETURNING (MySQL) leave the ids unset; say so
+        # rather than let clients read "id": null as a failure.
+        extra = {}
+        if any(obj.pk is None for obj in created):
+            extra['message'] = 'Records created; this database does not return ids for bulk inserts.'
+        return self.results_response([
+            {'index': i, 'success': True, 'id': obj.pk}
+            for i, obj in enumerate(created)
+        ], status=201, ids_returned=not extra, **extra)
+
+    # UPDATE : PUT api/model/bulk/  body: [{"id": 1, ...}, {"id": 2, ...}]
+    def put(self, request, **kwargs):
+        try:
+            model = self.get_model(kwargs.get('model_name'))
+            serializer_class = Utils.get_serializer(DYNAMIC_API, kwargs.get('model_name'))
+        except KeyError:
+            return Response(data={
+                'message': 'this model is not activated or not exist.',
+                'success': False
+            }, status=400)
+
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return self.items_error('expected a non-empty list of objects')
+        if len(items) > BULK_MAX_ITEMS:
+            return self.items_error(f'at most {BULK_MAX_ITEMS} items per request')
+        if not all(isinstance(item, dict) and is_id(item.get('id')) for item in items):
+            return self.items_error('every item needs an integer "id"')
+
+        ids = [item['id'] for item in items]
+        if len(set(ids)) != len(ids):
+            return self.items_error('duplicate ids')
+
+        instances = model.objects.in_bulk(ids)
+        missing = [
+            {'non_field_errors': ['object with given id not found.']} if item['id'] not in instances else {}
+            for item in items
+        ]
+        if any(missing):
+            return self.invalid_response(missing)
+
+        serializer = BulkUpdateListSerializer(
+            child=serializer_class(partial=True),
+            data=items,
+            partial=True,
+            context={'instances': instances},
+        )
+        if not serializer.is_valid():
+            return self.invalid_response(serializer.errors)
+
+        plan = Utils.get_values_plan(DYNAMIC_API, kwargs.get('model_name'))
+        try:
+            with transaction.atomic():
+                if plan is None:
+                    for item, data in zip(items, serializer.validated_data):
+                        serializer_class().update(instances[item['id']], data)
+                else:
+                    changed = set()
+                    for item, data in zip(items, serializer.validated_data):
+                        for attr, value in data.items():
+                            setattr(instances[item['id']], attr, value)
+                            changed.add(attr)
+                    if changed:
+                        model.objects.bulk_update(
+                            [instances[i] for i in ids], sorted(changed), batch_size=BULK_BATCH_SIZE
+                        )
+                        index_bulk(model, [instances[i] for i in ids])
+        except IntegrityError as e:
+            return self.items_error(str(e))
+        bump_model(kwargs.get('model_name'))
+
+        return self.results_response([
+            {'index': i, 'success': True, 'id': pk} for i, pk in enumerate(ids)
+        ])
+
+    # DELETE : DELETE api/model/bulk/  body: [1, 2, 3] or {"ids": [1, 2, 3]}
+    def delete(self, request, **kwargs):
+        try:
+            model = self.get_model(kwargs.get('model_name'))
+        except KeyError:
+            return Response(data={
+                'message': 'this model is not activated or not exist.',
+                'success': False
+            }, status=400)
+
+        ids = request.data.get('ids') if isinstance(request.data, dict) else request.data
+        if not isinstance(ids, list) or not ids or not all(is_id(i) for i in ids):
+            return self.items_error('expected a non-empty list of integer ids')
+        if len(ids) > BULK_MAX_ITEMS:
+            return self.items_error(f'at most {BULK_MAX_ITEMS} items per request')
+
+        with transaction.atomic():
+            existing = set(model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+            model.objects.filter(pk__in=existing).delete()
+        if existing:
+            bump_model(kwargs.get('model_name'))
+
+        return self.results_response([
+            {'index': i, 'success': pk in existing, 'id': pk,
+             **({} if pk in existing else {'message': 'object with given id not found.'})}
+            for i, pk in enumerate(ids)
+        ])
@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 class DynDtConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.dyn_dt'
+
+    def ready(self):
+        if settings.DYNAMIC_DATATB_SEARCH == 'token':
+            from apps.dyn_dt.search import connect_signals
+            connect_signals()
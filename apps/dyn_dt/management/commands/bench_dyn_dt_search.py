@@ -0,0 +1,94 @@
+import random
+import statistics
+import string
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from apps.dyn_dt.models import ModelFilter
+from apps.dyn_dt.search import indexed_fields, rebuild_index, token_search
+
+BENCH_PATH = "__bench_search__"
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares dyn_dt search with icontains against the token index on a "
+        "generated dataset. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=20000, help="Generated rows.")
+        parser.add_argument("--searches", type=int, default=50, help="Searches per mode.")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def generate(self, rows, rng):
+        vocabulary = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(2000)]
+        batch = []
+        for i in range(rows):
+            batch.append(ModelFilter(
+                parent=f"{BENCH_PATH}{i % 50}",
+                key=" ".join(rng.choices(vocabulary, k=2)),
+                value=" ".join(rng.choices(vocabulary, k=6)),
+            ))
+            if len(batch) >= 1000:
+                ModelFilter.objects.bulk_create(batch)
+                batch = []
+        ModelFilter.objects.bulk_create(batch)
+        return vocabulary
+
+    def time_searches(self, build, words):
+        timings = []
+        hits = []
+        for word in words:
+            start = time.perf_counter()
+            hits.append(build(word).count())
+            timings.append((time.perf_counter() - start) * 1000)
+        return sorted(timings), hits
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        fields = indexed_fields(ModelFilter)
+        queryset = ModelFilter.objects.all()
+
+        def icontains(word):
+            q = Q()
+            for field in fields:
+                q |= Q(**{f"{field}__icontains": word})
+            return queryset.filter(q)
+
+        def tokens(word):
+            return token_search(BENCH_PATH, queryset, word)
+
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                vocabulary = self.generate(options["rows"], rng)
+                generated = time.perf_counter() - start
+
+                start = time.perf_counter()
+                rebuild_index(BENCH_PATH, ModelFilter)
+                indexed = time.perf_counter() - start
+
+                words = rng.sample(vocabulary, options["searches"])
+                self.stdout.write(
+                    f"{connection.vendor}: {options['rows']} rows generated in {generated:.2f} s, "
+                    f"indexed in {indexed:.2f} s; {options['searches']} single-word searches"
+                )
+                for label, build in (("icontains", icontains), ("token index", tokens)):
+                    timings, hits = self.time_searches(build, words)
+                    p95 = timings[int(len(timings) * 0.95) - 1]
+                    self.stdout.write(
+                        f"  {label:<12} mean {statistics.mean(timings):8.3f} ms  "
+                        f"p50 {statistics.median(timings):8.3f} ms  p95 {p95:8.3f} ms  "
+                        f"avg hits {statistics.mean(hits):.1f}"
+                    )
+                raise Rollback
+        except Rollback:
+            pass
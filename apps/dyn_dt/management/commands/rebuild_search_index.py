@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.dyn_dt.search import indexed_models, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the dyn_dt search token index for DYNAMIC_DATATB models."
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*", help="DYNAMIC_DATATB paths to rebuild (default: all).")
+
+    def handle(self, *args, **options):
+        models = indexed_models()
+        paths = [p.lower() for p in options["paths"]] or list(models)
+
+        unknown = [p for p in paths if p not in models]
+        if unknown:
+            raise CommandError(f"Unknown or unimportable DYNAMIC_DATATB path(s): {', '.join(unknown)}")
+
+        for path in paths:
+            rows = rebuild_index(path, models[path])
+            self.stdout.write(f"{path}: indexed {rows} rows")
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.9 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dyn_dt', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('parent', models.CharField(max_length=255)),
+                ('object_id', models.BigIntegerField()),
+                ('token', models.CharField(max_length=64)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['parent', 'token'], name='dyn_dt_token_idx'), models.Index(fields=['parent', 'object_id'], name='dyn_dt_token_object_idx')],
+            },
+        ),
+    ]
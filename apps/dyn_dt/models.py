@@ -21,4 +21,28 @@ class ModelFilter(models.Model):
 	value = models.CharField(max_length=255)
 
 	def __str__(self):
-		return self.key
\ No newline at end of file
+		return self.key
+
+class SearchToken(models.Model):
+	"""One word of one row of a DYNAMIC_DATATB model, used by the dyn_dt search."""
+	parent = models.CharField(max_length=255)
+	object_id = models.BigIntegerField()
+	token = models.CharField(max_length=64)
+
+	class Meta:
+		indexes = [
+			models.Index(fields=['parent', 'token'], name='dyn_dt_token_idx'),
+			models.Index(fields=['parent', 'object_id'], name='dyn_dt_token_object_idx'),
+		]
+
+	def __str__(self):
+		return self.token
+
+class SearchIndexState(models.Model):
+	"""Marks a DYNAMIC_DATATB path whose token index was fully built by rebuild_index."""
+	parent = models.CharField(max_length=255, unique=True)
+	rows = models.BigIntegerField(default=0)
+	built_at = models.DateTimeField(auto_now=True)
+
+	def __str__(self):
+		return self.parent
@@ -0,0 +1,177 @@
+"""
+Token index for the dyn_dt search box.
+
+Every non-FK column of a DYNAMIC_DATATB model is split into lowercase words
+stored in `SearchToken`, kept in sync by post_save/post_delete signals.
+A search then becomes an indexed prefix lookup per word instead of a
+`LIKE '%x%'` scan over every column. Writes that bypass signals
+(queryset.update(), raw SQL) need `manage.py rebuild_search_index`.
+
+A path is searched through the index only once rebuild_index has covered
+every existing row (recorded in `SearchIndexState`); before that, rows saved
+since deploy would be the only ones with tokens, so user_filter keeps
+scanning with icontains.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+
+from apps.common.registry import datatb_model
+from apps.dyn_dt.models import SearchIndexState, SearchToken
+
+TOKEN_RE = re.compile(r'\w+')
+TOKEN_MAX_LENGTH = 64
+REBUILD_BATCH_SIZE = 1000
+
+# model class -> DYNAMIC_DATATB paths it is published under
+MODEL_PATHS = {}
+
+
+def tokenize(value):
+    """Lowercase words of a value, truncated to the column width."""
+    if value is None:
+        return set()
+    return {t[:TOKEN_MAX_LENGTH] for t in TOKEN_RE.findall(str(value).lower())}
+
+
+def indexed_fields(aModelClass):
+    """Columns covered by the index: the same non-FK fields user_filter searches."""
+    return [
+        field.attname for field in aModelClass._meta.fields
+        if not field.is_relation
+    ]
+
+
+def indexed_models():
+    """{path: model} for every DYNAMIC_DATATB entry whose model can be imported."""
+    found = {}
+    for path in settings.DYNAMIC_DATATB:
+        info = datatb_model(path)
+        if info:
+            found[path.lower()] = info.model
+    return found
+
+
+def model_paths(aModelClass):
+    """DYNAMIC_DATATB paths a model is published under."""
+    return [path for path, model in indexed_models().items() if model is aModelClass]
+
+
+def _row_tokens(parent, pk, values):
+    tokens = set()
+    for value in values:
+        tokens |= tokenize(value)
+    return [SearchToken(parent=parent, object_id=pk, token=t) for t in tokens]
+
+
+def index_object(aPath, instance):
+    parent = aPath.lower()
+    values = [getattr(instance, f) for f in indexed_fields(type(instance))]
+    with transaction.atomic():
+        SearchToken.objects.filter(parent=parent, object_id=instance.pk).delete()
+        SearchToken.objects.bulk_create(_row_tokens(parent, instance.pk, values))
+
+
+def index_objects(aPath, instances):
+    """
+    index_object() for many rows of one model in two statements, for bulk
+    writes (bulk_create/bulk_update send no signals). Rows without a pk, as
+    bulk_create leaves them on backends without RETURNING (MySQL), cannot be
+    tokenized: the path is then marked unindexed until the next rebuild, so
+    searches fall back to icontains instead of missing them.
+    """
+    instances = list(instances)
+    if not instances:
+        return
+    parent = aPath.lower()
+    if any(instance.pk is None for instance in instances):
+        SearchIndexState.objects.filter(parent=parent).delete()
+        return
+
+    fields = indexed_fields(type(instances[0]))
+    tokens = []
+    for instance in instances:
+        tokens.extend(_row_tokens(parent, instance.pk, [getattr(instance, f) for f in fields]))
+    with transaction.atomic():
+        SearchToken.objects.filter(parent=parent, object_id__in=[i.pk for i in instances]).delete()
+        SearchToken.objects.bulk_create(tokens, batch_size=REBUILD_BATCH_SIZE)
+
+
+def unindex_object(aPath, pk):
+    SearchToken.objects.filter(parent=aPath.lower(), object_id=pk).delete()
+
+
+def rebuild_index(aPath, aModelClass):
+    """Re-tokenizes every row of the model. Returns the number of rows indexed."""
+    parent = aPath.lower()
+    fields = indexed_fields(aModelClass)
+    rows = 0
+    with transaction.atomic():
+        SearchIndexState.objects.filter(parent=parent).delete()
+        SearchToken.objects.filter(parent=parent).delete()
+        batch = []
+        for row in aModelClass.objects.values_list('pk', *fields).iterator(chunk_size=REBUILD_BATCH_SIZE):
+            batch.extend(_row_tokens(parent, row[0], row[1:]))
+            rows += 1
+            if len(batch) >= REBUILD_BATCH_SIZE:
+                SearchToken.objects.bulk_create(batch)
+                batch = []
+        SearchToken.objects.bulk_create(batch)
+        # Marked complete in the same transaction as the tokens it vouches for
+        SearchIndexState.objects.create(parent=parent, rows=rows)
+    return rows
+
+
+def _prefix(word):
+    """Index-friendly "token starts with word" condition."""
+    if connection.vendor == 'mysql':
+        # Plain LIKE 'word%' is a range scan under the column's _ci collation;
+        # startswith would add BINARY and lose the index.
+        return Q(token__istartswith=word)
+    # Elsewhere LIKE prefixes only use an index with special collations or
+    # operator classes, so compare against the next prefix instead.
+    return Q(token__gte=word, token__lt=word[:-1] + chr(ord(word[-1]) + 1))
+
+
+def is_indexed(aPath):
+    """True once rebuild_index has covered every row of the path."""
+    return SearchIndexState.objects.filter(parent=aPath.lower()).exists()
+
+
+def token_search(aPath, queryset, value):
+    """
+    Restricts the queryset to rows having, for every word of `value`, a
+    token that starts with it. Returns None when the search cannot be
+    answered from the index, so the caller can fall back to icontains.
+    """
+    words = tokenize(value)
+    if not words or not is_indexed(aPath):
+        return None
+
+    parent = aPath.lower()
+    for word in words:
+        queryset = queryset.filter(
+            pk__in=SearchToken.objects.filter(_prefix(word), parent=parent).values('object_id')
+        )
+    return queryset
+
+
+def _on_save(sender, instance, **kwargs):
+    for path in MODEL_PATHS.get(sender, ()):
+        index_object(path, instance)
+
+
+def _on_delete(sender, instance, **kwargs):
+    for path in MODEL_PATHS.get(sender, ()):
+        unindex_object(path, instance.pk)
+
+
+def connect_signals():
+    """Keeps the index in sync with writes that go through the ORM."""
+    for path, model in indexed_models().items():
+        MODEL_PATHS.setdefault(model, set()).add(path)
+        post_save.connect(_on_save, sender=model, dispatch_uid=f'dyn_dt_search_save_{model._meta.label}')
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=f'dyn_dt_search_delete_{model._meta.label}')
@@ -1,3 +1,295 @@
-from django.test import TestCase
+import time
+from datetime import datetime, timezone
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import include, path, reverse
+
+from config.urls import urlpatterns as site_urlpatterns
+
+from apps.accounts.context_processors import invalidate_user_snapshot
+from apps.accounts.models import Member
+from apps.common.testing import UnmanagedTablesMixin, set_session
+from apps.common import versions
+from apps.common.versions import VERSION_TTL, bump_version
+from apps.contributions.context_processors import invalidate_unapproved_contributions_count
+from apps.contributions.models import Contribution
+from apps.dyn_dt import search, utils
+from apps.dyn_dt.models import HideShowFilter, ModelFilter
+from apps.dyn_dt.utils import (
+    COLUMN_SUMMARY_MAX_DISTINCT, COLUMN_SUMMARY_TTL, ESTIMATED_COUNT_MIN_ROWS, CachedCountPaginator,
+    column_summary, hide_show_filters, invalidate_hide_show_filters, invalidate_model_data,
+    page_config_scope, page_count_key, user_filter,
+)
+from apps.dyn_dt.views import keyset_rows
+from apps.jobs.models import Job
+
+WHEN = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+# The site plus dyn_dt, which config.urls does not mount.
+urlpatterns = site_urlpatterns + [path("", include("apps.dyn_dt.urls"))]
+
+
+@override_settings(
+    ROOT_URLCONF="apps.dyn_dt.urls",  # dyn_dt is not mounted in config.urls
+    DYNAMIC_DATATB={"job": "apps.jobs.models.Job"},
+    DYNAMIC_DATATB_SEARCH="icontains",
+)
+class ExportCSVTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Repeated and NULL sort values, so slices must break ties on pk.
+        for kind, started_at in (("b", None), ("a", WHEN), ("b", WHEN), ("a", None), ("c", None)):
+            Job.objects.create(kind=kind, started_at=started_at)
+        for key in ("id", "kind"):
+            HideShowFilter.objects.create(parent="job", key=key, value=False)
+
+    def test_keyset_slices_cover_every_row_in_order(self):
+        for order_by in ("id", "kind", "started_at"):
+            with self.subTest(order_by=order_by):
+                expected = list(
+                    Job.objects.order_by(F(order_by).asc(nulls_first=True), "pk").values_list("id", "kind")
+                )
+                with self.assertNumQueries(3):  # two full slices of 2, then the last row
+                    rows = list(keyset_rows(Job.objects.all(), ["id", "kind"], order_by, chunk_size=2))
+                self.assertEqual(rows, expected)
+
+    def test_export_streams_visible_columns(self):
+        response = self.client.get(reverse("export_csv", args=["job"]), {"order_by": "kind", "search": "b"})
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        ids = list(Job.objects.filter(kind="b").order_by("pk").values_list("id", flat=True))
+        self.assertEqual(lines, ["id,kind", *(f"{pk},b" for pk in ids)])
+
+
+@override_settings(DYNAMIC_DATATB={"job": "apps.jobs.models.Job"}, DYNAMIC_DATATB_SEARCH="token")
+class TokenSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = Job.objects.create(kind="contributions.approve")
+        cls.second = Job.objects.create(kind="loans.approve")
+
+    def search(self, value):
+        request = RequestFactory().get("/", {"search": value})
+        found = user_filter(request, Job.objects.all(), ["id", "kind"], aPath="job")
+        return sorted(found.values_list("pk", flat=True))
+
+    def test_partial_index_falls_back_to_icontains(self):
+        # A row saved after deploy has tokens, but the path was never rebuilt.
+        search.index_object("job", self.first)
+        self.assertFalse(search.is_indexed("job"))
+        self.assertIsNone(search.token_search("job", Job.objects.all(), "loans"))
+        # icontains also matches inside words, which the index never does.
+        self.assertEqual(self.search("pprove"), [self.first.pk, self.second.pk])
+
+    def test_rebuilt_index_is_used(self):
+        self.assertEqual(search.rebuild_index("job", Job), 2)
+        self.assertTrue(search.is_indexed("job"))
+        self.assertEqual(self.search("LOANS"), [self.second.pk])
+        self.assertEqual(self.search("appr"), [self.first.pk, self.second.pk])
+        self.assertEqual(self.search("pprove"), [])
+
+
+class ColumnSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for total in range(COLUMN_SUMMARY_MAX_DISTINCT + 1):
+            Job.objects.create(kind="b" if total % 2 else "a", total=total, started_at=WHEN if total else None)
+
+    def test_one_aggregate_query_plus_capped_distinct_lists(self):
+        with CaptureQueriesContext(connection) as queries:
+            summary = column_summary("job", Job)
+
+        aggregates = [q["sql"] for q in queries if "COUNT(" in q["sql"]]
+        self.assertEqual(len(aggregates), 1)
+        listed = [name for name, column in summary.items() if column["values"] is not None]
+        self.assertEqual(len(queries), 1 + len(listed))
+        self.assertNotIn("total", listed)  # one distinct value too many
+        self.assertEqual(summary["total"]["distinct"], COLUMN_SUMMARY_MAX_DISTINCT + 1)
+
+    def test_numeric_date_and_text_columns(self):
+        summary = column_summary("job", Job)
+        rows = COLUMN_SUMMARY_MAX_DISTINCT + 1
+
+        self.assertEqual(
+            {k: summary["total"][k] for k in ("rows", "count", "min", "max")},
+            {"rows": rows, "count": rows, "min": 0, "max": rows - 1},
+        )
+        started = summary["started_at"]
+        self.assertEqual((started["count"], started["distinct"]), (rows - 1, 1))
+        self.assertEqual((started["min"], started["max"], started["values"]), (WHEN, WHEN, [WHEN]))
+        self.assertEqual(summary["kind"]["values"], ["a", "b"])
+        self.assertEqual((summary["kind"]["min"], summary["kind"]["max"]), ("a", "b"))
+
+    def test_cached_until_a_write_or_the_ttl(self):
+        column_summary("job", Job)
+        Job.objects.create(kind="c")
+        with self.assertNumQueries(0):
+            self.assertEqual(column_summary("job", Job)["kind"]["values"], ["a", "b"])
+
+        invalidate_model_data("job", Job)
+        self.assertEqual(column_summary("job", Job)["kind"]["values"], ["a", "b", "c"])
+
+        Job.objects.create(kind="d")
+        later = time.time() + COLUMN_SUMMARY_TTL + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertEqual(column_summary("job", Job)["kind"]["values"], ["a", "b", "c", "d"])
+
+
+class CachedCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for kind in ("a", "a", "b"):
+            Job.objects.create(kind=kind)
+
+    def count(self, queryset=None, search=None, estimate=False):
+        paginator = CachedCountPaginator(
+            queryset if queryset is not None else Job.objects.order_by("id"), 2,
+            cache_key=page_count_key("job", {}, search), estimate=estimate,
+        )
+        return paginator.count
+
+    def test_count_is_reused_until_the_model_changes(self):
+        self.assertEqual(self.count(), 3)
+        Job.objects.create(kind="c")
+        with self.assertNumQueries(0):
+            self.assertEqual(self.count(), 3)
+
+        invalidate_model_data("job", Job)
+        self.assertEqual(self.count(), 4)
+
+    def test_each_search_has_its_own_count(self):
+        self.assertEqual(self.count(), 3)
+        self.assertEqual(self.count(Job.objects.filter(kind="a"), search="a"), 2)
+
+    def test_estimate_is_used_for_large_tables_only(self):
+        for estimated, expected in ((ESTIMATED_COUNT_MIN_ROWS * 2, ESTIMATED_COUNT_MIN_ROWS * 2), (5, 3), (None, 3)):
+            with self.subTest(estimated=estimated):
+                invalidate_model_data("job", Job)
+                with mock.patch.object(utils, "estimated_row_count", return_value=estimated):
+                    self.assertEqual(self.count(estimate=True), expected)
+
+    def test_estimate_counts_nothing_without_table_statistics(self):
+        self.assertIsNone(utils.estimated_row_count(Job))  # SQLite keeps none
+
+
+@override_settings(
+    ROOT_URLCONF="apps.dyn_dt.tests",
+    DYNAMIC_DATATB={"job": "apps.jobs.models.Job"},
+    DYNAMIC_DATATB_SEARCH="icontains",
+    DYNAMIC_DATATB_ESTIMATED_COUNT=True,
+)
+class EstimatedCountViewTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Member, Contribution)  # navbar: current user, unapproved badge
+
+    def setUp(self):
+        member = Member.objects.create(username="ann", email="a@example.com", password="x", role="admin")
+        set_session(self.client, user_id=member.pk, role="admin")
+        cache.clear()
+        for kind in ("a", "b"):
+            Job.objects.create(kind=kind)
+
+    def page_count(self, **params):
+        with mock.patch.object(utils, "estimated_row_count", return_value=ESTIMATED_COUNT_MIN_ROWS * 2):
+            response = self.client.get(reverse("model_dt", args=["job"]), params)
+        return response.context["items"].paginator.count
+
+    def test_only_unfiltered_views_are_estimated(self):
+        self.assertEqual(self.page_count(), ESTIMATED_COUNT_MIN_ROWS * 2)
+        self.assertEqual(self.page_count(search="a"), 1)
+
+        ModelFilter.objects.create(parent="job", key="kind", value="b")
+        invalidate_model_data("job", Job)
+        self.assertEqual(self.page_count(), 1)
+
+
+class HideShowFilterCacheTests(TestCase):
+    def setUp(self):
+        HideShowFilter.objects.create(parent="job", key="kind", value=False)
+        # Two gunicorn workers, each with its own locmem cache.
+        self.worker_a = LocMemCache("worker-a", {})
+        self.worker_b = LocMemCache("worker-b", {})
+        self.worker_a.clear()
+        self.worker_b.clear()
+
+    def on(self, worker, func, *args):
+        with mock.patch.object(utils, "cache", worker), mock.patch.object(versions, "cache", worker):
+            return func(*args)
+
+    def kind_visible(self, worker):
+        return self.on(worker, hide_show_filters, "job", ["kind"])[0].value
+
+    def toggle(self, worker):
+        HideShowFilter.objects.filter(parent="job", key="kind").update(value=True)
+        self.on(worker, invalidate_hide_show_filters, "job")
+
+    def test_toggle_takes_effect_on_the_worker_that_handled_it(self):
+        self.assertFalse(self.kind_visible(self.worker_a))
+        self.toggle(self.worker_a)
+        self.assertTrue(self.kind_visible(self.worker_a))
+
+    def test_other_worker_catches_up_when_its_token_expires(self):
+        self.assertFalse(self.kind_visible(self.worker_b))
+        self.toggle(self.worker_a)
+        with self.assertNumQueries(0):
+            self.assertFalse(self.kind_visible(self.worker_b))
+
+        later = time.time() + VERSION_TTL + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertTrue(self.kind_visible(self.worker_b))
+
+
+@override_settings(
+    ROOT_URLCONF="apps.dyn_dt.tests",
+    DYNAMIC_DATATB={"job": "apps.jobs.models.Job"},
+    CONDITIONAL_GET=True,
+)
+class ConditionalGetTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Member, Contribution)  # navbar: current user, unapproved badge
+
+    def setUp(self):
+        self.member = Member.objects.create(username="ann", email="a@example.com", password="x", role="admin")
+        set_session(self.client, user_id=self.member.pk, role="admin")
+        self.url = reverse("model_dt", args=["job"])
+        Job.objects.create(kind="a")
+        self.get()  # sets the CSRF cookie, which is part of the ETag
+
+    def get(self, etag=None):
+        return self.client.get(self.url, **({"HTTP_IF_NONE_MATCH": etag} if etag else {}))
+
+    def assertStale(self, etag):
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        return response["ETag"]
+
+    def test_unchanged_page_is_not_modified(self):
+        etag = self.get()["ETag"]
+        with self.assertNumQueries(1):  # the session row only
+            self.assertEqual(self.get(etag).status_code, 304)
+
+    def test_every_part_of_the_page_invalidates_it(self):
+        etag = self.get()["ETag"]
+        for change in (
+            lambda: invalidate_model_data("job", Job),
+            lambda: bump_version(page_config_scope("job")),
+            lambda: invalidate_user_snapshot(self.member.pk),
+            invalidate_unapproved_contributions_count,
+        ):
+            change()
+            etag = self.assertStale(etag)
+
+    def test_tokens_expire(self):
+        etag = self.get()["ETag"]
+        later = time.time() + VERSION_TTL + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertStale(etag)
+
+    def test_disabled_without_conditional_get(self):
+        with self.settings(CONDITIONAL_GET=False):
+            response = self.get()
+        self.assertFalse(response.has_header("ETag"))
@@ -1,8 +1,41 @@
-from django.db.models import Q
+import hashlib
+import json
+import uuid
 
-def user_filter(request, queryset, fields, fk_fields=[]):
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection, models
+from django.utils.functional import cached_property
+from django.db.models import Q, Count, Min, Max
+
+from apps.dyn_dt.models import HideShowFilter
+from apps.common.versions import VERSION_TTL, bump_version, get_version, model_scope
+from apps.dyn_dt.search import token_search
+
+COLUMN_SUMMARY_CACHE_KEY = "dyn_dt:column_summary:{}"
+COLUMN_SUMMARY_TTL = 300  # seconds; create/update/delete invalidate explicitly
+COLUMN_SUMMARY_MAX_DISTINCT = 20  # columns with more distinct values only get min/max/counts
+
+HIDE_SHOW_CACHE_KEY = "dyn_dt:hide_show:{}:{}"
+# Entries are keyed on the page's version token, so a toggle is seen at once
+# wherever the bump is; a worker with its own locmem cache catches up when its
+# token expires (VERSION_TTL).
+HIDE_SHOW_TTL = VERSION_TTL
+
+PAGE_COUNT_VERSION_KEY = "dyn_dt:count_version:{}"
+PAGE_COUNT_CACHE_KEY = "dyn_dt:count:{}:{}:{}"
+ESTIMATED_COUNT_MIN_ROWS = 10000  # below this, table statistics are too rough; count exactly
+
+def user_filter(request, queryset, fields, fk_fields=[], aPath=None):
     value = request.GET.get('search')
-    
+
+    # Use the token index when it covers this model; otherwise scan with icontains.
+    if value and aPath and settings.DYNAMIC_DATATB_SEARCH == 'token':
+        found = token_search(aPath, queryset, value)
+        if found is not None:
+            return found
+
     if value:
         dynamic_q = Q()
         for field in fields:
@@ -10,4 +43,174 @@ def user_filter(request, queryset, fields, fk_fields=[]):
                 dynamic_q |= Q(**{f'{field}__icontains': value})
         return queryset.filter(dynamic_q)
 
-    return queryset
\ No newline at end of file
+    return queryset
+
+
+def invalidate_hide_show_filters(aPath):
+    """Retires the cached column visibility config (and the page's ETag) after an edit."""
+    bump_version(page_config_scope(aPath))
+
+
+def hide_show_filters(aPath, db_fields):
+    """
+    Column visibility rows for a model, in field order. Loaded with one query;
+    rows missing for new fields are created with a single bulk insert.
+    """
+    parent = aPath.lower()
+    key = HIDE_SHOW_CACHE_KEY.format(parent, get_version(page_config_scope(parent))[0])
+    filters = cache.get(key)
+    if filters is not None and all(f in filters for f in db_fields):
+        return [filters[f] for f in db_fields]
+
+    def load():
+        rows = {}
+        for row in HideShowFilter.objects.filter(parent=parent, key__in=db_fields).order_by('id'):
+            rows.setdefault(row.key, row)
+        return rows
+
+    filters = load()
+    missing = [f for f in db_fields if f not in filters]
+    if missing:
+        HideShowFilter.objects.bulk_create(
+            [HideShowFilter(parent=parent, key=f) for f in missing]
+        )
+        # Not every backend returns primary keys from a bulk insert, and the
+        # template needs them, so read the rows back once.
+        filters = load()
+
+    cache.set(key, filters, HIDE_SHOW_TTL)
+    return [filters[f] for f in db_fields]
+
+
+def invalidate_model_data(aPath, aModelClass):
+    """
+    Drops the cached column summary and page counts after a row of the model
+    changes, and bumps the model's version so cached pages/API reads go stale.
+    """
+    cache.delete(COLUMN_SUMMARY_CACHE_KEY.format(aPath.lower()))
+    cache.set(PAGE_COUNT_VERSION_KEY.format(aPath.lower()), uuid.uuid4().hex, None)
+    bump_version(model_scope(aModelClass))
+
+
+def page_config_scope(aPath):
+    """Version scope of a dyn_dt page's filters, page size and visible columns."""
+    return f"dyn_dt:{aPath.lower()}"
+
+
+def page_count_key(aPath, filters, search):
+    """Cache key for the row count of one (model, filters, search) combination."""
+    version_key = PAGE_COUNT_VERSION_KEY.format(aPath.lower())
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+
+    digest = hashlib.sha1(
+        json.dumps([filters, search or ''], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return PAGE_COUNT_CACHE_KEY.format(aPath.lower(), version, digest)
+
+
+def estimated_row_count(aModelClass):
+    """
+    Row count from the database's table statistics, or None when the backend
+    keeps none. Cheap, but only approximate.
+    """
+    table = aModelClass._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                """
+                SELECT TABLE_ROWS FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                """,
+                [table]
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator whose COUNT(*) is cached under `cache_key` for
+    DYNAMIC_DATATB_COUNT_TTL seconds. With `estimate=True` (unfiltered views
+    only) large tables are counted from table statistics instead.
+    """
+
+    def __init__(self, object_list, per_page, cache_key=None, estimate=False, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.cache_key = cache_key
+        self.estimate = estimate
+
+    @cached_property
+    def count(self):
+        if self.cache_key:
+            count = cache.get(self.cache_key)
+            if count is not None:
+                return count
+
+        count = None
+        if self.estimate:
+            count = estimated_row_count(self.object_list.model)
+            if count is not None and count < ESTIMATED_COUNT_MIN_ROWS:
+                count = None
+        if count is None:
+            count = super().count
+
+        if self.cache_key:
+            cache.set(self.cache_key, count, settings.DYNAMIC_DATATB_COUNT_TTL)
+        return count
+
+
+def column_summary(aPath, aModelClass):
+    """
+    Per-column summary of a model: row and non-null counts, distinct count,
+    min/max and, for low-cardinality columns, the distinct values themselves.
+    Counts and bounds come from a single aggregate query; the result is cached.
+    """
+    key = COLUMN_SUMMARY_CACHE_KEY.format(aPath.lower())
+    summary = cache.get(key)
+    if summary is not None:
+        return summary
+
+    fields = aModelClass._meta.fields
+    aggregates = {'_rows': Count('pk')}
+    for field in fields:
+        aggregates[f'{field.name}__count'] = Count(field.name)
+        aggregates[f'{field.name}__distinct'] = Count(field.name, distinct=True)
+        # MIN/MAX over booleans is not portable; their distinct values cover it.
+        if not isinstance(field, models.BooleanField):
+            aggregates[f'{field.name}__min'] = Min(field.name)
+            aggregates[f'{field.name}__max'] = Max(field.name)
+
+    totals = aModelClass.objects.aggregate(**aggregates)
+
+    summary = {}
+    for field in fields:
+        distinct = totals[f'{field.name}__distinct']
+        values = None
+        if distinct <= COLUMN_SUMMARY_MAX_DISTINCT:
+            values = list(
+                aModelClass.objects.exclude(**{f'{field.attname}__isnull': True})
+                .order_by(field.attname)
+                .values_list(field.attname, flat=True)
+                .distinct()[:COLUMN_SUMMARY_MAX_DISTINCT]
+            )
+        summary[field.name] = {
+            'rows': totals['_rows'],
+            'count': totals[f'{field.name}__count'],
+            'distinct': distinct,
+            'min': totals.get(f'{field.name}__min'),
+            'max': totals.get(f'{field.name}__max'),
+            'values': values,
+        }
+
+    cache.set(key, summary, COLUMN_SUMMARY_TTL)
+    return summary
@@ -1,19 +1,29 @@
-import requests, base64, json, csv
+import requests, base64, json, csv, zlib
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.utils.safestring import mark_safe
 from django.conf import settings
 from django.urls import reverse
-from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from django.core.paginator import PageNotAnInteger, EmptyPage
 from django.urls import reverse
 from django.views import View
-from django.db import models
-from pprint import pp 
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from django.db.models import F, Q
+from django.utils.functional import SimpleLazyObject
 
 from apps.dyn_dt.models import ModelFilter, PageItems, HideShowFilter
-from apps.dyn_dt.utils import user_filter
+from apps.dyn_dt.utils import (
+    user_filter, column_summary, invalidate_model_data,
+    hide_show_filters, invalidate_hide_show_filters,
+    CachedCountPaginator, page_count_key, page_config_scope,
+)
+from apps.accounts.context_processors import user_scope
+from apps.common.registry import datatb_model
+from apps.common.versions import bump_version, model_scope, request_etag, last_modified
+from apps.contributions.context_processors import UNAPPROVED_COUNT_SCOPE
 
 from cli import *
 
@@ -43,6 +53,7 @@ def create_filter(request, model_name):
                 key=key,
                 defaults={'value': value}
             )
+        bump_version(page_config_scope(model_name))
 
         return redirect(reverse('model_dt', args=[model_name]))
 
@@ -55,6 +66,7 @@ def create_page_items(request, model_name):
             parent=model_name,
             defaults={'items_per_page':items}
         )
+        bump_version(page_config_scope(model_name))
         return redirect(reverse('model_dt', args=[model_name]))
 
 
@@ -69,6 +81,7 @@ def create_hide_show_filter(request, model_name):
             key=data.get('key'),
             defaults={'value': data.get('value')}
         )
+        invalidate_hide_show_filters(model_name)
 
         response_data = {'message': 'Model updated successfully'}
         return JsonResponse(response_data)
@@ -80,50 +93,58 @@ def delete_filter(request, model_name, id):
     model_name = model_name.lower()
     filter_instance = ModelFilter.objects.get(id=id, parent=model_name)
     filter_instance.delete()
+    bump_version(page_config_scope(model_name))
     return redirect(reverse('model_dt', args=[model_name]))
 
 
-def get_model_field_names(model, field_type):
-    """Returns a list of field names based on the given field type."""
-    return [
-        field.name for field in model._meta.get_fields() 
-        if isinstance(field, field_type)
-    ]
+def _model_dt_scopes(request, aPath):
+    """
+    Everything the rendered page shows: the rows, the FK dropdowns, the page
+    config, and the navbar (current user and unapproved contributions badge).
+    """
+    info = datatb_model(aPath)
+    if not info:
+        return None
+    scopes = [model_scope(info.model), page_config_scope(aPath), UNAPPROVED_COUNT_SCOPE]
+    scopes += [model_scope(related) for related in info.fk_models.values()]
+    user_id = request.session.get('user_id')  # the page loads the session anyway
+    if user_id:
+        scopes.append(user_scope(user_id))
+    return scopes
 
-def model_dt(request, aPath):
-    aModelName  = None
-    aModelClass = None
-    choices_dict = {}
 
-    if aPath in settings.DYNAMIC_DATATB.keys():
-        aModelName  = settings.DYNAMIC_DATATB[aPath]
-        aModelClass = name_to_class(aModelName)
+def model_dt_etag(request, aPath):
+    scopes = _model_dt_scopes(request, aPath)
+    return request_etag(request, *scopes) if scopes else None
 
-    if not aModelClass:
+
+def model_dt_last_modified(request, aPath):
+    scopes = _model_dt_scopes(request, aPath)
+    return last_modified(*scopes) if scopes else None
+
+
+# Unchanged pages are answered with 304 from cached version tokens, before
+# any query runs; no-cache makes browsers revalidate instead of guessing.
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=model_dt_etag, last_modified_func=model_dt_last_modified)
+def model_dt(request, aPath):
+    # Field lists, FK map, choices and typed groups come from the registry
+    # built at startup (apps.common.registry); only FK rows are read here.
+    info = datatb_model(aPath)
+    if not info:
         return HttpResponse( ' > ERR: Getting ModelClass for path: ' + aPath )
+
+    aModelClass = info.model
+    db_fields = info.db_fields
+    fk_fields = info.fk_values()
+    db_filters = info.non_fk_fields
+    choices_dict = info.choices
+
+    field_names = hide_show_filters(aPath, db_fields)
     
-    #db_fields = [field.name for field in aModelClass._meta.get_fields() if not field.is_relation]
-    db_fields = [field.name for field in aModelClass._meta.fields]
-    fk_fields = get_model_fk_values(aModelClass)
-    db_filters = []
-    for f in db_fields:
-        if f not in fk_fields.keys():
-            db_filters.append( f )
-
-    for field in aModelClass._meta.fields:
-        if field.choices:
-            choices_dict[field.name] = field.choices
-
-    field_names = []
-    for field_name in db_fields:
-        fields, created = HideShowFilter.objects.get_or_create(key=field_name, parent=aPath.lower())
-        if fields.key in db_fields:
-            field_names.append(fields)
-    
-    model_series = {}
-    for f in db_fields:
-        f_values = list ( aModelClass.objects.values_list( f, flat=True) )
-        model_series[ f ] = ', '.join( str(i) for i in f_values)
+    # Column summary (distinct values, min/max, counts) is cached per model
+    # and only computed when something actually reads it.
+    model_series = SimpleLazyObject(lambda: column_summary(aPath, aModelClass))
 
     # model filter
     filter_string = {}
@@ -137,7 +158,7 @@ def model_dt(request, aPath):
         order_by = 'id'
     
     queryset = aModelClass.objects.filter(**filter_string).order_by(order_by)
-    item_list = user_filter(request, queryset, db_fields, fk_fields.keys())
+    item_list = user_filter(request, queryset, db_fields, fk_fields.keys(), aPath)
 
     # pagination
     page_items = PageItems.objects.filter(parent=aPath.lower()).last()
@@ -145,8 +166,15 @@ def model_dt(request, aPath):
     if page_items:
         p_items = page_items.items_per_page
 
+    # Counts are cached per (model, filters, search); unfiltered views may
+    # use table statistics when DYNAMIC_DATATB_ESTIMATED_COUNT is on.
+    search = request.GET.get('search')
     page = request.GET.get('page', 1)
-    paginator = Paginator(item_list, p_items)
+    paginator = CachedCountPaginator(
+        item_list, p_items,
+        cache_key=page_count_key(aPath, filter_string, search),
+        estimate=settings.DYNAMIC_DATATB_ESTIMATED_COUNT and not filter_string and not search,
+    )
 
     try:
         items = paginator.page(page)
@@ -157,11 +185,6 @@ def model_dt(request, aPath):
     
     read_only_fields = ('id', )
 
-    integer_fields = get_model_field_names(aModelClass, models.IntegerField)
-    date_time_fields = get_model_field_names(aModelClass, models.DateTimeField)
-    email_fields = get_model_field_names(aModelClass, models.EmailField)
-    text_fields = get_model_field_names(aModelClass, (models.TextField, models.CharField))
-    
     context = {
         'page_title': 'Dynamic DataTable - ' + aPath.lower().title(),
         'link': aPath,
@@ -173,13 +196,14 @@ def model_dt(request, aPath):
         'filter_instance': filter_instance,
         'read_only_fields': read_only_fields,
 
-        'integer_fields': integer_fields,
-        'date_time_fields': date_time_fields,
-        'email_fields': email_fields,
-        'text_fields': text_fields,
+        'integer_fields': info.integer_fields,
+        'date_time_fields': info.date_time_fields,
+        'email_fields': info.email_fields,
+        'text_fields': info.text_fields,
         'fk_fields_keys': list( fk_fields.keys() ),
         'fk_fields': fk_fields ,
         'choices_dict': choices_dict,
+        'model_series': model_series,
         'parent': 'apps',
         'segment': 'dynamic_dt'
     }
@@ -188,18 +212,15 @@ def model_dt(request, aPath):
 
 @login_required(login_url='/accounts/login/')
 def create(request, aPath):
-    aModelClass = None
-
-    if aPath in settings.DYNAMIC_DATATB.keys():
-        aModelName  = settings.DYNAMIC_DATATB[aPath]
-        aModelClass = name_to_class(aModelName)
+    info = datatb_model(aPath)
+    aModelClass = info.model if info else None
 
     if not aModelClass:
         return HttpResponse( ' > ERR: Getting ModelClass for path: ' + aPath )
 
     if request.method == 'POST':
         data = {}
-        fk_fields = get_model_fk(aModelClass)
+        fk_fields = info.fk_models
 
         for attribute, value in request.POST.items():
             if attribute == 'csrfmiddlewaretoken':
@@ -207,44 +228,40 @@ def create(request, aPath):
 
             # Process FKs    
             if attribute in fk_fields.keys():
-                value = name_to_class( fk_fields[attribute] ).objects.filter(id=value).first()
+                value = fk_fields[attribute].objects.filter(id=value).first()
             
             data[attribute] = value if value else ''
 
         aModelClass.objects.create(**data)
+        invalidate_model_data(aPath, aModelClass)
 
     return redirect(request.META.get('HTTP_REFERER'))
 
 
 @login_required(login_url='/accounts/login/')
 def delete(request, aPath, id):
-    aModelClass = None
-
-    if aPath in settings.DYNAMIC_DATATB.keys():
-        aModelName  = settings.DYNAMIC_DATATB[aPath]
-        aModelClass = name_to_class(aModelName)
+    info = datatb_model(aPath)
+    aModelClass = info.model if info else None
 
     if not aModelClass:
         return HttpResponse( ' > ERR: Getting ModelClass for path: ' + aPath )
     
     item = aModelClass.objects.get(id=id)
     item.delete()
+    invalidate_model_data(aPath, aModelClass)
     return redirect(request.META.get('HTTP_REFERER'))
 
 
 @login_required(login_url='/accounts/login/')
 def update(request, aPath, id):
-    aModelClass = None
-
-    if aPath in settings.DYNAMIC_DATATB.keys():
-        aModelName  = settings.DYNAMIC_DATATB[aPath]
-        aModelClass = name_to_class(aModelName)
+    info = datatb_model(aPath)
+    aModelClass = info.model if info else None
 
     if not aModelClass:
         return HttpResponse( ' > ERR: Getting ModelClass for path: ' + aPath )
 
     item = aModelClass.objects.get(id=id)
-    fk_fields = get_model_fk(aModelClass)
+    fk_fields = info.fk_models
 
     if request.method == 'POST':
         for attribute, value in request.POST.items():
@@ -256,62 +273,116 @@ def update(request, aPath, id):
 
                 # Process FKs    
                 if attribute in fk_fields.keys():
-                    value = name_to_class( fk_fields[attribute] ).objects.filter(id=value).first()
+                    value = fk_fields[attribute].objects.filter(id=value).first()
 
                 setattr(item, attribute, value)
         
         item.save()
+        invalidate_model_data(aPath, aModelClass)
 
     return redirect(request.META.get('HTTP_REFERER'))
 
 
 
 # Export as CSV
+EXPORT_CHUNK_SIZE = 2000  # rows fetched per round trip while streaming
+
+
+class Echo:
+    """File-like object whose write() hands the value back, for csv.writer."""
+    def write(self, value):
+        return value
+
+
+def gzip_stream(chunks):
+    """Compresses a stream of text chunks into gzip bytes as they are produced."""
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def keyset_rows(queryset, fields, order_by, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields `fields` of every row ordered by (`order_by`, pk), one keyset slice
+    per query. `.iterator()` is no help on MySQL: the driver buffers the whole
+    result client-side, so each slice is a separate bounded query instead.
+    """
+    width = len(fields)
+    by_pk = order_by in ('pk', queryset.model._meta.pk.name)
+    if by_pk:
+        queryset = queryset.order_by('pk')
+        columns = (*fields, 'pk')
+    else:
+        queryset = queryset.order_by(F(order_by).asc(nulls_first=True), 'pk')
+        columns = (*fields, order_by, 'pk')
+
+    after = Q()
+    while True:
+        chunk = list(queryset.filter(after).values_list(*columns)[:chunk_size])
+        for row in chunk:
+            yield row[:width]
+        if len(chunk) < chunk_size:
+            return
+
+        last_pk = chunk[-1][-1]
+        if by_pk:
+            after = Q(pk__gt=last_pk)
+        else:
+            last_value = chunk[-1][-2]
+            if last_value is None:
+                after = Q(**{f'{order_by}__isnull': True, 'pk__gt': last_pk}) | Q(**{f'{order_by}__isnull': False})
+            else:
+                after = Q(**{f'{order_by}__gt': last_value}) | Q(**{order_by: last_value, 'pk__gt': last_pk})
+
+
 class ExportCSVView(View):
     def get(self, request, aPath):
-        aModelName  = None
-        aModelClass = None
-
-        if aPath in settings.DYNAMIC_DATATB.keys():
-            aModelName  = settings.DYNAMIC_DATATB[aPath]
-            aModelClass = name_to_class(aModelName)
+        info = datatb_model(aPath)
+        aModelClass = info.model if info else None
 
         if not aModelClass:
             return HttpResponse( ' > ERR: Getting ModelClass for path: ' + aPath )
-        
-        db_field_names = [field.name for field in aModelClass._meta.get_fields()]
+
+        db_field_names = info.db_fields
         fields = []
         show_fields = HideShowFilter.objects.filter(value=False, parent=aPath.lower())
-        
+
         for field in show_fields:
             if field.key in db_field_names:
                 fields.append(field.key)
-            else:
-                print(f"Field {field.key} does not exist in {aModelClass} model.")
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = f'attachment; filename="{aPath.lower()}.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow(fields)  # Write the header
 
         filter_string = {}
         filter_instance = ModelFilter.objects.filter(parent=aPath.lower())
         for filter_data in filter_instance:
-            filter_string[f'{filter_data.key}__icontains'] = filter_data.value
+            if filter_data.key in db_field_names:
+                filter_string[f'{filter_data.key}__icontains'] = filter_data.value
 
         order_by = request.GET.get('order_by', 'id')
+        if order_by not in db_field_names:
+            order_by = 'id'
         queryset = aModelClass.objects.filter(**filter_string).order_by(order_by)
 
-        items = user_filter(request, queryset, db_field_names)
+        # Only the visible columns are selected, and rows come back as tuples
+        # in keyset slices, so no model instances or full CSV are held in memory.
+        items = user_filter(request, queryset, db_field_names, info.fk_models.keys(), aPath)
+        rows = keyset_rows(items, fields, order_by) if fields else iter(())
+
+        writer = csv.writer(Echo())
+
+        def generate():
+            yield writer.writerow(fields)  # Write the header
+            for row in rows:
+                yield writer.writerow(row)
 
-        for item in items:
-            row_data = []
-            for field in fields:
-                try:
-                    row_data.append(getattr(item, field))
-                except AttributeError:
-                    row_data.append('') 
-            writer.writerow(row_data)
+        filename = f'{aPath.lower()}.csv'
+        if request.GET.get('gzip'):
+            response = StreamingHttpResponse(gzip_stream(generate()), content_type='application/gzip')
+            filename += '.gz'
+        else:
+            response = StreamingHttpResponse(generate(), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
 
-        return response
\ No newline at end of file
+        return response
@@ -0,0 +1,44 @@
+# apps/investments/jobs.py
+
+from django.db import connection, transaction
+
+from apps.common.approvals import insert_signatures, lock_pending
+from apps.jobs.queue import handler
+from apps.pages import summary
+
+
+def approve_investments(ids, signatory_id):
+    """
+    Approves the pending investments among `ids` and signs them as
+    `signatory_id`, in three statements. Returns the ids that changed.
+    """
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # 1. Lock the selected investments that are still pending
+            pending_rows = lock_pending(
+                cursor, "investments", ids, "approved = FALSE",
+                columns=("id", "amount", "investment_date"),
+            )
+            changed_ids = [row[0] for row in pending_rows]
+
+            if changed_ids:
+                # 2. Approve exactly those rows in one statement
+                placeholders = ', '.join(['%s'] * len(changed_ids))
+                cursor.execute(f"""
+                    UPDATE investments
+                    SET approved = TRUE
+                    WHERE id IN ({placeholders});
+                """, changed_ids)
+
+                # 3. One signature per approved investment, in a single INSERT
+                insert_signatures(cursor, "investment_signatures", "investment_id", changed_ids, signatory_id)
+
+        summary.record_approval("investments", [(amount, on_date) for _, amount, on_date in pending_rows])
+        summary.record_signatures("investments", len(changed_ids))
+
+    return changed_ids
+
+
+@handler("investments.approve")
+def approve_investments_job(ids, job):
+    return approve_investments(ids, job.created_by)
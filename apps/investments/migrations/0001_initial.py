@@ -0,0 +1,59 @@
+# Generated by Django 4.2.9 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+from apps.common.indexes import create_declared_indexes, drop_declared_indexes
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Investment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('investment_date', models.DateField()),
+                ('description', models.TextField(blank=True, null=True)),
+                ('approved', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'investments',
+                'managed': False,
+                'indexes': [
+                    models.Index(fields=['user_id', 'investment_date'], name='invest_user_date_idx'),
+                    models.Index(fields=['approved'], name='invest_approved_idx'),
+                    models.Index(fields=['investment_date'], name='invest_date_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='InvestmentSignature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('investment_id', models.IntegerField()),
+                ('signatory_id', models.IntegerField()),
+                ('signed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'investment_signatures',
+                'managed': False,
+                'indexes': [
+                    models.Index(fields=['investment_id'], name='invest_sig_invest_idx'),
+                    models.Index(fields=['signed_at'], name='invest_sig_signed_idx'),
+                ],
+            },
+        ),
+        # Unmanaged models get no DDL from Django; create the declared indexes here
+        migrations.RunPython(
+            create_declared_indexes('investments', 'Investment', 'InvestmentSignature'),
+            drop_declared_indexes('investments', 'Investment', 'InvestmentSignature'),
+        ),
+    ]
@@ -1,3 +1,38 @@
 from django.db import models
 
-# Create your models here.
+
+class Investment(models.Model):
+    """Unmanaged mapping of the `investments` table, declaring its indexes."""
+    user_id = models.IntegerField()
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    investment_date = models.DateField()
+    description = models.TextField(null=True, blank=True)
+    approved = models.BooleanField(default=False)
+    created_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        managed = False
+        db_table = "investments"
+        indexes = [
+            # member view: WHERE user_id = %s ORDER BY investment_date
+            models.Index(fields=["user_id", "investment_date"], name="invest_user_date_idx"),
+            # batch approval: WHERE id IN (...) AND approved = FALSE
+            models.Index(fields=["approved"], name="invest_approved_idx"),
+            # admin view / keyset seek: ORDER BY investment_date, id
+            models.Index(fields=["investment_date"], name="invest_date_idx"),
+        ]
+
+
+class InvestmentSignature(models.Model):
+    """Unmanaged mapping of the `investment_signatures` table."""
+    investment_id = models.IntegerField()
+    signatory_id = models.IntegerField()
+    signed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        managed = False
+        db_table = "investment_signatures"
+        indexes = [
+            models.Index(fields=["investment_id"], name="invest_sig_invest_idx"),
+            models.Index(fields=["signed_at"], name="invest_sig_signed_idx"),
+        ]
@@ -1,3 +1,44 @@
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from apps.common.testing import UnmanagedTablesMixin
+from apps.investments.jobs import approve_investments
+from apps.investments.models import Investment, InvestmentSignature
+from apps.pages import summary
+from apps.pages.models import DashboardSummary
+
+
+class ApproveInvestmentsTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Investment, InvestmentSignature)
+
+    def setUp(self):
+        # A summary built before any investment existed
+        DashboardSummary.objects.create(pk=summary.SUMMARY_ID)
+        self.pending = [
+            Investment.objects.create(user_id=1, amount=Decimal("100.00"), investment_date="2025-01-05")
+            for _ in range(2)
+        ]
+        self.approved = Investment.objects.create(
+            user_id=1, amount=Decimal("50.00"), investment_date="2025-01-05", approved=True,
+        )
+        for investment in self.pending:
+            summary.record_amount("investments", investment.amount, investment.investment_date, approved=False)
+
+    def test_approves_and_signs_only_pending_rows(self):
+        ids = [i.pk for i in self.pending] + [self.approved.pk]
+        changed = approve_investments(ids, signatory_id=9)
+
+        self.assertEqual(sorted(changed), sorted(i.pk for i in self.pending))
+        self.assertFalse(Investment.objects.filter(approved=False).exists())
+        self.assertEqual(
+            sorted(InvestmentSignature.objects.values_list("investment_id", flat=True)), sorted(changed)
+        )
+        totals = DashboardSummary.objects.get(pk=summary.SUMMARY_ID)
+        self.assertEqual((totals.investments_approved, totals.investments_pending), (Decimal("200.00"), Decimal("0.00")))
+
+    def test_second_run_is_a_no_op(self):
+        ids = [i.pk for i in self.pending]
+        approve_investments(ids, signatory_id=9)
+        self.assertEqual(approve_investments(ids, signatory_id=9), [])
+        self.assertEqual(InvestmentSignature.objects.count(), 2)
@@ -1,7 +1,15 @@
 from django.shortcuts import render, redirect
-from django.db import connection
+from django.db import connection, transaction
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.urls import reverse
+
+from apps.common.approvals import parse_ids
+from apps.common.pagination import InvalidCursor, keyset_paginate, search_condition
+from apps.jobs.queue import enqueue
+from apps.pages import summary
+
+INVESTMENT_SEARCH_COLUMNS = ("u.member_id", "u.first_name", "u.last_name", "i.description")
 
 # Note: Using a custom decorator that manages session and authentication
 # You may need to replace this with Django's built-in @login_required
@@ -11,34 +19,46 @@ def list_investments(request):
     Lists investments.
     - Admins see all investments.
     - Members see only their own investments.
+    Results are served one keyset page at a time.
     """
-    investments = []
     user_id = request.session.get("user_id")
     user_role = request.session.get("role")
 
-    with connection.cursor() as cursor:
-        if user_role == 'admin':
-            cursor.execute("""
-                SELECT i.id, i.user_id, u.first_name, u.last_name, u.member_id,
-                       i.amount, i.investment_date, i.description, i.approved, i.created_at
-                FROM investments i
-                JOIN users u ON i.user_id = u.id
-                ORDER BY i.investment_date DESC
-            """)
-        elif user_id:
-            cursor.execute("""
-                SELECT i.id, i.user_id, u.first_name, u.last_name, u.member_id,
-                       i.amount, i.investment_date, i.description, i.approved, i.created_at
-                FROM investments i
-                JOIN users u ON i.user_id = u.id
-                WHERE i.user_id = %s
-                ORDER BY i.investment_date DESC
-            """, [user_id])
-        
-        columns = [col[0] for col in cursor.description]
-        investments = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    if user_role != 'admin' and not user_id:
+        return render(request, "investments/list_investments.html", {"investments": []})
+
+    query = """
+        SELECT i.id, i.user_id, u.first_name, u.last_name, u.member_id,
+               i.amount, i.investment_date, i.description, i.approved, i.created_at
+        FROM investments i
+        JOIN users u ON i.user_id = u.id
+    """
+    where = []
+    params = []
+
+    if user_role != 'admin':
+        where.append("i.user_id = %s")
+        params.append(user_id)
+
+    search = request.GET.get("q", "").strip()
+    search_sql, search_params = search_condition(INVESTMENT_SEARCH_COLUMNS, search)
+    if search_sql:
+        where.append(search_sql)
+        params += search_params
+    if where:
+        query += " WHERE " + " AND ".join(where)
+
+    try:
+        with connection.cursor() as cursor:
+            page = keyset_paginate(
+                cursor, query, params,
+                sort_key="investment_date", tiebreaker="id",
+                token=request.GET.get("cursor"),
+            )
+    except InvalidCursor:
+        return redirect("list_investments")
 
-    return render(request, "investments/list_investments.html", {"investments": investments})
+    return render(request, "investments/list_investments.html", {"investments": page.rows, "page": page, "search": search})
 
 
 def add_investment(request):
@@ -51,11 +71,13 @@ def add_investment(request):
         investment_date = request.POST.get("investment_date")
         description = request.POST.get("description")
         
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO investments (user_id, amount, investment_date, description)
-                VALUES (%s, %s, %s, %s)
-            """, [user_id, amount, investment_date, description])
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO investments (user_id, amount, investment_date, description)
+                    VALUES (%s, %s, %s, %s)
+                """, [user_id, amount, investment_date, description])
+            summary.record_amount("investments", amount, investment_date, approved=False)
         
         messages.success(request, "Investment submitted successfully and is pending approval.")
         return redirect("list_investments")
@@ -87,30 +109,19 @@ def approve_multiple_investments(request):
     if user_role not in ['admin', 'super_admin']:
         return JsonResponse({"error": "You do not have permission to perform this action."}, status=403)
 
-    approved_ids = request.POST.getlist('approved_ids[]')
+    approved_ids = parse_ids(request.POST.getlist('approved_ids[]'))
     
     if not approved_ids:
         return JsonResponse({"error": "No investments selected for approval."}, status=400)
 
     try:
-        with transaction.atomic():
-            with connection.cursor() as cursor:
-                for investment_id in approved_ids:
-                    # 1. Update the 'approved' status in the investments table
-                    cursor.execute("""
-                        UPDATE investments
-                        SET approved = TRUE
-                        WHERE id = %s AND approved = FALSE;
-                    """, [investment_id])
-                    
-                    # 2. Add a signature record for the approval
-                    cursor.execute("""
-                        INSERT INTO investment_signatures (investment_id, signatory_id)
-                        VALUES (%s, %s);
-                    """, [investment_id, user_id])
-
-        messages.success(request, f"{len(approved_ids)} investment(s) successfully approved.")
-        return JsonResponse({"message": "Investments approved successfully."})
+        # Large batches run in the background worker; the page polls the job
+        job = enqueue("investments.approve", approved_ids, created_by=user_id)
+        return JsonResponse({
+            "message": f"Approval of {len(approved_ids)} investment(s) queued.",
+            "job_id": job.pk,
+            "status_url": reverse("job_status", args=[job.pk]),
+        }, status=202)
         
     except Exception as e:
         # If any part of the transaction fails, it will be rolled back automatically
@@ -171,12 +182,17 @@ def edit_investment(request, investment_id):
         description = request.POST.get("description")
         
         try:
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    UPDATE investments
-                    SET amount = %s, investment_date = %s, description = %s
-                    WHERE id = %s;
-                """, [amount, investment_date, description, investment_id])
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("""
+                        UPDATE investments
+                        SET amount = %s, investment_date = %s, description = %s
+                        WHERE id = %s;
+                    """, [amount, investment_date, description, investment_id])
+                summary.record_amount(
+                    "investments", investment['amount'], investment['investment_date'], approved=False, sign=-1
+                )
+                summary.record_amount("investments", amount, investment_date, approved=False)
 
             messages.success(request, "Investment updated successfully.")
             return redirect('list_investments')
@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from apps.jobs.queue import claim_next, run_job
+
+
+class Command(BaseCommand):
+    help = "Runs queued background jobs (batch approvals)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Process every queued job, then exit instead of polling.",
+        )
+        parser.add_argument(
+            "--interval", type=float, default=2.0,
+            help="Seconds to wait between polls when the queue is empty.",
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Job worker started.")
+        try:
+            while True:
+                close_old_connections()
+                job = claim_next()
+
+                if job is None:
+                    if options["once"]:
+                        break
+                    time.sleep(options["interval"])
+                    continue
+
+                job = run_job(job)
+                self.stdout.write(
+                    f"{job}: {job.processed}/{job.total} processed, "
+                    f"{job.result.get('changed', 0)} changed"
+                )
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write("Job worker stopped.")
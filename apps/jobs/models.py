@@ -0,0 +1,52 @@
+from django.db import models
+
+
+class Job(models.Model):
+    """
+    A unit of background work, claimed and run by `manage.py run_jobs`.
+    `payload["ids"]` is processed in chunks; `processed` is saved after every
+    chunk so a job taken over from a dead worker resumes where it stopped.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    total = models.IntegerField(default=0)
+    processed = models.IntegerField(default=0)
+    result = models.JSONField(default=dict)
+    error = models.TextField(blank=True, default="")
+    attempts = models.IntegerField(default=0)
+    created_by = models.IntegerField(null=True, blank=True)  # users.id
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "jobs"
+        indexes = [
+            models.Index(fields=["status", "id"], name="jobs_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def progress(self):
+        if not self.total:
+            return 100 if self.status == self.DONE else 0
+        return int(self.processed * 100 / self.total)
+
+    @property
+    def finished(self):
+        return self.status in (self.DONE, self.FAILED)
@@ -0,0 +1,108 @@
+# apps/jobs/queue.py
+
+"""
+A small database-backed job queue.
+
+Views call `enqueue()` and return at once; `manage.py run_jobs` claims
+pending jobs with SELECT ... FOR UPDATE SKIP LOCKED and feeds their ids to
+the registered handler chunk by chunk. Handlers must be idempotent per chunk:
+a chunk may run again if a worker dies between committing it and saving
+the job's progress.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+def handler(kind):
+    """
+    Registers `func(chunk_ids, job)` as the handler for `kind`. It returns the
+    ids it actually changed, which are accumulated in `job.result`.
+    """
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, ids, created_by=None, **payload):
+    """Queues `ids` for processing by the `kind` handler and returns the Job."""
+    job = Job.objects.create(
+        kind=kind,
+        payload={"ids": list(ids), **payload},
+        total=len(ids),
+        created_by=created_by,
+    )
+
+    if getattr(settings, "JOBS_RUN_INLINE", True) or kind in getattr(settings, "JOBS_INLINE_KINDS", ()):
+        # Development mode without a worker, or work that needs this
+        # process's disk (e.g. avatars when the worker runs on another host)
+        run_job(job)
+
+    return job
+
+
+def claim_next():
+    """
+    Marks the oldest runnable job as running and returns it, or None. Jobs a
+    dead worker left running past JOBS_STALE_AFTER seconds are taken over.
+    """
+    stale_before = timezone.now() - timedelta(seconds=getattr(settings, "JOBS_STALE_AFTER", 600))
+    skip_locked = connection.features.has_select_for_update_skip_locked
+
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=skip_locked)
+            .filter(Q(status=Job.PENDING) | Q(status=Job.RUNNING, updated_at__lt=stale_before))
+            .order_by("id")
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = Job.RUNNING
+        job.attempts += 1
+        job.started_at = job.started_at or timezone.now()
+        job.save(update_fields=["status", "attempts", "started_at", "updated_at"])
+
+    return job
+
+
+def run_job(job):
+    func = HANDLERS.get(job.kind)
+    ids = job.payload.get("ids", [])
+    chunk_size = job.payload.get("chunk_size") or getattr(settings, "JOBS_CHUNK_SIZE", 100)
+
+    try:
+        if func is None:
+            raise LookupError(f"No handler registered for job kind {job.kind!r}")
+
+        for offset in range(job.processed, len(ids), chunk_size):
+            chunk = ids[offset:offset + chunk_size]
+            changed = func(chunk, job) or []
+
+            job.processed = offset + len(chunk)
+            job.result["changed"] = job.result.get("changed", 0) + len(changed)
+            job.result["changed_ids"] = job.result.get("changed_ids", []) + list(changed)
+            job.save(update_fields=["processed", "result", "updated_at"])
+
+        job.status = Job.DONE
+    except Exception as e:
+        logger.exception("Job %s failed", job.pk)
+        job.status = Job.FAILED
+        job.error = str(e)
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+    return job
@@ -0,0 +1,124 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.common.testing import set_session
+from apps.jobs import queue
+from apps.jobs.models import Job
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def record(ids, job):
+            self.calls.append(list(ids))
+            return [i for i in ids if i % 2]  # only odd ids "change"
+
+        def explode(ids, job):
+            if 3 in ids:
+                raise ValueError("boom")
+            self.calls.append(list(ids))
+            return ids
+
+        handlers = mock.patch.dict(queue.HANDLERS, {"test.record": record, "test.explode": explode})
+        handlers.start()
+        self.addCleanup(handlers.stop)
+
+    def test_enqueue_creates_pending_job(self):
+        with self.settings(JOBS_RUN_INLINE=False):
+            job = queue.enqueue("test.record", [1, 2, 3], created_by=7, note="x")
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.PENDING)
+        self.assertEqual(job.payload, {"ids": [1, 2, 3], "note": "x"})
+        self.assertEqual((job.total, job.created_by), (3, 7))
+        self.assertEqual(self.calls, [])
+
+    def test_enqueue_runs_inline_when_configured(self):
+        with self.settings(JOBS_RUN_INLINE=True):
+            job = queue.enqueue("test.record", [1, 2, 3])
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(self.calls, [[1, 2, 3]])
+
+    def test_inline_kinds_run_in_the_request(self):
+        with self.settings(JOBS_RUN_INLINE=False, JOBS_INLINE_KINDS=["test.record"]):
+            inline = queue.enqueue("test.record", [1])
+            queued = queue.enqueue("test.explode", [2])
+        self.assertEqual((inline.status, queued.status), (Job.DONE, Job.PENDING))
+
+    def test_claim_next_takes_oldest_pending_job(self):
+        with self.settings(JOBS_RUN_INLINE=False):
+            first = queue.enqueue("test.record", [1])
+            queue.enqueue("test.record", [2])
+
+        claimed = queue.claim_next()
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual((claimed.status, claimed.attempts), (Job.RUNNING, 1))
+        self.assertNotEqual(queue.claim_next().pk, first.pk)
+        self.assertIsNone(queue.claim_next())
+
+    def test_claim_next_takes_over_stale_running_jobs(self):
+        with self.settings(JOBS_RUN_INLINE=False):
+            job = queue.enqueue("test.record", [1, 2])
+        self.assertEqual(queue.claim_next().pk, job.pk)
+
+        with self.settings(JOBS_STALE_AFTER=600):
+            # Still fresh: another worker must not pick it up.
+            self.assertIsNone(queue.claim_next())
+
+            Job.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(seconds=601))
+            taken = queue.claim_next()
+        self.assertEqual((taken.pk, taken.attempts), (job.pk, 2))
+
+    def test_run_job_processes_chunks_and_records_changed_ids(self):
+        with self.settings(JOBS_RUN_INLINE=False):
+            job = queue.enqueue("test.record", [1, 2, 3, 4, 5], chunk_size=2)
+        queue.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual(self.calls, [[1, 2], [3, 4], [5]])
+        self.assertEqual((job.status, job.processed, job.progress), (Job.DONE, 5, 100))
+        self.assertEqual(job.result, {"changed": 3, "changed_ids": [1, 3, 5]})
+
+    def test_run_job_resumes_after_processed(self):
+        with self.settings(JOBS_RUN_INLINE=False):
+            job = queue.enqueue("test.record", [1, 2, 3, 4], chunk_size=2)
+        job.processed = 2
+        queue.run_job(job)
+        self.assertEqual(self.calls, [[3, 4]])
+
+    def test_failed_chunk_keeps_earlier_progress(self):
+        with self.settings(JOBS_RUN_INLINE=False):
+            job = queue.enqueue("test.explode", [1, 2, 3, 4], chunk_size=2)
+        queue.run_job(job)
+
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.processed, job.error), (Job.FAILED, 2, "boom"))
+        self.assertEqual(job.result["changed_ids"], [1, 2])
+        self.assertTrue(job.finished)
+
+    def test_unknown_kind_fails(self):
+        with self.settings(JOBS_RUN_INLINE=False):
+            job = queue.enqueue("test.missing", [1])
+        queue.run_job(job)
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("test.missing", job.error)
+
+
+class JobStatusTests(TestCase):
+    def test_status_reports_changed_ids(self):
+        job = Job.objects.create(
+            kind="test.record", total=2, processed=2, status=Job.DONE, created_by=5,
+            result={"changed": 1, "changed_ids": [9]},
+        )
+        url = reverse("job_status", args=[job.pk])
+        set_session(self.client, user_id=5, role="member")
+
+        data = self.client.get(url).json()
+        self.assertEqual((data["changed"], data["changed_ids"], data["finished"]), (1, [9], True))
+
+        set_session(self.client, user_id=6)
+        self.assertEqual(self.client.get(url).status_code, 403)
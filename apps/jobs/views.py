@@ -0,0 +1,28 @@
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+
+from apps.jobs.models import Job
+
+
+def job_status(request, job_id):
+    """Progress of a background job, polled by the batch approval pages."""
+    user_id = request.session.get("user_id")
+    if not user_id:
+        return JsonResponse({"error": "Please log in first."}, status=403)
+
+    job = get_object_or_404(Job, pk=job_id)
+    if job.created_by != user_id and request.session.get("role") not in ['admin', 'super_admin']:
+        return JsonResponse({"error": "You do not have permission to view this job."}, status=403)
+
+    return JsonResponse({
+        "id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "total": job.total,
+        "processed": job.processed,
+        "progress": job.progress,
+        "finished": job.finished,
+        "changed": job.result.get("changed", 0),
+        "changed_ids": job.result.get("changed_ids", []),
+        "error": job.error,
+    })
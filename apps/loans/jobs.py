@@ -0,0 +1,47 @@
+# apps/loans/jobs.py
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.common.approvals import insert_signatures, lock_pending
+from apps.jobs.queue import handler
+from apps.pages import summary
+
+
+def approve_loans(ids, signatory_id):
+    """
+    Approves the pending loans among `ids` and signs exactly those as
+    `signatory_id`. Returns the ids that changed.
+    """
+    current_time = timezone.now()
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # 1. Lock the selected loans that are still pending; only these transition
+            pending_rows = lock_pending(
+                cursor, "loans", ids, "status = 'pending'",
+                columns=("id", "amount", "created_at"),
+            )
+            changed_ids = [row[0] for row in pending_rows]
+
+            if changed_ids:
+                # 2. Update the loans to 'approved' and set the approved_at timestamp
+                placeholders = ','.join(['%s'] * len(changed_ids))
+                cursor.execute(f"""
+                    UPDATE loans
+                    SET status = 'approved', approved_at = %s
+                    WHERE id IN ({placeholders});
+                """, [current_time] + changed_ids)
+
+                # 3. Add a signature for each loan that was actually approved
+                insert_signatures(cursor, "loan_signatures", "loan_id", changed_ids, signatory_id, current_time)
+
+        summary.record_approval("loans", [(amount, on_date) for _, amount, on_date in pending_rows])
+        summary.record_signatures("loans", len(changed_ids))
+
+    return changed_ids
+
+
+@handler("loans.approve")
+def approve_loans_job(ids, job):
+    return approve_loans(ids, job.created_by)
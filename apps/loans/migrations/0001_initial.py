@@ -0,0 +1,61 @@
+# Generated by Django 4.2.9 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+from apps.common.indexes import create_declared_indexes, drop_declared_indexes
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Loan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('interest_rate', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('repayment_period', models.IntegerField()),
+                ('reason', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(default='pending', max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('approved_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'loans',
+                'managed': False,
+                'indexes': [
+                    models.Index(fields=['user_id', 'created_at'], name='loans_user_created_idx'),
+                    models.Index(fields=['status'], name='loans_status_idx'),
+                    models.Index(fields=['created_at'], name='loans_created_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='LoanSignature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('loan_id', models.IntegerField()),
+                ('signatory_id', models.IntegerField()),
+                ('signed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'loan_signatures',
+                'managed': False,
+                'indexes': [
+                    models.Index(fields=['loan_id'], name='loan_sig_loan_idx'),
+                    models.Index(fields=['signed_at'], name='loan_sig_signed_idx'),
+                ],
+            },
+        ),
+        # Unmanaged models get no DDL from Django; create the declared indexes here
+        migrations.RunPython(
+            create_declared_indexes('loans', 'Loan', 'LoanSignature'),
+            drop_declared_indexes('loans', 'Loan', 'LoanSignature'),
+        ),
+    ]
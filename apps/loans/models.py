@@ -1,3 +1,40 @@
 from django.db import models
 
-# Create your models here.
+
+class Loan(models.Model):
+    """Unmanaged mapping of the `loans` table, declaring its indexes."""
+    user_id = models.IntegerField()
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    interest_rate = models.DecimalField(max_digits=5, decimal_places=2)
+    repayment_period = models.IntegerField()
+    reason = models.TextField(null=True, blank=True)
+    status = models.CharField(max_length=20, default="pending")
+    created_at = models.DateTimeField()
+    approved_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        managed = False
+        db_table = "loans"
+        indexes = [
+            # member view: WHERE user_id = %s ORDER BY created_at
+            models.Index(fields=["user_id", "created_at"], name="loans_user_created_idx"),
+            # batch approval: WHERE id IN (...) AND status = 'pending'
+            models.Index(fields=["status"], name="loans_status_idx"),
+            # admin view / keyset seek: ORDER BY created_at, id
+            models.Index(fields=["created_at"], name="loans_created_idx"),
+        ]
+
+
+class LoanSignature(models.Model):
+    """Unmanaged mapping of the `loan_signatures` table."""
+    loan_id = models.IntegerField()
+    signatory_id = models.IntegerField()
+    signed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        managed = False
+        db_table = "loan_signatures"
+        indexes = [
+            models.Index(fields=["loan_id"], name="loan_sig_loan_idx"),
+            models.Index(fields=["signed_at"], name="loan_sig_signed_idx"),
+        ]
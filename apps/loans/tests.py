@@ -1,3 +1,77 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest import mock
+
 from django.test import TestCase
+from django.urls import reverse
+
+from apps.common.db import lock_row
+from apps.common.testing import UnmanagedTablesMixin, set_session
+from apps.loans import views
+from apps.loans.jobs import approve_loans
+from apps.loans.models import Loan, LoanSignature
+from apps.pages import summary
+from apps.pages.models import DashboardSummary
+
+CREATED = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+
+class ApproveLoansTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Loan, LoanSignature)
+
+    def setUp(self):
+        # A summary built before any loan existed
+        DashboardSummary.objects.create(pk=summary.SUMMARY_ID)
+
+    def add_loan(self, status="pending"):
+        loan = Loan.objects.create(
+            user_id=1, amount=Decimal("300.00"), interest_rate=5, repayment_period=6,
+            created_at=CREATED, status=status,
+        )
+        if status == "pending":
+            summary.record_amount("loans", loan.amount, loan.created_at, approved=False)
+        return loan
+
+    def test_signs_only_loans_that_transitioned(self):
+        pending = self.add_loan()
+        approved = self.add_loan(status="approved")
+        rejected = self.add_loan(status="rejected")
+
+        changed = approve_loans([pending.pk, approved.pk, rejected.pk], signatory_id=4)
+
+        self.assertEqual(changed, [pending.pk])
+        self.assertEqual(list(LoanSignature.objects.values_list("loan_id", "signatory_id")), [(pending.pk, 4)])
+        pending.refresh_from_db()
+        self.assertEqual(pending.status, "approved")
+        self.assertIsNotNone(pending.approved_at)
+        rejected.refresh_from_db()
+        self.assertEqual(rejected.status, "rejected")
+
+        totals = DashboardSummary.objects.get(pk=summary.SUMMARY_ID)
+        self.assertEqual((totals.loans_approved, totals.loans_pending), (Decimal("300.00"), Decimal("0.00")))
+        self.assertEqual(totals.loan_signatures, 1)
+
+    def test_repeated_approval_adds_no_signatures(self):
+        pending = self.add_loan()
+        approve_loans([pending.pk], signatory_id=4)
+        self.assertEqual(approve_loans([pending.pk], signatory_id=5), [])
+        self.assertEqual(LoanSignature.objects.count(), 1)
+
+    def test_edit_refused_once_approval_lands_first(self):
+        loan = self.add_loan()
+        set_session(self.client, user_id=1, role="member")
+
+        def approve_then_lock(*args, **kwargs):
+            # The approval job commits between the view's read and its write
+            approve_loans([loan.pk], signatory_id=4)
+            return lock_row(*args, **kwargs)
+
+        with mock.patch.object(views, "lock_row", side_effect=approve_then_lock):
+            self.client.post(reverse("edit_loan", args=[loan.pk]), {
+                "amount": "900.00", "interest_rate": 5, "repayment_period": 6, "reason": "",
+            })
 
-# Create your tests here.
+        loan.refresh_from_db()
+        self.assertEqual((loan.status, loan.amount), ("approved", Decimal("300.00")))
+        totals = DashboardSummary.objects.get(pk=summary.SUMMARY_ID)
+        self.assertEqual((totals.loans_approved, totals.loans_pending), (Decimal("300.00"), Decimal("0.00")))
@@ -1,10 +1,17 @@
 # apps/loans/views.py
 
 from django.shortcuts import render, redirect
-from django.db import connection
+from django.db import connection, transaction
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.utils import timezone
+from django.urls import reverse
+
+from apps.common.approvals import parse_ids
+from apps.common.db import lock_row
+from apps.common.pagination import InvalidCursor, keyset_paginate, search_condition
+from apps.jobs.queue import enqueue
+from apps.pages import summary
 
 def add_loan(request):
     """
@@ -19,11 +26,14 @@ def add_loan(request):
         reason = request.POST.get("reason")
         
         try:
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    INSERT INTO loans (user_id, amount, interest_rate, repayment_period, reason, status, created_at)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s);
-                """, [user_id, amount, interest_rate, repayment_period, reason, 'pending', timezone.now()])
+            created_at = timezone.now()
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("""
+                        INSERT INTO loans (user_id, amount, interest_rate, repayment_period, reason, status, created_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s);
+                    """, [user_id, amount, interest_rate, repayment_period, reason, 'pending', created_at])
+                summary.record_amount("loans", amount, created_at, approved=False)
             
             messages.success(request, "Your loan request has been submitted successfully and is pending approval.")
             return redirect("list_loans")
@@ -58,7 +68,7 @@ def edit_loan(request, loan_id):
     loan = None
     with connection.cursor() as cursor:
         cursor.execute("""
-            SELECT id, user_id, amount, interest_rate, repayment_period, reason, status
+            SELECT id, user_id, amount, interest_rate, repayment_period, reason, status, created_at
             FROM loans
             WHERE id = %s;
         """, [loan_id])
@@ -90,12 +100,25 @@ def edit_loan(request, loan_id):
         reason = request.POST.get("reason")
         
         try:
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    UPDATE loans
-                    SET amount = %s, interest_rate = %s, repayment_period = %s, reason = %s
-                    WHERE id = %s;
-                """, [amount, interest_rate, repayment_period, reason, loan_id])
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    # Approval may have run since the form was read; the delta
+                    # comes from the row as it is now.
+                    locked = lock_row(cursor, "loans", loan_id, ("amount", "created_at"), "status = 'pending'")
+                    if locked:
+                        cursor.execute("""
+                            UPDATE loans
+                            SET amount = %s, interest_rate = %s, repayment_period = %s, reason = %s
+                            WHERE id = %s AND status = 'pending';
+                        """, [amount, interest_rate, repayment_period, reason, loan_id])
+                if locked:
+                    old_amount, created_at = locked
+                    summary.record_amount("loans", old_amount, created_at, approved=False, sign=-1)
+                    summary.record_amount("loans", amount, created_at, approved=False)
+
+            if not locked:
+                messages.error(request, "This loan is no longer pending and cannot be edited.")
+                return redirect('list_loans')
 
             messages.success(request, "Loan request updated successfully.")
             return redirect('list_loans')
@@ -117,9 +140,13 @@ from django.http import Http404, JsonResponse
 from django.utils import timezone
 
 
+LOAN_SEARCH_COLUMNS = ("u.first_name", "u.last_name", "l.reason", "l.status")
+
+
 def list_loans(request):
     """
-    Lists loan requests for members and all loans for admins.
+    Lists loan requests for members and all loans for admins,
+    one keyset page at a time (newest first).
     """
     user_id = request.session.get("user_id")
     user_role = request.session.get("role")
@@ -138,21 +165,32 @@ def list_loans(request):
         FROM loans l
         JOIN users u ON l.user_id = u.id
     """
+    where = []
     params = []
 
     if user_role not in ['admin', 'super_admin']:
-        query += " WHERE l.user_id = %s"
+        where.append("l.user_id = %s")
         params.append(user_id)
-    
-    query += " ORDER BY l.created_at DESC;"
 
-    loans = []
-    with connection.cursor() as cursor:
-        cursor.execute(query, params)
-        columns = [col[0] for col in cursor.description]
-        loans = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    search = request.GET.get("q", "").strip()
+    search_sql, search_params = search_condition(LOAN_SEARCH_COLUMNS, search)
+    if search_sql:
+        where.append(search_sql)
+        params += search_params
+    if where:
+        query += " WHERE " + " AND ".join(where)
 
-    return render(request, "loans/list_loans.html", {"loans": loans})
+    try:
+        with connection.cursor() as cursor:
+            page = keyset_paginate(
+                cursor, query, params,
+                sort_key="created_at", tiebreaker="id",
+                token=request.GET.get("cursor"),
+            )
+    except InvalidCursor:
+        return redirect("list_loans")
+
+    return render(request, "loans/list_loans.html", {"loans": page.rows, "page": page, "search": search})
 
 
 
@@ -179,7 +217,7 @@ def delete_loan(request, loan_id):
 
     loan = None
     with connection.cursor() as cursor:
-        cursor.execute("SELECT user_id, status FROM loans WHERE id = %s;", [loan_id])
+        cursor.execute("SELECT user_id, status, amount, created_at FROM loans WHERE id = %s;", [loan_id])
         loan_data = cursor.fetchone()
         if loan_data:
             columns = [col[0] for col in cursor.description]
@@ -202,10 +240,18 @@ def delete_loan(request, loan_id):
         return redirect('list_loans')
 
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("DELETE FROM loans WHERE id = %s;", [loan_id])
-        
-        messages.success(request, "Loan request deleted successfully.")
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                locked = lock_row(cursor, "loans", loan_id, ("amount", "created_at"), "status = 'pending'")
+                if locked:
+                    cursor.execute("DELETE FROM loans WHERE id = %s;", [loan_id])
+            if locked:
+                summary.record_amount("loans", locked[0], locked[1], approved=False, sign=-1)
+
+        if locked:
+            messages.success(request, "Loan request deleted successfully.")
+        else:
+            messages.error(request, "This loan is no longer pending and cannot be deleted.")
     except Exception as e:
         messages.error(request, f"An error occurred during deletion: {e}")
 
@@ -226,36 +272,19 @@ def approve_multiple_loans(request):
     if user_role not in ['admin', 'super_admin']:
         return JsonResponse({"error": "You do not have permission to perform this action."}, status=403)
 
-    approved_ids = request.POST.getlist("approved_ids[]")
+    approved_ids = parse_ids(request.POST.getlist("approved_ids[]"))
     if not approved_ids:
         return JsonResponse({"error": "No loans selected for approval."}, status=400)
 
     try:
-        with transaction.atomic():
-            signatory_id = request.session.get("user_id")
-            current_time = timezone.now()
-            
-            # 1. Update the loans to 'approved' and set the approved_at timestamp
-            with connection.cursor() as cursor:
-                placeholders = ','.join(['%s'] * len(approved_ids))
-                cursor.execute(f"""
-                    UPDATE loans
-                    SET status = 'approved', approved_at = %s
-                    WHERE id IN ({placeholders}) AND status = 'pending';
-                """, [current_time] + approved_ids)
-
-            # 2. Add a signature for each approved loan
-            signature_data = [(loan_id, signatory_id, current_time) for loan_id in approved_ids]
-            with connection.cursor() as cursor:
-                cursor.executemany("""
-                    INSERT INTO loan_signatures (loan_id, signatory_id, signed_at)
-                    VALUES (%s, %s, %s);
-                """, signature_data)
-        
+        # Large batches run in the background worker; the page polls the job
+        job = enqueue("loans.approve", approved_ids, created_by=request.session.get("user_id"))
         return JsonResponse({
-            "success": True, 
-            "message": f"{len(approved_ids)} loan(s) approved and signatures recorded successfully."
-        })
+            "success": True,
+            "message": f"Approval of {len(approved_ids)} loan(s) queued.",
+            "job_id": job.pk,
+            "status_url": reverse("job_status", args=[job.pk]),
+        }, status=202)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
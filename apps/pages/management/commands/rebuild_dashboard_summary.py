@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.pages.summary import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recomputes the dashboard summary and monthly totals from the source tables."
+
+    def handle(self, *args, **options):
+        summary = rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Dashboard summary rebuilt: {summary.total_users} users, "
+            f"UGX {summary.total_contributions} in contributions."
+        ))
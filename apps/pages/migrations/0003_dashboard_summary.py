@@ -0,0 +1,48 @@
+# Generated by Django 4.2.9 on 2026-10-18 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0002_delete_product'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_users', models.IntegerField(default=0)),
+                ('contributions_approved', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('contributions_pending', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('withdrawals_approved', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('withdrawals_pending', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('loans_approved', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('loans_pending', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('investments_approved', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('investments_pending', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('loan_signatures', models.IntegerField(default=0)),
+                ('investment_signatures', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'dashboard_summary',
+            },
+        ),
+        migrations.CreateModel(
+            name='DashboardPeriodTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('period', models.DateField()),
+                ('approved', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+                ('pending', models.DecimalField(decimal_places=2, default=0, max_digits=18)),
+            ],
+            options={
+                'db_table': 'dashboard_period_totals',
+                'unique_together': {('kind', 'period')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.9 on 2026-10-18 16:10
+
+from django.db import migrations
+
+
+def drop_seeded_summary(apps, schema_editor):
+    # 0003 used to seed an all-zero summary row, so get_summary() never ran
+    # its first rebuild and every later delta landed on a zero base. Without
+    # the row (and the buckets built on that base) the next read rebuilds
+    # both from the source tables.
+    apps.get_model("pages", "DashboardSummary").objects.all().delete()
+    apps.get_model("pages", "DashboardPeriodTotal").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0003_dashboard_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_seeded_summary, migrations.RunPython.noop),
+    ]
@@ -2,3 +2,59 @@ from django.db import models
 
 # Create your models here.
 
+
+class DashboardSummary(models.Model):
+    """
+    Single-row (id=1) materialized totals for the dashboard. Kept up to date
+    by the contribution, withdrawal, loan and investment write paths through
+    `apps.pages.summary`; `manage.py rebuild_dashboard_summary` recomputes it.
+    """
+    total_users = models.IntegerField(default=0)
+
+    contributions_approved = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    contributions_pending = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    withdrawals_approved = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    withdrawals_pending = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    loans_approved = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    loans_pending = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    investments_approved = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    investments_pending = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    loan_signatures = models.IntegerField(default=0)
+    investment_signatures = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "dashboard_summary"
+
+    @property
+    def total_contributions(self):
+        return self.contributions_approved + self.contributions_pending
+
+    @property
+    def total_withdrawals(self):
+        return self.withdrawals_approved + self.withdrawals_pending
+
+    @property
+    def total_loans(self):
+        return self.loans_approved + self.loans_pending
+
+    @property
+    def total_investments(self):
+        return self.investments_approved + self.investments_pending
+
+
+class DashboardPeriodTotal(models.Model):
+    """Approved and pending sums per kind and calendar month."""
+    kind = models.CharField(max_length=20)
+    period = models.DateField()  # first day of the month
+    approved = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    pending = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = "dashboard_period_totals"
+        unique_together = ("kind", "period")
+
+    def __str__(self):
+        return f"{self.kind} {self.period:%Y-%m}"
@@ -0,0 +1,195 @@
+# apps/pages/summary.py
+
+"""
+Incremental maintenance of the dashboard summary tables.
+
+Every write path that changes an amount or an approval state reports the
+signed delta here, so the dashboard reads one small row instead of scanning
+the source tables. `rebuild()` recomputes everything from scratch.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.pages.models import DashboardPeriodTotal, DashboardSummary
+
+SUMMARY_ID = 1
+
+# kind -> (table, date column used for the monthly buckets, "approved" and
+# "pending" predicates). Rows matching neither (e.g. a rejected loan) are not
+# counted, matching the write paths, which only ever move pending -> approved.
+KINDS = {
+    "contributions": ("contributions", "contribution_date", "approved = 1", "approved = 0"),
+    "withdrawals": ("withdrawals", "withdrawal_date", "approved = 1", "approved = 0"),
+    "loans": ("loans", "created_at", "status = 'approved'", "status = 'pending'"),
+    "investments": ("investments", "investment_date", "approved = 1", "approved = 0"),
+}
+
+SIGNATURE_TABLES = {
+    "loans": ("loan_signatures", "loan_signatures"),
+    "investments": ("investment_signatures", "investment_signatures"),
+}
+
+
+def _to_amount(value):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, TypeError, ValueError):
+        return Decimal(0)
+
+
+def _to_period(value):
+    if isinstance(value, datetime):
+        value = value.date()
+    elif isinstance(value, str):
+        try:
+            value = parse_date(value[:10])
+        except ValueError:
+            value = None
+
+    if isinstance(value, date):
+        return value.replace(day=1)
+    return None
+
+
+def apply_changes(kind, changes):
+    """
+    Applies signed deltas to the summary. `changes` is an iterable of
+    (on_date, approved_delta, pending_delta) tuples; the period buckets are
+    aggregated first so a large batch costs one UPDATE per touched month.
+    """
+    approved_total = Decimal(0)
+    pending_total = Decimal(0)
+    periods = defaultdict(lambda: [Decimal(0), Decimal(0)])
+
+    for on_date, approved_delta, pending_delta in changes:
+        approved_delta = _to_amount(approved_delta)
+        pending_delta = _to_amount(pending_delta)
+        approved_total += approved_delta
+        pending_total += pending_delta
+
+        period = _to_period(on_date)
+        if period:
+            periods[period][0] += approved_delta
+            periods[period][1] += pending_delta
+
+    if not approved_total and not pending_total and not periods:
+        return
+
+    DashboardSummary.objects.filter(pk=SUMMARY_ID).update(**{
+        f"{kind}_approved": F(f"{kind}_approved") + approved_total,
+        f"{kind}_pending": F(f"{kind}_pending") + pending_total,
+        "updated_at": timezone.now(),
+    })
+
+    for period, (approved_delta, pending_delta) in periods.items():
+        _bump_period(kind, period, approved_delta, pending_delta)
+
+
+def _bump_period(kind, period, approved_delta, pending_delta):
+    bucket = DashboardPeriodTotal.objects.filter(kind=kind, period=period)
+    increments = {
+        "approved": F("approved") + approved_delta,
+        "pending": F("pending") + pending_delta,
+    }
+    if bucket.update(**increments):
+        return
+
+    try:
+        with transaction.atomic():
+            DashboardPeriodTotal.objects.create(
+                kind=kind, period=period, approved=approved_delta, pending=pending_delta
+            )
+    except IntegrityError:
+        # Another request created the bucket first
+        bucket.update(**increments)
+
+
+def record_amount(kind, amount, on_date, approved, sign=1):
+    """Adds (sign=1) or removes (sign=-1) one row's amount."""
+    amount = _to_amount(amount) * sign
+    if approved:
+        apply_changes(kind, [(on_date, amount, 0)])
+    else:
+        apply_changes(kind, [(on_date, 0, amount)])
+
+
+def record_approval(kind, rows):
+    """Moves (amount, on_date) rows that just got approved from pending to approved."""
+    apply_changes(kind, [(on_date, amount, -_to_amount(amount)) for amount, on_date in rows])
+
+
+def record_users(delta):
+    DashboardSummary.objects.filter(pk=SUMMARY_ID).update(
+        total_users=F("total_users") + delta, updated_at=timezone.now()
+    )
+
+
+def record_signatures(kind, count):
+    if not count:
+        return
+    column = SIGNATURE_TABLES[kind][1]
+    DashboardSummary.objects.filter(pk=SUMMARY_ID).update(**{
+        column: F(column) + count, "updated_at": timezone.now()
+    })
+
+
+def get_summary():
+    """Returns the summary row, building it on first use."""
+    summary = DashboardSummary.objects.filter(pk=SUMMARY_ID).first()
+    if summary is None:
+        summary = rebuild()
+    return summary
+
+
+@transaction.atomic
+def rebuild():
+    """Recomputes the summary and period buckets from the source tables."""
+    values = {}
+    buckets = []
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM users")
+        values["total_users"] = cursor.fetchone()[0]
+
+        for kind, (table, date_column, approved_sql, pending_sql) in KINDS.items():
+            cursor.execute(f"""
+                SELECT COALESCE(SUM(CASE WHEN {approved_sql} THEN amount ELSE 0 END), 0),
+                       COALESCE(SUM(CASE WHEN {pending_sql} THEN amount ELSE 0 END), 0)
+                FROM {table}
+            """)
+            values[f"{kind}_approved"], values[f"{kind}_pending"] = cursor.fetchone()
+
+            # YEAR()/MONTH() in the backend's own dialect, no time zone conversion.
+            year_sql, year_params = connection.ops.date_extract_sql("year", date_column, ())
+            month_sql, month_params = connection.ops.date_extract_sql("month", date_column, ())
+            period_params = [*year_params, *month_params]
+            cursor.execute(f"""
+                SELECT {year_sql}, {month_sql},
+                       COALESCE(SUM(CASE WHEN {approved_sql} THEN amount ELSE 0 END), 0),
+                       COALESCE(SUM(CASE WHEN {pending_sql} THEN amount ELSE 0 END), 0)
+                FROM {table}
+                WHERE {date_column} IS NOT NULL
+                GROUP BY {year_sql}, {month_sql}
+            """, period_params * 2)
+            for year, month, approved, pending in cursor.fetchall():
+                buckets.append(DashboardPeriodTotal(
+                    kind=kind, period=date(int(year), int(month), 1),
+                    approved=approved, pending=pending,
+                ))
+
+        for table, column in SIGNATURE_TABLES.values():
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            values[column] = cursor.fetchone()[0]
+
+    DashboardPeriodTotal.objects.all().delete()
+    DashboardPeriodTotal.objects.bulk_create(buckets)
+
+    summary, created = DashboardSummary.objects.update_or_create(pk=SUMMARY_ID, defaults=values)
+    return summary
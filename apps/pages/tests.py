@@ -1,3 +1,138 @@
-from django.test import TestCase
+from datetime import date, datetime, timezone
+from decimal import Decimal
 
-# Create your tests here.
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.forms.models import model_to_dict
+from django.test import TestCase, TransactionTestCase
+
+from apps.accounts.models import Member
+from apps.common.testing import UnmanagedTablesMixin
+from apps.contributions.models import Contribution
+from apps.investments.models import Investment, InvestmentSignature
+from apps.loans.models import Loan, LoanSignature
+from apps.pages import summary
+from apps.pages.models import DashboardPeriodTotal, DashboardSummary
+from apps.withdrawals.models import Withdrawal, WithdrawalSignature
+
+JAN = datetime(2025, 1, 15, tzinfo=timezone.utc)
+FEB = datetime(2025, 2, 3, tzinfo=timezone.utc)
+
+
+def snapshot():
+    row = model_to_dict(DashboardSummary.objects.get(pk=summary.SUMMARY_ID), exclude=["id", "updated_at"])
+    buckets = {
+        (b.kind, b.period): (b.approved, b.pending)
+        for b in DashboardPeriodTotal.objects.all()
+        if b.approved or b.pending
+    }
+    return row, buckets
+
+
+class DashboardSummaryTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (
+        Member, Contribution, Loan, LoanSignature, Investment, InvestmentSignature,
+        Withdrawal, WithdrawalSignature,
+    )
+
+    def setUp(self):
+        self.member = Member.objects.create(username="m", email="m@example.com", password="x")
+        summary.rebuild()
+
+    def add_loan(self, amount, created_at):
+        loan = Loan.objects.create(
+            user_id=self.member.pk, amount=amount, interest_rate=5, repayment_period=6, created_at=created_at,
+        )
+        summary.record_amount("loans", amount, created_at, approved=False)
+        return loan
+
+    def test_incremental_deltas_match_rebuild(self):
+        self.add_loan(Decimal("100.00"), JAN)
+        approved = self.add_loan(Decimal("250.00"), FEB)
+        Loan.objects.filter(pk=approved.pk).update(status="approved")
+        summary.record_approval("loans", [(approved.amount, approved.created_at)])
+
+        for amount, when, is_approved in ((Decimal("40.00"), JAN, True), (Decimal("60.00"), FEB, False)):
+            Contribution.objects.create(
+                user_id=self.member.pk, amount=amount, type="monthly", contribution_date=when, approved=is_approved,
+            )
+            summary.record_amount("contributions", amount, when, is_approved)
+
+        deleted = Withdrawal.objects.create(user_id=self.member.pk, amount=Decimal("30.00"), withdrawal_date=date(2025, 1, 9))
+        summary.record_amount("withdrawals", deleted.amount, deleted.withdrawal_date, False)
+        deleted.delete()
+        summary.record_amount("withdrawals", Decimal("30.00"), date(2025, 1, 9), False, sign=-1)
+
+        incremental = snapshot()
+        summary.rebuild()
+        self.assertEqual(snapshot(), incremental)
+
+        row, buckets = incremental
+        self.assertEqual(row["loans_approved"], Decimal("250.00"))
+        self.assertEqual(row["loans_pending"], Decimal("100.00"))
+        self.assertEqual(buckets[("contributions", date(2025, 2, 1))], (Decimal("0.00"), Decimal("60.00")))
+
+    def test_rejected_loans_are_neither_approved_nor_pending(self):
+        Loan.objects.create(
+            user_id=self.member.pk, amount=Decimal("500.00"), interest_rate=5, repayment_period=6,
+            created_at=JAN, status="rejected",
+        )
+        self.add_loan(Decimal("100.00"), JAN)
+
+        row = model_to_dict(summary.rebuild())
+        self.assertEqual(row["loans_approved"], Decimal("0.00"))
+        self.assertEqual(row["loans_pending"], Decimal("100.00"))
+
+
+class SummaryMigrationTests(UnmanagedTablesMixin, TransactionTestCase):
+    unmanaged_models = DashboardSummaryTests.unmanaged_models
+
+    def migrate(self, name):
+        executor = MigrationExecutor(connection)
+        executor.migrate([("pages", name)])
+
+    def migrate_to_latest(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes("pages")[0][1])
+
+    def tearDown(self):
+        self.migrate_to_latest()
+        # The flush between TransactionTestCases skips unmanaged tables.
+        for model in self.unmanaged_models:
+            model.objects.all().delete()
+
+    def add_source_rows(self):
+        member = Member.objects.create(username="m", email="m@example.com", password="x")
+        Member.objects.create(username="n", email="n@example.com", password="x")
+        Loan.objects.create(
+            user_id=member.pk, amount=Decimal("100.00"), interest_rate=5, repayment_period=6, created_at=JAN,
+        )
+        Contribution.objects.create(
+            user_id=member.pk, amount=Decimal("40.00"), type="monthly", contribution_date=FEB, approved=True,
+        )
+
+    def assert_totals(self):
+        row = summary.get_summary()
+        self.assertEqual(row.total_users, 2)
+        self.assertEqual(row.loans_pending, Decimal("100.00"))
+        self.assertEqual(row.contributions_approved, Decimal("40.00"))
+        self.assertEqual(
+            DashboardPeriodTotal.objects.get(kind="contributions").period, date(2025, 2, 1)
+        )
+
+    def test_migrating_existing_data_builds_the_summary_on_first_read(self):
+        self.migrate("0002_delete_product")
+        self.add_source_rows()
+        self.migrate_to_latest()
+
+        self.assertFalse(DashboardSummary.objects.exists())
+        self.assert_totals()
+
+    def test_row_seeded_by_the_old_migration_is_dropped(self):
+        self.migrate("0003_dashboard_summary")
+        self.add_source_rows()
+        DashboardSummary.objects.create(pk=summary.SUMMARY_ID)
+        summary.record_amount("loans", Decimal("100.00"), JAN, approved=False)
+        self.migrate("0004_drop_seeded_summary")
+
+        self.assertFalse(DashboardPeriodTotal.objects.exists())
+        self.assert_totals()
@@ -1,28 +1,21 @@
 from django.shortcuts import render
-from django.db import connection
 
-def index(request):
-    total_users = 0
-    total_contributions_amount = 0
-
-    # Get the total number of users from the custom table
-    with connection.cursor() as cursor:
-        cursor.execute("SELECT COUNT(*) FROM users")
-        row = cursor.fetchone()
-        if row:
-            total_users = row[0]
+from apps.pages.summary import get_summary
 
-    # Get the sum of all contributions
-    with connection.cursor() as cursor:
-        cursor.execute("SELECT SUM(amount) FROM contributions")
-        row = cursor.fetchone()
-        if row and row[0] is not None:
-            total_contributions_amount = row[0]
+def index(request):
+    # Totals are read from the materialized summary row (see apps/pages/summary.py)
+    summary = get_summary()
 
     # Pass the counts to the template
     context = {
-        "total_users": total_users,
-        "total_contributions_amount": total_contributions_amount,
+        "total_users": summary.total_users,
+        "total_contributions_amount": summary.total_contributions,
+        "total_investments": summary.total_investments,
+        "total_loans_amount": summary.total_loans,
+        "total_withdrawals": summary.total_withdrawals,
+        "total_signatures": summary.investment_signatures,
+        "total_loan_signatures": summary.loan_signatures,
+        "summary": summary,
     }
 
-    return render(request, 'pages/index.html', context)
\ No newline at end of file
+    return render(request, 'pages/index.html', context)
@@ -0,0 +1,46 @@
+# apps/withdrawals/jobs.py
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.common.approvals import insert_signatures, lock_pending
+from apps.jobs.queue import handler
+from apps.pages import summary
+
+
+def approve_withdrawals(ids, signatory_id):
+    """
+    Approves the pending withdrawals among `ids` and signs exactly those as
+    `signatory_id`. Returns the ids that changed.
+    """
+    current_time = timezone.now()
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            # 1. Lock the selected withdrawals that are still pending; only these transition
+            pending_rows = lock_pending(
+                cursor, "withdrawals", ids, "approved = FALSE",
+                columns=("id", "amount", "withdrawal_date"),
+            )
+            changed_ids = [row[0] for row in pending_rows]
+
+            if changed_ids:
+                # 2. Update the withdrawals to be approved
+                placeholders = ','.join(['%s'] * len(changed_ids))
+                cursor.execute(f"""
+                    UPDATE withdrawals
+                    SET approved = TRUE
+                    WHERE id IN ({placeholders});
+                """, changed_ids)
+
+                # 3. Add a signature for each withdrawal that was actually approved
+                insert_signatures(cursor, "withdrawal_signatures", "withdrawal_id", changed_ids, signatory_id, current_time)
+
+        summary.record_approval("withdrawals", [(amount, on_date) for _, amount, on_date in pending_rows])
+
+    return changed_ids
+
+
+@handler("withdrawals.approve")
+def approve_withdrawals_job(ids, job):
+    return approve_withdrawals(ids, job.created_by)
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.9 on 2026-10-18 10:49
+
+from django.db import migrations, models
+
+from apps.common.indexes import create_declared_indexes, drop_declared_indexes
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Withdrawal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.IntegerField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('withdrawal_date', models.DateField()),
+                ('reason', models.TextField(blank=True, null=True)),
+                ('approved', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'withdrawals',
+                'managed': False,
+                'indexes': [
+                    models.Index(fields=['user_id', 'withdrawal_date'], name='withdr_user_date_idx'),
+                    models.Index(fields=['approved'], name='withdr_approved_idx'),
+                    models.Index(fields=['withdrawal_date'], name='withdr_date_idx'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='WithdrawalSignature',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('withdrawal_id', models.IntegerField()),
+                ('signatory_id', models.IntegerField()),
+                ('signed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'withdrawal_signatures',
+                'managed': False,
+                'indexes': [
+                    models.Index(fields=['withdrawal_id'], name='withdr_sig_withdr_idx'),
+                    models.Index(fields=['signed_at'], name='withdr_sig_signed_idx'),
+                ],
+            },
+        ),
+        # Unmanaged models get no DDL from Django; create the declared indexes here
+        migrations.RunPython(
+            create_declared_indexes('withdrawals', 'Withdrawal', 'WithdrawalSignature'),
+            drop_declared_indexes('withdrawals', 'Withdrawal', 'WithdrawalSignature'),
+        ),
+    ]
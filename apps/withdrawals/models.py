@@ -1,3 +1,38 @@
 from django.db import models
 
-# Create your models here.
+
+class Withdrawal(models.Model):
+    """Unmanaged mapping of the `withdrawals` table, declaring its indexes."""
+    user_id = models.IntegerField()
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    withdrawal_date = models.DateField()
+    reason = models.TextField(null=True, blank=True)
+    approved = models.BooleanField(default=False)
+    created_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        managed = False
+        db_table = "withdrawals"
+        indexes = [
+            # member view: WHERE user_id = %s ORDER BY withdrawal_date
+            models.Index(fields=["user_id", "withdrawal_date"], name="withdr_user_date_idx"),
+            # batch approval: WHERE id IN (...) AND approved = FALSE
+            models.Index(fields=["approved"], name="withdr_approved_idx"),
+            # admin view / keyset seek: ORDER BY withdrawal_date, id
+            models.Index(fields=["withdrawal_date"], name="withdr_date_idx"),
+        ]
+
+
+class WithdrawalSignature(models.Model):
+    """Unmanaged mapping of the `withdrawal_signatures` table."""
+    withdrawal_id = models.IntegerField()
+    signatory_id = models.IntegerField()
+    signed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        managed = False
+        db_table = "withdrawal_signatures"
+        indexes = [
+            models.Index(fields=["withdrawal_id"], name="withdr_sig_withdr_idx"),
+            models.Index(fields=["signed_at"], name="withdr_sig_signed_idx"),
+        ]
@@ -1,3 +1,24 @@
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from apps.common.testing import UnmanagedTablesMixin
+from apps.withdrawals.jobs import approve_withdrawals
+from apps.withdrawals.models import Withdrawal, WithdrawalSignature
+
+
+class ApproveWithdrawalsTests(UnmanagedTablesMixin, TestCase):
+    unmanaged_models = (Withdrawal, WithdrawalSignature)
+
+    def test_signs_only_withdrawals_that_transitioned(self):
+        pending = Withdrawal.objects.create(user_id=1, amount=Decimal("80.00"), withdrawal_date="2025-02-02")
+        done = Withdrawal.objects.create(
+            user_id=1, amount=Decimal("20.00"), withdrawal_date="2025-02-02", approved=True,
+        )
+
+        self.assertEqual(approve_withdrawals([pending.pk, done.pk], signatory_id=3), [pending.pk])
+        self.assertEqual(approve_withdrawals([pending.pk, done.pk], signatory_id=3), [])
+        self.assertEqual(
+            list(WithdrawalSignature.objects.values_list("withdrawal_id", "signatory_id")), [(pending.pk, 3)]
+        )
+        self.assertFalse(Withdrawal.objects.filter(approved=False).exists())
@@ -1,8 +1,17 @@
 # apps/withdrawals/views.py
 
-from django.shortcuts import render
-from django.db import connection
+from django.shortcuts import render, redirect
+from django.db import connection, transaction
 from django.contrib.auth.decorators import login_required
+from django.urls import reverse
+
+from apps.common.approvals import parse_ids
+from apps.common.pagination import InvalidCursor, keyset_paginate, search_condition
+from apps.jobs.queue import enqueue
+from apps.pages import summary
+
+
+WITHDRAWAL_SEARCH_COLUMNS = ("u.member_id", "u.first_name", "u.last_name", "w.reason")
 
 
 def list_withdrawals(request):
@@ -10,34 +19,46 @@ def list_withdrawals(request):
     Lists withdrawal requests.
     - Admins see all withdrawals.
     - Members see only their own withdrawals.
+    Results are served one keyset page at a time.
     """
-    withdrawals = []
     user_id = request.session.get("user_id")
     user_role = request.session.get("role")
 
-    with connection.cursor() as cursor:
-        if user_role == 'admin':
-            cursor.execute("""
-                SELECT w.id, w.user_id, u.first_name, u.last_name, u.member_id,
-                       w.amount, w.withdrawal_date, w.reason, w.approved, w.created_at
-                FROM withdrawals w
-                JOIN users u ON w.user_id = u.id
-                ORDER BY w.withdrawal_date DESC;
-            """)
-        elif user_id:
-            cursor.execute("""
-                SELECT w.id, w.user_id, u.first_name, u.last_name, u.member_id,
-                       w.amount, w.withdrawal_date, w.reason, w.approved, w.created_at
-                FROM withdrawals w
-                JOIN users u ON w.user_id = u.id
-                WHERE w.user_id = %s
-                ORDER BY w.withdrawal_date DESC;
-            """, [user_id])
-        
-        columns = [col[0] for col in cursor.description]
-        withdrawals = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    if user_role != 'admin' and not user_id:
+        return render(request, "withdrawals/list_withdrawals.html", {"withdrawals": []})
+
+    query = """
+        SELECT w.id, w.user_id, u.first_name, u.last_name, u.member_id,
+               w.amount, w.withdrawal_date, w.reason, w.approved, w.created_at
+        FROM withdrawals w
+        JOIN users u ON w.user_id = u.id
+    """
+    where = []
+    params = []
+
+    if user_role != 'admin':
+        where.append("w.user_id = %s")
+        params.append(user_id)
+
+    search = request.GET.get("q", "").strip()
+    search_sql, search_params = search_condition(WITHDRAWAL_SEARCH_COLUMNS, search)
+    if search_sql:
+        where.append(search_sql)
+        params += search_params
+    if where:
+        query += " WHERE " + " AND ".join(where)
+
+    try:
+        with connection.cursor() as cursor:
+            page = keyset_paginate(
+                cursor, query, params,
+                sort_key="withdrawal_date", tiebreaker="id",
+                token=request.GET.get("cursor"),
+            )
+    except InvalidCursor:
+        return redirect("list_withdrawals")
 
-    return render(request, "withdrawals/list_withdrawals.html", {"withdrawals": withdrawals})
+    return render(request, "withdrawals/list_withdrawals.html", {"withdrawals": page.rows, "page": page, "search": search})
 
 
     # apps/withdrawals/views.py
@@ -60,11 +81,13 @@ def add_withdrawal(request):
         reason = request.POST.get("reason")
         
         try:
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    INSERT INTO withdrawals (user_id, amount, withdrawal_date, reason, approved)
-                    VALUES (%s, %s, %s, %s, %s);
-                """, [user_id, amount, withdrawal_date, reason, False])
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("""
+                        INSERT INTO withdrawals (user_id, amount, withdrawal_date, reason, approved)
+                        VALUES (%s, %s, %s, %s, %s);
+                    """, [user_id, amount, withdrawal_date, reason, False])
+                summary.record_amount("withdrawals", amount, withdrawal_date, approved=False)
             
             messages.success(request, "Your withdrawal request has been submitted successfully and is pending approval.")
             return redirect("list_withdrawals")
@@ -124,12 +147,17 @@ def edit_withdrawal(request, withdrawal_id):
         reason = request.POST.get("reason")
         
         try:
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    UPDATE withdrawals
-                    SET amount = %s, withdrawal_date = %s, reason = %s
-                    WHERE id = %s;
-                """, [amount, withdrawal_date, reason, withdrawal_id])
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("""
+                        UPDATE withdrawals
+                        SET amount = %s, withdrawal_date = %s, reason = %s
+                        WHERE id = %s;
+                    """, [amount, withdrawal_date, reason, withdrawal_id])
+                summary.record_amount(
+                    "withdrawals", withdrawal['amount'], withdrawal['withdrawal_date'], approved=False, sign=-1
+                )
+                summary.record_amount("withdrawals", amount, withdrawal_date, approved=False)
 
             messages.success(request, "Withdrawal request updated successfully.")
             return redirect('list_withdrawals')
@@ -158,13 +186,13 @@ def delete_withdrawal(request, withdrawal_id):
     withdrawal = None
     with connection.cursor() as cursor:
         cursor.execute("""
-            SELECT user_id, approved
+            SELECT user_id, approved, amount, withdrawal_date
             FROM withdrawals
             WHERE id = %s;
         """, [withdrawal_id])
         row = cursor.fetchone()
         if row:
-            withdrawal = {'user_id': row[0], 'approved': row[1]}
+            withdrawal = {'user_id': row[0], 'approved': row[1], 'amount': row[2], 'withdrawal_date': row[3]}
 
     if not withdrawal:
         raise Http404("Withdrawal request does not exist.")
@@ -183,11 +211,15 @@ def delete_withdrawal(request, withdrawal_id):
         return redirect('list_withdrawals')
 
     try:
-        with connection.cursor() as cursor:
-            cursor.execute("""
-                DELETE FROM withdrawals
-                WHERE id = %s;
-            """, [withdrawal_id])
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    DELETE FROM withdrawals
+                    WHERE id = %s;
+                """, [withdrawal_id])
+            summary.record_amount(
+                "withdrawals", withdrawal['amount'], withdrawal['withdrawal_date'], approved=False, sign=-1
+            )
         
         messages.success(request, "Withdrawal request deleted successfully.")
     except Exception as e:
@@ -245,7 +277,6 @@ from django.db import connection, transaction
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import Http404, JsonResponse
-from django.utils import timezone
 
 
 def approve_multiple_withdrawals(request):
@@ -260,35 +291,18 @@ def approve_multiple_withdrawals(request):
     if user_role not in ['admin', 'super_admin']:
         return JsonResponse({"error": "You do not have permission to perform this action."}, status=403)
 
-    approved_ids = request.POST.getlist("approved_ids[]")
+    approved_ids = parse_ids(request.POST.getlist("approved_ids[]"))
     if not approved_ids:
         return JsonResponse({"error": "No withdrawals selected for approval."}, status=400)
 
     try:
-        with transaction.atomic():
-            signatory_id = request.session.get("user_id")
-            current_time = timezone.now()
-            
-            # 1. Update the withdrawals to be approved
-            with connection.cursor() as cursor:
-                placeholders = ','.join(['%s'] * len(approved_ids))
-                cursor.execute(f"""
-                    UPDATE withdrawals
-                    SET approved = TRUE
-                    WHERE id IN ({placeholders}) AND approved = FALSE;
-                """, approved_ids)
-
-            # 2. Add a signature for each approved withdrawal
-            signature_data = [(withdrawal_id, signatory_id, current_time) for withdrawal_id in approved_ids]
-            with connection.cursor() as cursor:
-                cursor.executemany("""
-                    INSERT INTO withdrawal_signatures (withdrawal_id, signatory_id, signed_at)
-                    VALUES (%s, %s, %s);
-                """, signature_data)
-        
+        # Large batches run in the background worker; the page polls the job
+        job = enqueue("withdrawals.approve", approved_ids, created_by=request.session.get("user_id"))
         return JsonResponse({
-            "success": True, 
-            "message": f"{len(approved_ids)} withdrawal(s) approved and signatures recorded successfully."
-        })
+            "success": True,
+            "message": f"Approval of {len(approved_ids)} withdrawal(s) queued.",
+            "job_id": job.pk,
+            "status_url": reverse("job_status", args=[job.pk]),
+        }, status=202)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
\ No newline at end of file
@@ -5,7 +5,9 @@ Generated by 'django-admin startproject'.
 """
 
 import os
+import tempfile
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 from str2bool import str2bool
 
@@ -43,6 +45,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
 
     # Project apps
+    "apps.common",
     "apps.pages",
     "apps.loans",
     "apps.accounts",
@@ -52,6 +55,7 @@ INSTALLED_APPS = [
     "apps.charts",
     "apps.contributions",
     "apps.investments",
+    "apps.jobs",
 
     # REST Framework
     "rest_framework",
@@ -114,12 +118,97 @@ DATABASES = {
         "PASSWORD": os.getenv("DB_PASSWORD", ""),
         "HOST": os.getenv("DB_HOST", "localhost"),
         "PORT": os.getenv("DB_PORT", "3306"),
+        # Persistent connections: reuse one connection per worker thread for up
+        # to DB_CONN_MAX_AGE seconds (0 = reconnect every request, "None" = forever)
+        "CONN_MAX_AGE": (
+            None if os.getenv("DB_CONN_MAX_AGE", "60").lower() == "none"
+            else int(os.getenv("DB_CONN_MAX_AGE", "60"))
+        ),
+        # Ping a reused connection before the first query of each request
+        "CONN_HEALTH_CHECKS": str2bool(os.getenv("DB_CONN_HEALTH_CHECKS", "True")),
         "OPTIONS": {
             "init_command": "SET sql_mode='STRICT_TRANS_TABLES'",
         },
     }
 }
 
+# Open the database connection when the worker boots instead of on the first request
+DB_CONN_WARMUP = str2bool(os.getenv("DB_CONN_WARMUP", "True"))
+
+# -------------------------
+# CACHE
+# -------------------------
+# Use a shared backend (redis, memcached, database) when running several
+# workers: the dyn_dt/dyn_api ETag version tokens live here.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "stockvel"),
+    },
+    # Session store for SESSION_MODE=cached_db/cache. The file cache is shared
+    # by every process on the host; a locmem cache is only safe with a single
+    # process (another worker would keep serving a logged-out session).
+    "sessions": {
+        "BACKEND": os.getenv("SESSION_CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"),
+        "LOCATION": os.getenv("SESSION_CACHE_LOCATION", os.path.join(tempfile.gettempdir(), "stockvel-sessions")),
+        "TIMEOUT": None,  # sessions carry their own expiry
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "10000"))},
+    },
+}
+
+# Answer unchanged dyn_dt/dyn_api GETs with 304 from the version tokens in the
+# default cache. A per-process cache would let one worker keep confirming a
+# page another worker already changed, so it needs a shared backend.
+CONDITIONAL_GET = str2bool(os.getenv("CONDITIONAL_GET", "False"))
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+if CONDITIONAL_GET and CACHES["default"]["BACKEND"] in PROCESS_LOCAL_CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        "CONDITIONAL_GET needs a CACHE_BACKEND shared by every worker, not "
+        f"{CACHES['default']['BACKEND']}."
+    )
+
+# -------------------------
+# SESSIONS
+# -------------------------
+# Keep a versioned copy of the logged-in user's row in the session so most
+# page loads skip the `users` lookup done by the `current_user` context.
+SESSION_USER_SNAPSHOT = str2bool(os.getenv("SESSION_USER_SNAPSHOT", "True"))
+
+# Where sessions (user_id, role, is_staff, ...) live, via SESSION_MODE:
+#   db             - django_session table, one query per request (default)
+#   cached_db      - read from the "sessions" cache, written through to the DB
+#   cache          - "sessions" cache only; lost if the cache is cleared
+#   signed_cookies - the claims travel in a signed cookie, no server lookup.
+#                    Logout cannot revoke a copied cookie before it expires.
+# Compare them with `python manage.py bench_sessions`.
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_MODE = os.getenv("SESSION_MODE", "db")
+if SESSION_MODE not in SESSION_ENGINES:
+    raise ImproperlyConfigured(f"SESSION_MODE must be one of {', '.join(SESSION_ENGINES)}, not {SESSION_MODE!r}.")
+SESSION_ENGINE = SESSION_ENGINES[SESSION_MODE]
+SESSION_CACHE_ALIAS = "sessions"
+
+# -------------------------
+# BACKGROUND JOBS (manage.py run_jobs)
+# -------------------------
+JOBS_CHUNK_SIZE = int(os.getenv("JOBS_CHUNK_SIZE", "100"))
+JOBS_STALE_AFTER = int(os.getenv("JOBS_STALE_AFTER", "600"))  # seconds before a silent running job is taken over
+# Run jobs in the request that queued them. On by default so hosts without a
+# `run_jobs` worker (runserver, PythonAnywhere) still apply approvals; set it
+# to False where a worker runs (render.yaml, docker-compose.yml).
+JOBS_RUN_INLINE = str2bool(os.getenv("JOBS_RUN_INLINE", "True"))
+# Job kinds always run in the request, comma-separated. For work on local
+# files when the worker has its own disk, e.g. "accounts.avatar_thumbnails".
+JOBS_INLINE_KINDS = [k.strip() for k in os.getenv("JOBS_INLINE_KINDS", "").split(",") if k.strip()]
+
 # -------------------------
 # PASSWORD VALIDATION
 # -------------------------
@@ -150,6 +239,12 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, "static")]
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# Protected media (contribution evidence): with nginx in front, views reply
+# with X-Accel-Redirect to this internal location instead of streaming the
+# file through gunicorn. See nginx/appseed-app.conf.
+MEDIA_ACCEL_REDIRECT = str2bool(os.getenv("MEDIA_ACCEL_REDIRECT", "False"))
+MEDIA_ACCEL_PREFIX = os.getenv("MEDIA_ACCEL_PREFIX", "/protected-media/")
+
 
 
 # -------------------------
@@ -170,6 +265,14 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DYNAMIC_DATATB = {"product": "apps.pages.models.Product"}
 DYNAMIC_API = {"product": "apps.pages.models.Product"}
 
+# dyn_dt page counts are cached per (model, filters, search) for this many seconds
+DYNAMIC_DATATB_COUNT_TTL = int(os.getenv("DYNAMIC_DATATB_COUNT_TTL", "60"))
+# Count unfiltered dyn_dt views from table statistics (approximate) instead of COUNT(*)
+DYNAMIC_DATATB_ESTIMATED_COUNT = str2bool(os.getenv("DYNAMIC_DATATB_ESTIMATED_COUNT", "False"))
+# dyn_dt search backend: "token" (indexed word lookup, falls back when a model
+# is not indexed yet) or "icontains" (substring scan over every column)
+DYNAMIC_DATATB_SEARCH = os.getenv("DYNAMIC_DATATB_SEARCH", "token")
+
 # -------------------------
 # REST FRAMEWORK
 # -------------------------
@@ -1,5 +1,7 @@
 
 
+import os
+
 from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
@@ -15,11 +17,14 @@ urlpatterns = [
     path('investments/', include('apps.investments.urls')),
     path('withdrawals/', include('apps.withdrawals.urls')),
     path('loans/', include('apps.loans.urls')),
+    path('jobs/', include('apps.jobs.urls')),
 
 ]
 
 
+# Only public media (avatars) is served by URL; evidence goes through
+# permission-checked views (apps.common.media.serve_media).
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(settings.MEDIA_URL + 'avatars/', document_root=os.path.join(settings.MEDIA_ROOT, 'avatars'))
 
 
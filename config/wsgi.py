@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_wsgi_application()
+
+# Connect to the database while the worker boots (see DB_CONN_WARMUP)
+from apps.common.db import warm_up_connections
+
+warm_up_connections()